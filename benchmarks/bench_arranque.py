@@ -0,0 +1,115 @@
+# bench_arranque.py
+#
+# Mide el arranque del dashboard en procesos nuevos: tiempo de importación
+# de `code.app_shiny`, tiempo hasta servir la primera página y, como
+# referencia, lo que costaría importar además el scraping y la pila de
+# texto (Selenium, spaCy, stopwords de NLTK) antes de servirla, que era el
+# comportamiento anterior.
+#
+# Uso: python -m benchmarks.bench_arranque [--repeticiones N] [--importtime N]
+
+import argparse
+import os
+import socket
+import statistics
+import subprocess
+import sys
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Importaciones que antes se hacían al arrancar el dashboard
+PRECARGA_ANTERIOR = """
+import code.web_scraping
+import selenium.webdriver, webdriver_manager.chrome, spacy
+from nltk.corpus import stopwords
+try:
+    stopwords.words("spanish")
+except LookupError:
+    pass
+"""
+
+IMPORTACION = """
+import time
+inicio = time.perf_counter()
+import code.app_shiny
+{precarga}
+print(time.perf_counter() - inicio)
+"""
+
+PRIMERA_PAGINA = """
+import time
+inicio = time.perf_counter()
+import threading, urllib.request
+import uvicorn
+import code.app_shiny as app_shiny
+{precarga}
+servidor = uvicorn.Server(uvicorn.Config(app_shiny.app, host="127.0.0.1", port={puerto}, log_level="error"))
+threading.Thread(target=servidor.run, daemon=True).start()
+while True:
+    try:
+        with urllib.request.urlopen("http://127.0.0.1:{puerto}/", timeout=1) as respuesta:
+            if respuesta.status == 200:
+                break
+    except OSError:
+        time.sleep(0.01)
+print(time.perf_counter() - inicio)
+servidor.should_exit = True
+"""
+
+
+def _puerto_libre() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def _ejecutar(codigo: str, *opciones: str) -> subprocess.CompletedProcess:
+    entorno = {**os.environ, "PYTHONPATH": RAIZ, "PYTHONWARNINGS": "ignore"}
+    return subprocess.run([sys.executable, *opciones, "-c", codigo], cwd=RAIZ, env=entorno,
+                          capture_output=True, text=True, check=True)
+
+
+def medir(plantilla: str, precarga: str, repeticiones: int) -> list:
+    tiempos = []
+    for _ in range(repeticiones):
+        codigo = plantilla.format(precarga=precarga, puerto=_puerto_libre())
+        tiempos.append(float(_ejecutar(codigo).stdout.strip().splitlines()[-1]))
+    return tiempos
+
+
+def importaciones_lentas(cantidad: int) -> list:
+    """Módulos con mayor tiempo acumulado según `python -X importtime`."""
+    salida = _ejecutar("import code.app_shiny", "-X", "importtime").stderr
+    filas = []
+    for linea in salida.splitlines():
+        partes = linea.split("|")
+        if len(partes) == 3 and partes[1].strip().isdigit():
+            filas.append((int(partes[1]), partes[2].strip()))
+    return sorted(filas, reverse=True)[:cantidad]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark del arranque del dashboard")
+    parser.add_argument("--repeticiones", type=int, default=3)
+    parser.add_argument("--importtime", type=int, default=10, metavar="N",
+                        help="Muestra los N módulos que más tardan en importarse")
+    args = parser.parse_args()
+
+    print(f"{'caso':<40} {'mediana (s)':>12} {'mínimo (s)':>12}")
+    for nombre, plantilla, precarga in (
+        ("importar code.app_shiny", IMPORTACION, ""),
+        ("importar + precarga anterior", IMPORTACION, PRECARGA_ANTERIOR),
+        ("primera página", PRIMERA_PAGINA, ""),
+        ("primera página + precarga anterior", PRIMERA_PAGINA, PRECARGA_ANTERIOR),
+    ):
+        tiempos = medir(plantilla, precarga, args.repeticiones)
+        print(f"{nombre:<40} {statistics.median(tiempos):>12.3f} {min(tiempos):>12.3f}")
+
+    if args.importtime:
+        print("\nImportaciones más lentas de code.app_shiny (acumulado):")
+        for microsegundos, modulo in importaciones_lentas(args.importtime):
+            print(f"{microsegundos / 1e6:>8.3f} s  {modulo}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,235 @@
+# bench_etl.py
+#
+# Mide los caminos críticos del ETL sobre corpus sintéticos de distinto
+# tamaño y guarda los resultados en JSON para comparar versiones.
+#
+# Uso:
+#   python -m benchmarks.bench_etl [--tamanos 1000 10000 100000] [--salida resultados.json]
+#   python -m benchmarks.bench_etl --comparar anterior.json nuevo.json
+
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+
+import pandas as pd
+
+from benchmarks.corpus import generar_corpus, leer_fixture
+from function.utilidades import word_tokenize, quitar_tildes, singularizar
+from function.manejo_datos import replace_date, stopwords_noticias
+
+# Casos que cargan spaCy o parsean HTML por artículo: por defecto solo hasta
+# este tamaño (con --completo se miden en todos)
+MAX_LENTOS = 10_000
+
+
+def _caso_word_tokenize(df, contexto):
+    for texto in df['noticia_completa']:
+        word_tokenize(texto)
+
+
+def _caso_quitar_tildes(df, contexto):
+    for texto in df['noticia_completa']:
+        quitar_tildes(texto)
+
+
+def _caso_singularizar(df, contexto):
+    for tokens in contexto['tokens']:
+        singularizar(tokens)
+
+
+def _caso_replace_date(df, contexto):
+    for fecha in df['fecha_publicacion']:
+        replace_date(fecha)
+
+
+def _caso_text_reduce(df, contexto):
+    from function.procesamiento_texto import text_reduce
+    from function import vocabulario
+
+    text_reduce(df, "noticia_completa", contexto['stopwords'], vocabulario.cargar().key_words, usar_cache=False)
+
+
+def _caso_save_data(df, contexto):
+    from function.manejo_datos import save_data
+
+    save_data(
+        [0] * len(df), df['titulo_articulo'].tolist(), df['resumen_art'].tolist(),
+        df['fecha_publicacion'].tolist(), df['autor_redacta'].tolist(), df['imagen_url'].tolist(),
+        df['notice_url'].tolist(), df['noticia_completa'].tolist(), df['fecha_publicacion'].tolist()
+    )
+
+
+def _caso_parseo(df, contexto):
+    from code.web_scraping import _parsear_listado, _parsear_articulo
+
+    # Una página de listado por cada 12 noticias y una página por noticia
+    for _ in range(max(1, len(df) // 12)):
+        _parsear_listado(contexto['html_listado'])
+    for _ in range(len(df)):
+        _parsear_articulo(contexto['html_articulo'])
+
+
+def _caso_dashboard_carga(df, contexto):
+    from function.cache_datos import COLUMNAS_DASHBOARD, invalidar, obtener_indice
+
+    invalidar(contexto['ruta'])
+    obtener_indice(contexto['ruta'], COLUMNAS_DASHBOARD)
+
+
+def _caso_dashboard_filtro(df, contexto):
+    from function.cache_datos import COLUMNAS_DASHBOARD, obtener_indice
+
+    datos, indice = obtener_indice(contexto['ruta'], COLUMNAS_DASHBOARD)
+    # Mismo acceso que el dashboard: rango de fechas, umbral y fila actual
+    for desde, hasta, umbral in (("2015-01-01", "2024-12-31", 0), ("2020-01-01", "2022-06-30", 5),
+                                 ("2024-01-01", "2024-12-31", 15), (None, None, 25)):
+        posiciones = indice.posiciones(desde, hasta, umbral)
+        if len(posiciones):
+            datos.iloc[posiciones[0]]
+
+
+# (nombre, función, es lento)
+CASOS = [
+    ("word_tokenize", _caso_word_tokenize, False),
+    ("quitar_tildes", _caso_quitar_tildes, False),
+    ("singularizar", _caso_singularizar, False),
+    ("replace_date", _caso_replace_date, False),
+    ("text_reduce", _caso_text_reduce, True),
+    ("save_data", _caso_save_data, True),
+    ("parseo_html", _caso_parseo, True),
+    ("dashboard_carga", _caso_dashboard_carga, False),
+    ("dashboard_filtro", _caso_dashboard_filtro, False),
+]
+
+
+def _version_git() -> str:
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "desconocida"
+
+
+def _describir_error(e: Exception) -> str:
+    # Los errores de NLTK traen recuadros de asteriscos: se toma la primera línea con texto
+    lineas = [linea.strip() for linea in str(e).splitlines() if any(c.isalpha() for c in linea)]
+    return f"{type(e).__name__}: {lineas[0] if lineas else ''}"
+
+
+def medir(funcion, df, contexto, repeticiones: int) -> float:
+    """Mejor tiempo (en segundos) de `repeticiones` ejecuciones."""
+    tiempos = []
+    for _ in range(repeticiones):
+        inicio = time.perf_counter()
+        funcion(df, contexto)
+        tiempos.append(time.perf_counter() - inicio)
+    return min(tiempos)
+
+
+def ejecutar(tamanos: list, repeticiones: int = 3, completo: bool = False, casos: list = None) -> dict:
+    """
+    Ejecuta los casos sobre corpus sintéticos de cada tamaño.
+
+    Args:
+        tamanos (list): Números de noticias de cada corpus.
+        repeticiones (int): Ejecuciones por caso (se guarda la mejor).
+        completo (bool): Medir también los casos lentos en los tamaños grandes.
+        casos (list, optional): Nombres de los casos a medir. Por defecto todos.
+
+    Returns:
+        dict: Metadatos de la ejecución y resultados por caso y tamaño.
+    """
+    try:
+        stopwords = stopwords_noticias()
+    except LookupError:
+        stopwords = []
+    contexto_base = {
+        'stopwords': stopwords,
+        'html_listado': leer_fixture("listado.html"),
+        'html_articulo': leer_fixture("articulo.html"),
+    }
+    resultados = []
+
+    for n in tamanos:
+        df = generar_corpus(n)
+        with tempfile.TemporaryDirectory() as carpeta:
+            ruta = os.path.join(carpeta, "historic_data.csv")
+            df.to_csv(ruta, index=False)
+            contexto = {**contexto_base, 'ruta': ruta,
+                        'tokens': [word_tokenize(t) for t in df['noticia_completa']]}
+
+            for nombre, funcion, lento in CASOS:
+                if casos and nombre not in casos:
+                    continue
+                resultado = {'caso': nombre, 'n': n}
+                if lento and not completo and n > MAX_LENTOS:
+                    resultado['omitido'] = f"más de {MAX_LENTOS} noticias (usar --completo)"
+                else:
+                    try:
+                        segundos = medir(funcion, df, contexto, 1 if lento else repeticiones)
+                        resultado.update(segundos=segundos, us_por_noticia=segundos / n * 1e6)
+                    except Exception as e:  # p. ej. falta el modelo de spaCy
+                        resultado['error'] = _describir_error(e)
+                resultados.append(resultado)
+                detalle = (f"{resultado['segundos']:.3f} s" if 'segundos' in resultado
+                           else resultado.get('omitido') or resultado.get('error'))
+                print(f"{nombre:>18} n={n:<7} {detalle}")
+
+    return {
+        'fecha': pd.Timestamp.now().isoformat(timespec="seconds"),
+        'version': _version_git(),
+        'python': sys.version.split()[0],
+        'plataforma': platform.platform(),
+        'repeticiones': repeticiones,
+        'resultados': resultados,
+    }
+
+
+def comparar(ruta_anterior: str, ruta_nueva: str) -> None:
+    """Imprime la razón de tiempos (nuevo / anterior) de cada caso y tamaño."""
+    with open(ruta_anterior, encoding="utf-8") as archivo:
+        anterior = json.load(archivo)
+    with open(ruta_nueva, encoding="utf-8") as archivo:
+        nuevo = json.load(archivo)
+
+    tiempos = {(r['caso'], r['n']): r['segundos'] for r in anterior['resultados'] if 'segundos' in r}
+    print(f"{anterior['version']} -> {nuevo['version']}")
+    for r in nuevo['resultados']:
+        clave = (r['caso'], r['n'])
+        if 'segundos' in r and clave in tiempos:
+            razon = r['segundos'] / max(tiempos[clave], 1e-12)
+            marca = "  <-- más lento" if razon > 1.1 else ""
+            print(f"{r['caso']:>18} n={r['n']:<7} {tiempos[clave]:.3f} s -> {r['segundos']:.3f} s ({razon:.2f}x){marca}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmarks del ETL de NOTICIAS UCR")
+    parser.add_argument("--tamanos", type=int, nargs="+", default=[1_000, 10_000, 100_000])
+    parser.add_argument("--repeticiones", type=int, default=3)
+    parser.add_argument("--casos", nargs="+", choices=[c[0] for c in CASOS])
+    parser.add_argument("--completo", action="store_true", help="Medir los casos lentos en todos los tamaños")
+    parser.add_argument("--salida", help="Archivo JSON de resultados")
+    parser.add_argument("--comparar", nargs=2, metavar=("ANTERIOR", "NUEVO"))
+    args = parser.parse_args()
+
+    if args.comparar:
+        comparar(*args.comparar)
+        return
+
+    resultados = ejecutar(args.tamanos, args.repeticiones, args.completo, args.casos)
+    salida = args.salida or os.path.join(
+        os.path.dirname(__file__), "resultados", f"bench-{resultados['version']}-{time.strftime('%Y%m%d-%H%M%S')}.json"
+    )
+    os.makedirs(os.path.dirname(salida) or ".", exist_ok=True)
+    with open(salida, "w", encoding="utf-8") as archivo:
+        json.dump(resultados, archivo, ensure_ascii=False, indent=2)
+    print(f"Resultados guardados en {salida}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,70 @@
+# bench_memoria.py
+#
+# Mide el pico de memoria (tracemalloc) de las lecturas del histórico en
+# CSV de distinto tamaño: el histórico completo, las columnas del
+# dashboard y los recorridos por bloques (resumen e índice de noticias
+# vistas). Los recorridos por bloques deberían mantenerse casi constantes
+# al crecer el histórico.
+#
+# Uso: python -m benchmarks.bench_memoria [--tamanos 10000 50000 200000] [--tam-bloque N]
+
+import argparse
+import gc
+import os
+import tempfile
+import time
+import tracemalloc
+
+from benchmarks.corpus import generar_corpus
+from function.almacenamiento import TAM_BLOQUE, leer_historico, leer_por_bloques, resumen_historico
+from function.cache_datos import COLUMNAS_DASHBOARD
+
+
+def _recorrer(ruta: str, columnas: list, tam_bloque: int) -> None:
+    for _ in leer_por_bloques(ruta, columnas, tam_bloque=tam_bloque):
+        pass
+
+
+def medir(funcion, *args) -> tuple:
+    """Devuelve (segundos, pico de memoria en MB) de una llamada."""
+    gc.collect()
+    tracemalloc.start()
+    inicio = time.perf_counter()
+    funcion(*args)
+    segundos = time.perf_counter() - inicio
+    _, pico = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return segundos, pico / 2 ** 20
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Pico de memoria de las lecturas del histórico")
+    parser.add_argument("--tamanos", type=int, nargs="+", default=[10_000, 50_000, 200_000])
+    parser.add_argument("--tam-bloque", type=int, default=TAM_BLOQUE)
+    args = parser.parse_args()
+
+    print(f"{'caso':<28} {'n':>8} {'segundos':>10} {'pico (MB)':>10}")
+    for n in args.tamanos:
+        # El corpus se genera por partes para no medir su propia memoria
+        with tempfile.TemporaryDirectory() as carpeta:
+            ruta = os.path.join(carpeta, "historic_data.csv")
+            for k, inicio in enumerate(range(0, n, 10_000)):
+                parte = generar_corpus(min(10_000, n - inicio), semilla=k)
+                parte['id_atributo'] += inicio
+                parte.to_csv(ruta, mode='a', header=k == 0, index=False)
+                del parte
+
+            for nombre, funcion, argumentos in (
+                ("histórico completo", leer_historico, (ruta,)),
+                ("columnas del dashboard", lambda r: leer_historico(r, COLUMNAS_DASHBOARD, categoricas=True), (ruta,)),
+                ("resumen por bloques", resumen_historico, (ruta,)),
+                ("índice visto por bloques", _recorrer,
+                 (ruta, ['id_atributo', 'notice_url', 'fecha_publicacion_CD'], args.tam_bloque)),
+                ("texto por bloques", _recorrer, (ruta, ['id_atributo', 'noticia_completa'], args.tam_bloque)),
+            ):
+                segundos, pico = medir(funcion, *argumentos)
+                print(f"{nombre:<28} {n:>8} {segundos:>10.2f} {pico:>10.1f}")
+
+
+if __name__ == "__main__":
+    main()
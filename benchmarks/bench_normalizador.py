@@ -0,0 +1,61 @@
+# bench_normalizador.py
+#
+# Compara la cadena original (word_tokenize -> lower -> stopwords ->
+# quitar_tildes -> join/split -> singularizar) con `normalizar_texto`.
+#
+# Uso: python -m benchmarks.bench_normalizador [historic_data.csv]
+
+import sys
+import time
+
+import pandas as pd
+
+from function.utilidades import word_tokenize, quitar_tildes, singularizar, normalizar_texto
+
+STOPWORDS_MUESTRA = {
+    "de", "la", "que", "el", "en", "y", "a", "los", "del", "se", "las", "por",
+    "un", "para", "con", "no", "una", "su", "al", "lo", "como", "más", "él",
+}
+
+TEXTO_MUESTRA = (
+    "La Universidad de Costa Rica destinó más recursos a las becas estudiantiles. "
+    "Según la Vicerrectoría, la inclusión y la equidad son ejes de la acción social; "
+    "¿cómo se distribuirán los préstamos? ¡Habrá más oportunidades para todos! "
+) * 40
+
+
+def cadena_original(texto: str, stopwords_set: set) -> list:
+    tokens = word_tokenize(texto)
+    tokens = (word.lower() for word in tokens)
+    tokens = (word for word in tokens if word not in stopwords_set)
+    tokens = (quitar_tildes(word) for word in tokens)
+    return singularizar(' '.join(tokens).split())
+
+
+def medir(funcion, textos, stopwords_set) -> float:
+    inicio = time.perf_counter()
+    for texto in textos:
+        funcion(texto, stopwords_set)
+    return time.perf_counter() - inicio
+
+
+def main():
+    if len(sys.argv) > 1:
+        textos = pd.read_csv(sys.argv[1], usecols=["noticia_completa"])["noticia_completa"].dropna().tolist()
+    else:
+        textos = [TEXTO_MUESTRA] * 500
+
+    normalizadas = frozenset(STOPWORDS_MUESTRA)
+    iguales = sum(cadena_original(t, STOPWORDS_MUESTRA) == normalizar_texto(t, normalizadas) for t in textos)
+
+    t_original = medir(cadena_original, textos, STOPWORDS_MUESTRA)
+    t_nuevo = medir(normalizar_texto, textos, normalizadas)
+
+    print(f"Documentos: {len(textos)} (idénticos: {iguales})")
+    print(f"Cadena original:   {t_original:.3f} s")
+    print(f"normalizar_texto:  {t_nuevo:.3f} s")
+    print(f"Aceleración:       {t_original / t_nuevo:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,75 @@
+# bench_parseo.py
+#
+# Compara el parseo anterior (BeautifulSoup con html.parser sobre la página
+# completa) con los backends de `function.parseo`, sobre los fixtures HTML.
+# Verifica además que las tarjetas extraídas sean idénticas.
+#
+# Uso: python -m benchmarks.bench_parseo [repeticiones]
+
+import sys
+import time
+from urllib.parse import urljoin
+
+from bs4 import BeautifulSoup as bs
+
+from benchmarks.corpus import leer_fixture
+from function.parseo import BACKENDS, _disponible, parsear_listado, parsear_articulo
+
+BASE_URL = "https://www.ucr.ac.cr"
+
+
+def listado_anterior(html: str) -> list:
+    soup = bs(html, 'html.parser')
+    tarjetas = []
+    for notice in soup.find_all("div", class_="noticia item tarjeta"):
+        enlace = notice.find("a", class_='marco')
+        if not enlace:
+            continue
+        fecha_ = notice.find("span", class_='dia')
+        resumen_ = notice.find("p", class_='resumen')
+        imagen = notice.find("img")
+        autor = notice.find("div", class_='autores')
+        tarjetas.append({
+            "titulo_articulo": enlace.text.strip(),
+            "fecha_publicacion": fecha_.text.strip() if fecha_ else "",
+            "resumen_art": resumen_.text.strip() if resumen_ else "Sin resumen",
+            "imagen_url": imagen['src'] if imagen else None,
+            "autor_redacta": autor.text.strip() if autor else "Desconocido",
+            "notice_url": urljoin(BASE_URL, enlace.get("href")),
+        })
+    return tarjetas
+
+
+def articulo_anterior(html: str) -> str:
+    return ' '.join([p.text for p in bs(html, "html.parser").find_all("p")]).strip()
+
+
+def medir(funcion, html: str, repeticiones: int) -> float:
+    inicio = time.perf_counter()
+    for _ in range(repeticiones):
+        funcion(html)
+    return (time.perf_counter() - inicio) / repeticiones
+
+
+def main():
+    repeticiones = int(sys.argv[1]) if len(sys.argv) > 1 else 200
+    listado, articulo = leer_fixture("listado.html"), leer_fixture("articulo.html")
+    esperado = listado_anterior(listado)
+
+    t_listado = medir(listado_anterior, listado, repeticiones)
+    t_articulo = medir(articulo_anterior, articulo, repeticiones)
+    print(f"{'anterior':>12}: listado {t_listado * 1e3:.3f} ms, artículo {t_articulo * 1e3:.3f} ms")
+
+    for backend in BACKENDS:
+        if not _disponible(backend):
+            print(f"{backend:>12}: no instalado")
+            continue
+        iguales = parsear_listado(listado, BASE_URL, backend) == esperado
+        tl = medir(lambda h: parsear_listado(h, BASE_URL, backend), listado, repeticiones)
+        ta = medir(lambda h: parsear_articulo(h, backend), articulo, repeticiones)
+        print(f"{backend:>12}: listado {tl * 1e3:.3f} ms ({t_listado / tl:.1f}x), "
+              f"artículo {ta * 1e3:.3f} ms ({t_articulo / ta:.1f}x), tarjetas idénticas: {iguales}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,170 @@
+# corpus.py
+#
+# Generador de noticias sintéticas en español con la forma del histórico
+# (mismas columnas que `save_data`) y de las páginas HTML de NOTICIAS UCR
+# usadas como fixtures de los benchmarks.
+#
+# Uso: python -m benchmarks.corpus   (regenera benchmarks/fixtures/)
+
+import os
+import random
+
+import pandas as pd
+
+from function.constantes import MESES, TEXTO_BASURA
+
+CARPETA_FIXTURES = os.path.join(os.path.dirname(__file__), "fixtures")
+
+SUJETOS = [
+    "La Universidad de Costa Rica", "La Vicerrectoría de Vida Estudiantil", "El Consejo Universitario",
+    "La Oficina de Becas", "El equipo de investigación", "La Escuela de Trabajo Social",
+    "Las autoridades universitarias", "Los estudiantes de Medicina", "La comunidad académica",
+]
+VERBOS = [
+    "anunció", "destinó", "aprobó", "presentó", "analizó", "impulsa", "discutió",
+    "apoyará", "ayudó a", "prestará", "promueve", "evaluó",
+]
+OBJETOS = [
+    "más recursos destinados a becas estudiantiles", "un programa de préstamos para estudiantes",
+    "nuevas ayudas económicas", "políticas de inclusión y equidad", "el acceso a la educación superior",
+    "la participación de las mujeres en la ciencia", "los derechos de las personas con discapacidad",
+    "un balance de la acción social", "la diversidad cultural en las sedes regionales",
+    "oportunidades laborales para las personas graduadas", "la proporcionalidad del presupuesto",
+    "un estudio sobre la calidad del agua", "la restauración de edificios patrimoniales",
+]
+COMPLEMENTOS = [
+    "durante la sesión de este martes", "según el informe presentado", "en las sedes regionales",
+    "con el apoyo de la Rectoría", "para el próximo ciclo lectivo", "¿cómo se distribuirán los fondos?",
+    "¡una noticia esperada por la comunidad!", "tras varios meses de análisis", "en el marco de la libertad de cátedra",
+]
+AUTORES = [
+    "María Fernanda Cruz Rodríguez", "Jenniffer Jiménez Córdoba", "Otto Salas Murillo",
+    "Patricia Blanco Picado", "Katzy O`neal Coto", "Andrea Marín Castro",
+]
+ABREVIATURAS = list(MESES)
+
+
+def _oracion(rng: random.Random) -> str:
+    return f"{rng.choice(SUJETOS)} {rng.choice(VERBOS)} {rng.choice(OBJETOS)} {rng.choice(COMPLEMENTOS)}."
+
+
+def generar_articulo(rng: random.Random, parrafos: int = 6, oraciones: int = 4) -> list:
+    """
+    Genera los párrafos de una noticia sintética.
+
+    Args:
+        rng (random.Random): Generador de números aleatorios.
+        parrafos (int): Número de párrafos.
+        oraciones (int): Oraciones por párrafo.
+
+    Returns:
+        list: Párrafos de la noticia.
+    """
+    return [" ".join(_oracion(rng) for _ in range(oraciones)) for _ in range(parrafos)]
+
+
+def generar_corpus(n: int, semilla: int = 0) -> pd.DataFrame:
+    """
+    Genera un histórico sintético de `n` noticias con las columnas de `save_data`.
+
+    Args:
+        n (int): Número de noticias.
+        semilla (int): Semilla del generador (el corpus es reproducible).
+
+    Returns:
+        pd.DataFrame: Histórico ordenado por fecha descendente.
+    """
+    rng = random.Random(semilla)
+    fechas = pd.Timestamp("2024-12-31") - pd.to_timedelta([rng.randrange(3650) for _ in range(n)], unit="D")
+    filas = []
+    for i, fecha in enumerate(fechas):
+        texto = " ".join(generar_articulo(rng))
+        filas.append({
+            'id_atributo': i + 1,
+            'titulo_articulo': _oracion(rng).rstrip("."),
+            'resumen_art': _oracion(rng),
+            'fecha_publicacion': f"{fecha.day:02d} {ABREVIATURAS[fecha.month - 1]} {fecha.year}",
+            'autor_redacta': rng.choice(AUTORES),
+            'imagen_url': f"/medios/imagenes/2024/sintetica-{i}.jpg",
+            'notice_url': f"https://www.ucr.ac.cr/noticias/{fecha.year}/{fecha.month}/{fecha.day}/sintetica-{i}.html",
+            'noticia_completa': texto,
+            'fecha_publicacion_CD': fecha,
+            'n_by_tex': rng.randrange(30),
+            'puntaje_ponderado': rng.randrange(60) / 2,
+        })
+    df = pd.DataFrame(filas)
+    df.sort_values("fecha_publicacion_CD", ascending=False, inplace=True)
+    df.reset_index(drop=True, inplace=True)
+    return df
+
+
+def html_listado(df: pd.DataFrame) -> str:
+    """Página de listado con una tarjeta por fila, con la estructura de NOTICIAS UCR."""
+    tarjetas = "\n".join(
+        f"""      <div class="noticia item tarjeta">
+        <a class="marco" href="{fila.notice_url.replace('https://www.ucr.ac.cr', '')}">{fila.titulo_articulo}</a>
+        <img src="{fila.imagen_url}" alt="">
+        <span class="dia">{fila.fecha_publicacion}</span>
+        <p class="resumen">{fila.resumen_art}</p>
+        <div class="autores">{fila.autor_redacta}</div>
+      </div>"""
+        for fila in df.itertuples()
+    )
+    return f"""<!DOCTYPE html>
+<html lang="es">
+<head><meta charset="utf-8"><title>Noticias | Universidad de Costa Rica</title></head>
+<body>
+  <header><nav><ul><li><a href="/">Inicio</a></li><li><a href="/noticias/">Noticias</a></li></ul></nav></header>
+  <main>
+    <div class="listado">
+{tarjetas}
+    </div>
+    <nav class="paginacion"><a href="/noticias/?pagina=2">Siguiente</a></nav>
+  </main>
+  <footer><p>{TEXTO_BASURA}</p></footer>
+</body>
+</html>
+"""
+
+
+def html_articulo(parrafos: list) -> str:
+    """Página de una noticia: párrafos del cuerpo más el texto fijo del sitio."""
+    cuerpo = "\n".join(f"      <p>{p}</p>" for p in parrafos)
+    return f"""<!DOCTYPE html>
+<html lang="es">
+<head><meta charset="utf-8"><title>Noticia | Universidad de Costa Rica</title></head>
+<body>
+  <header><nav><ul><li><a href="/">Inicio</a></li><li><a href="/noticias/">Noticias</a></li></ul></nav></header>
+  <main>
+    <article class="noticia">
+{cuerpo}
+    </article>
+  </main>
+  <aside><p>{TEXTO_BASURA}</p></aside>
+  <footer><p>Universidad de Costa Rica © 2024</p></footer>
+</body>
+</html>
+"""
+
+
+def leer_fixture(nombre: str) -> str:
+    """Lee un fixture HTML de `benchmarks/fixtures`."""
+    with open(os.path.join(CARPETA_FIXTURES, nombre), encoding="utf-8") as archivo:
+        return archivo.read()
+
+
+def main():
+    os.makedirs(CARPETA_FIXTURES, exist_ok=True)
+    rng = random.Random(0)
+    paginas = {
+        "listado.html": html_listado(generar_corpus(12).head(12)),
+        "articulo.html": html_articulo(generar_articulo(rng, parrafos=10)),
+    }
+    for nombre, html in paginas.items():
+        with open(os.path.join(CARPETA_FIXTURES, nombre), "w", encoding="utf-8") as archivo:
+            archivo.write(html)
+        print(f"Fixture escrito: {nombre}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,12 +1,34 @@
+import json
+import os
+from html import escape
+import numpy as np
 import pandas as pd
 from shiny import App, Inputs, Outputs, Session, reactive, render, ui
+from shiny.http_staticfiles import StaticFiles
 from shiny.types import FileInfo
-import code.web_scraping as ws
+from starlette.routing import Mount
+from code.trabajo_scraping import TRABAJO
+from function.cache_datos import COLUMNAS_DASHBOARD, obtener_indice, texto_noticia
+from function.almacenamiento_sqlite import es_sqlite, buscar
+from function import metricas
+from function.agregados import obtener_agregados
+from function.miniaturas import (
+    ARCHIVO_LOGO_UCR, PREFIJO_MINIATURAS, RUTA_MINIATURAS, URL_LOGO_UCR, obtener_precarga, ruta_estatica,
+)
+
+# Noticias vecinas (respecto a la actual) cuyas imágenes se precargan
+VECINAS = (1, -1, 2, -2)
+
+
+def _respaldo_remoto(url: str) -> str:
+    """Atributo `onerror` que cambia a la imagen original si falla la copia local."""
+    return f"this.onerror=null;this.src={json.dumps(url)}"
 
 # === Definición de la Interfaz de Usuario ===
 app_ui = ui.page_fluid(
     ui.tags.img(
-            src='https://www.ucr.ac.cr/vistas/webucr_ucr_5/imagenes/firma-ucr-c.svg', # Link oficial de la img de UCR
+            src=f"{PREFIJO_MINIATURAS}/{ARCHIVO_LOGO_UCR}", # Copia local del logo oficial de la UCR
+            onerror=_respaldo_remoto(URL_LOGO_UCR),
             height="100%", width="100%"
         ),
     ui.navset_card_pill(
@@ -31,6 +53,8 @@ app_ui = ui.page_fluid(
                     ui.card(
                         ui.tags.b("Resumen"),
                         ui.output_text("text_resumen"),
+                        ui.input_action_button("action_texto", "Ver texto completo"),
+                        ui.output_text("text_completo"),
                         ui.card(
                             ui.tags.b("Información de autoría"),
                             ui.layout_columns(
@@ -40,7 +64,10 @@ app_ui = ui.page_fluid(
                         ),
                         ui.tags.b("Actualización de base de datos"),
                         ui.card(
-                            ui.input_action_button("action_button", "Actualizar datos"),
+                            ui.layout_columns(
+                                ui.input_action_button("action_button", "Actualizar datos"),
+                                ui.input_action_button("cancel_button", "Cancelar")
+                            ),
                             ui.output_text("counter")
                         )
                     ),
@@ -53,17 +80,68 @@ app_ui = ui.page_fluid(
             )
         ),
         ),
+        ui.nav_panel( "Búsqueda",
+        ui.input_text("busqueda", "Buscar en las noticias (título, resumen y texto completo)", placeholder= "becas equidad"),
+        ui.output_text("busqueda_estado"),
+        ui.output_data_frame("busqueda_resultados")
+        ),
+        ui.nav_panel( "Tendencias",
+        ui.input_radio_buttons("tendencias_periodo", "Agrupar por", {"dia": "Día", "semana": "Semana", "mes": "Mes"},
+                               selected= "semana", inline= True),
+        ui.output_text("tendencias_estado"),
+        ui.tags.b("Noticias por periodo"),
+        ui.output_ui("tendencias_articulos"),
+        ui.tags.b("Aciertos de palabras clave por periodo"),
+        ui.output_ui("tendencias_aciertos"),
+        ui.layout_columns(
+            ui.card(ui.tags.b("Palabras clave en el rango"), ui.output_data_frame("tendencias_palabras")),
+            ui.card(ui.tags.b("Autores en el rango"), ui.output_data_frame("tendencias_autores"))
+        )
+        ),
+        ui.nav_panel( "Rendimiento",
+        ui.output_text("rendimiento_resumen"),
+        ui.tags.b("Tiempo por etapa"),
+        ui.output_data_frame("rendimiento_etapas"),
+        ui.tags.b("Contadores"),
+        ui.output_data_frame("rendimiento_contadores"),
+        ui.tags.b("Noticias más lentas"),
+        ui.output_data_frame("rendimiento_articulos")
+        ),
         ui.nav_panel( "Ajuste de Datos",
-        ui.input_file("path", "Busca el archivo CSV", accept=[".csv"], multiple= False),
+        ui.input_file("path", "Busca el archivo CSV, Parquet o SQLite", accept=[".csv", ".parquet", ".db", ".sqlite"], multiple= False),
         ui.input_date_range("daterange", "Selecciona un rango de fechas", start= '2024-05-13'),
         ui.input_numeric("strong_num", "¿Qué tan estricto debe ser el modelo?", 8, min= 4, max= 20)
         ),
     ),
 )
 
+def _grafico_barras(etiquetas: list, valores: list, color: str = "steelblue",
+                    alto: int = 160, max_etiquetas: int = 8) -> ui.HTML:
+    """Gráfico de barras en SVG (sin dependencias de gráficos)."""
+    if not valores:
+        return ui.HTML("Sin datos en el rango seleccionado.")
+    ancho_barra, margen = 12, 24
+    ancho = ancho_barra * len(valores)
+    maximo = max(max(valores), 1)
+    paso = max(1, len(etiquetas) // max_etiquetas)
+    partes = [f'<svg viewBox="0 0 {ancho} {alto + margen}" preserveAspectRatio="none" '
+              f'style="width:100%; height:{alto + margen}px;" xmlns="http://www.w3.org/2000/svg">']
+    for k, (etiqueta, valor) in enumerate(zip(etiquetas, valores)):
+        h = alto * valor / maximo
+        partes.append(f'<rect x="{k * ancho_barra + 1}" y="{alto - h:.1f}" width="{ancho_barra - 2}" '
+                      f'height="{h:.1f}" fill="{color}"><title>{escape(str(etiqueta))}: {valor:g}</title></rect>')
+        if k % paso == 0:
+            partes.append(f'<text x="{k * ancho_barra}" y="{alto + 14}" font-size="9">{escape(str(etiqueta))}</text>')
+    partes.append("</svg>")
+    return ui.HTML("".join(partes))
+
 # ================= Definición del Server ===================
 def server(input: Inputs, output: Outputs, session: Session):
-    
+
+    # Con la interfaz ya servida se carga en segundo plano lo que usa la actualización
+    TRABAJO.precalentar()
+    obtener_precarga().logo()
+
     @reactive.Calc
     def data_path():
         if input.path() is not None:
@@ -77,35 +155,46 @@ def server(input: Inputs, output: Outputs, session: Session):
             return None
 
 
+    # Generación de datos vista por la sesión; cambia al terminar una actualización
+    generacion = reactive.Value(TRABAJO.generacion)
+
+    @reactive.Effect
+    def _vigilar_trabajo():
+        reactive.invalidate_later(1)
+        with reactive.isolate():
+            if generacion() != TRABAJO.generacion:
+                generacion.set(TRABAJO.generacion)
+
     @reactive.Calc
-    def df():
+    def datos():
+        generacion()
         path = data_path()
         if path:
             try:
-                df = pd.read_csv(path)
-                df["fecha_publicacion_CD"] = pd.to_datetime(df["fecha_publicacion_CD"], format= "%Y-%m-%d")
-                df.sort_values("fecha_publicacion_CD", ascending= False, inplace= True)
-                start_date_str, end_date_str = input.daterange()
-
-                # Convertir las fechas a objetos datetime
-                start_date = pd.to_datetime(start_date_str, format="%Y-%m-%d")
-                end_date = pd.to_datetime(end_date_str, format="%Y-%m-%d")
-                df = df.loc[
-                        (df["fecha_publicacion_CD"] >= start_date) & 
-                        (df["fecha_publicacion_CD"] <= end_date), 
-                        :
-                    ]
-                df = df.loc[df["n_by_text"] >= 8, :]
-                return df
+                # Histórico e índice compartidos entre sesiones; el texto
+                # completo se lee por noticia solo cuando se pide
+                return obtener_indice(path, COLUMNAS_DASHBOARD)
             except Exception as e:
                 print(f"Error al leer el CSV: {e}")
-                return pd.DataFrame()
-        else:
-            return pd.DataFrame()
+        return pd.DataFrame(), None
+
+    @reactive.Calc
+    def posiciones():
+        df, indice = datos()
+        if indice is None:
+            return np.array([], dtype="int64")
+        start_date_str, end_date_str = input.daterange()
+
+        # Convertir las fechas a objetos datetime
+        start_date = pd.to_datetime(start_date_str, format="%Y-%m-%d")
+        end_date = pd.to_datetime(end_date_str, format="%Y-%m-%d")
+
+        # Rango de fechas y umbral resueltos con búsquedas binarias sobre el índice
+        return indice.posiciones(start_date, end_date, input.strong_num() or 0)
     
     @reactive.Calc
     def l_df():
-        return len(df())
+        return len(posiciones())
 
     index = reactive.Value(0)
 
@@ -126,17 +215,34 @@ def server(input: Inputs, output: Outputs, session: Session):
     @reactive.Calc
     def get_current_row():
         if l_df() > 0:
-            return df().iloc[index()]
+            return datos()[0].iloc[posiciones()[index() % l_df()]]
         else:
             return pd.Series()
 
+    @reactive.Effect
+    def _precargar_vecinas():
+        # Imágenes de las noticias a las que se llega con ⬅️/➡️
+        pos = posiciones()
+        if len(pos) == 0:
+            return
+        i = index()
+        vecinas = sorted({pos[(i + d) % len(pos)] for d in VECINAS})
+        obtener_precarga().pedir(datos()[0]['imagen_url'].iloc[vecinas].dropna())
+
     @output
     @render.ui
     def image_output():
         row = get_current_row()
         imagen_url = row.get('imagen_url', '')
-        if imagen_url:
-            return ui.HTML(f'<img src="{imagen_url}" alt="No hay una imagen disponible, ya que hay un video." style="width:100%; height:100%;" />')
+        if isinstance(imagen_url, str) and imagen_url:
+            # Miniatura local si ya está en la caché; si no, la original mientras se descarga
+            src = ruta_estatica(imagen_url)
+            if src is None:
+                src = imagen_url
+                obtener_precarga().pedir([imagen_url])
+            return ui.tags.img(src=src, onerror=_respaldo_remoto(imagen_url),
+                               alt="No hay una imagen disponible, ya que hay un video.",
+                               style="width:100%; height:100%;")
         return ui.HTML("No image available.")
 
     @output
@@ -145,6 +251,17 @@ def server(input: Inputs, output: Outputs, session: Session):
         row = get_current_row()
         return row.get('resumen_art', '')
 
+    @output
+    @render.text
+    def text_completo():
+        # Se muestra y oculta con el mismo botón
+        if input.action_texto() % 2 == 0:
+            return ''
+        row = get_current_row()
+        if 'id_atributo' not in row:
+            return ''
+        return texto_noticia(data_path(), int(row['id_atributo'])) or 'No hay texto disponible.'
+
     @output
     @render.text
     def text_autor():
@@ -184,19 +301,167 @@ def server(input: Inputs, output: Outputs, session: Session):
     def _actualizar_datos():
         if data_path().endswith("historic_data.csv"):
             print("Se ha encontrado el path")
-            try:
-                ws.scrape_data(data_path())
-                update_message.set("Datos actualizados exitosamente.")
-            except Exception as e:
-                update_message.set(f"Error durante la actualización: {str(e)}")
+            # La actualización corre en segundo plano; solo una a la vez en todo el proceso
+            if not TRABAJO.iniciar(data_path()):
+                update_message.set("Ya hay una actualización en curso.")
         else:
             print(data_path())
+
+    @reactive.Effect
+    @reactive.event(input.cancel_button)
+    def _cancelar_actualizacion():
+        TRABAJO.cancelar()
     
     @output
     @render.text
     def counter():
-        return update_message()
+        reactive.invalidate_later(1)
+        return TRABAJO.estado["mensaje"] or update_message()
     
+    @reactive.Calc
+    def resultados_busqueda():
+        path = data_path()
+        texto = input.busqueda().strip()
+        if not path or not texto or not es_sqlite(path):
+            return pd.DataFrame()
+        start_date_str, end_date_str = input.daterange()
+        try:
+            return buscar(path, texto, desde=start_date_str, hasta=end_date_str, umbral=input.strong_num())
+        except Exception as e:
+            print(f"Error en la búsqueda: {e}")
+            return pd.DataFrame()
+
+    @render.text
+    def busqueda_estado():
+        path = data_path()
+        if path and not es_sqlite(path):
+            return "La búsqueda de texto completo requiere cargar el histórico en SQLite (.db/.sqlite)."
+        if input.busqueda().strip():
+            return f"{len(resultados_busqueda())} resultados"
+        return ""
+
+    @render.data_frame
+    def busqueda_resultados():
+        return render.DataGrid(resultados_busqueda(), width="100%")
+
+    @reactive.Calc
+    def agregados():
+        generacion()
+        path = data_path()
+        if not path:
+            return None
+        try:
+            # Solo se leen los agregados guardados; si faltan o están
+            # desactualizados se reconstruyen en segundo plano
+            datos_agregados = obtener_agregados(path)
+        except Exception as e:
+            print(f"Error al cargar los agregados: {e}")
+            return None
+        if datos_agregados is None and path not in TRABAJO.errores_agregados:
+            TRABAJO.reconstruir_agregados(path)
+        return datos_agregados
+
+    @reactive.Calc
+    def rango_tendencias():
+        start_date_str, end_date_str = input.daterange()
+        return pd.Timestamp(start_date_str), pd.Timestamp(end_date_str)
+
+    @reactive.Calc
+    def serie_tendencias():
+        datos_agregados = agregados()
+        if datos_agregados is None:
+            return pd.DataFrame(columns=["inicio", "articulos", "aciertos", "puntaje"])
+        desde, hasta = rango_tendencias()
+        return datos_agregados.serie(input.tendencias_periodo(), desde, hasta)
+
+    @render.text
+    def tendencias_estado():
+        if agregados() is None:
+            path = data_path()
+            if not path:
+                return "Cargue un histórico para ver las tendencias."
+            if path in TRABAJO.errores_agregados:
+                return f"No se pudieron construir los agregados: {TRABAJO.errores_agregados[path]}"
+            return "Construyendo los agregados del histórico en segundo plano..."
+        serie = serie_tendencias()
+        return f"{int(serie['articulos'].sum())} noticias y {int(serie['aciertos'].sum())} aciertos en {len(serie)} periodos."
+
+    @render.ui
+    def tendencias_articulos():
+        serie = serie_tendencias()
+        return _grafico_barras(serie["inicio"].tolist(), serie["articulos"].tolist())
+
+    @render.ui
+    def tendencias_aciertos():
+        serie = serie_tendencias()
+        return _grafico_barras(serie["inicio"].tolist(), serie["aciertos"].tolist(), color="darkorange")
+
+    @render.data_frame
+    def tendencias_palabras():
+        datos_agregados = agregados()
+        if datos_agregados is None:
+            return render.DataGrid(pd.DataFrame())
+        return render.DataGrid(datos_agregados.palabras(*rango_tendencias()), width="100%")
+
+    @render.data_frame
+    def tendencias_autores():
+        datos_agregados = agregados()
+        if datos_agregados is None:
+            return render.DataGrid(pd.DataFrame())
+        autores = datos_agregados.autores(*rango_tendencias(), limite=50)
+        return render.DataGrid(autores.round({"puntaje": 2}), width="100%")
+
+    @reactive.Calc
+    def metricas_ultimas():
+        generacion()
+        ultima = metricas.ultima()
+        if ultima is not None:
+            return ultima.resumen(), ultima.registros_articulos()
+        # Métricas exportadas por una ejecución anterior (por ejemplo, desde main.py)
+        ruta = os.path.join(metricas.RUTA_METRICAS, "scraping.jsonl")
+        if os.path.exists(ruta):
+            try:
+                return metricas.cargar_jsonl(ruta)
+            except (OSError, ValueError) as e:
+                print(f"Error al leer las métricas: {e}")
+        return None, []
+
+    @render.text
+    def rendimiento_resumen():
+        resumen, _ = metricas_ultimas()
+        if resumen is None:
+            return "Todavía no hay métricas: ejecute una actualización."
+        inicio = pd.Timestamp(resumen["inicio"], unit="s", tz="UTC").tz_convert("America/Costa_Rica")
+        return (f"Última ejecución ({resumen['nombre']}): {inicio:%Y-%m-%d %H:%M:%S} · "
+                f"Duración: {resumen['duracion']:.1f} s · Noticias: {resumen['articulos']}")
+
+    @render.data_frame
+    def rendimiento_etapas():
+        resumen, _ = metricas_ultimas()
+        etapas = pd.DataFrame.from_dict((resumen or {}).get("etapas", {}), orient="index")
+        if etapas.empty:
+            return render.DataGrid(etapas)
+        etapas["media_ms"] = etapas["segundos"] / etapas["llamadas"] * 1000
+        etapas["maximo_ms"] = etapas["maximo"] * 1000
+        etapas = etapas.rename_axis("etapa").reset_index().sort_values("segundos", ascending=False)
+        return render.DataGrid(etapas[["etapa", "llamadas", "segundos", "media_ms", "maximo_ms"]].round(3), width="100%")
+
+    @render.data_frame
+    def rendimiento_contadores():
+        resumen, _ = metricas_ultimas()
+        contadores = (resumen or {}).get("contadores", {})
+        return render.DataGrid(pd.DataFrame({"contador": list(contadores), "valor": list(contadores.values())}), width="100%")
+
+    @render.data_frame
+    def rendimiento_articulos():
+        _, articulos = metricas_ultimas()
+        df = pd.DataFrame(articulos)
+        if df.empty:
+            return render.DataGrid(df)
+        tiempos = [c for c in df.columns if c.endswith("_s")]
+        df["total_s"] = df[tiempos].fillna(0).sum(axis=1)
+        return render.DataGrid(df.sort_values("total_s", ascending=False).head(50).round(4), width="100%")
+
     @render.text  
     def flecha_1():
         return "⬅️: Muestra la información más antigua a la más nueva"
@@ -206,8 +471,14 @@ def server(input: Inputs, output: Outputs, session: Session):
         return "➡️: Muestra la información más nueva a la más antigua"
 
 app = App(app_ui, server)
+# Las miniaturas se sirven desde la caché local; la carpeta se comprueba en
+# cada petición, así puede crearse después de importar el módulo
+app.starlette_app.routes.insert(
+    0, Mount(PREFIJO_MINIATURAS, app=StaticFiles(directory=RUTA_MINIATURAS, check_dir=False))
+)
 
 # Covirtiendolo en una función para poderlo llamar luego como un método.
 def run_app():
     """Función para ejecutar la aplicación localmente."""
+    os.makedirs(RUTA_MINIATURAS, exist_ok=True)
     return app.run()     
\ No newline at end of file
@@ -0,0 +1,152 @@
+# trabajo_scraping.py
+
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+
+class TrabajoScraping:
+    """
+    Ejecuta `ws.scrape_data` en segundo plano para no bloquear el bucle de
+    eventos de Shiny. Es único por proceso: solo puede haber una
+    actualización en curso, sin importar cuántas sesiones estén abiertas.
+
+    `generacion` aumenta cada vez que una actualización termina, para que
+    las sesiones sepan que deben refrescar sus datos.
+
+    El módulo de scraping (y con él spaCy y NLTK) se importa en el primer
+    uso o en `precalentar`, no al arrancar el dashboard.
+
+    También reconstruye los agregados de un histórico (`reconstruir_agregados`)
+    en el mismo hilo, para que lematizar todo el histórico no bloquee las
+    sesiones ni coincida con una actualización.
+    """
+
+    def __init__(self):
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="scraping")
+        self._lock = threading.Lock()
+        self._cancelar = threading.Event()
+        self._futuro = None
+        self._precalentado = False
+        self._agregados = {}  # ruta del histórico -> futuro de la reconstrucción
+        self.errores_agregados = {}  # ruta del histórico -> último error al reconstruir
+        self.generacion = 0
+        self.estado = {"activo": False, "mensaje": ""}
+
+    def activo(self) -> bool:
+        """Indica si hay una actualización en curso."""
+        with self._lock:
+            return self._futuro is not None and not self._futuro.done()
+
+    def iniciar(self, df_path: str) -> bool:
+        """
+        Lanza la actualización del histórico si no hay otra en curso.
+
+        Args:
+            df_path (str): Ruta del histórico.
+
+        Returns:
+            bool: True si se inició, False si ya había una en curso.
+        """
+        with self._lock:
+            if self._futuro is not None and not self._futuro.done():
+                return False
+            self._cancelar.clear()
+            self.estado = {"activo": True, "mensaje": "Iniciando actualización...", "inicio": time.monotonic()}
+            self._futuro = self._executor.submit(self._ejecutar, df_path)
+            return True
+
+    def reconstruir_agregados(self, df_path: str) -> bool:
+        """
+        Encola la reconstrucción de los agregados del histórico si no hay
+        otra pendiente para la misma ruta. Al terminar aumenta `generacion`.
+
+        Args:
+            df_path (str): Ruta del histórico.
+
+        Returns:
+            bool: True si se encoló, False si ya había una pendiente.
+        """
+        with self._lock:
+            futuro = self._agregados.get(df_path)
+            if futuro is not None and not futuro.done():
+                return False
+            self.errores_agregados.pop(df_path, None)
+            self._agregados[df_path] = self._executor.submit(self._reconstruir_agregados, df_path)
+            return True
+
+    def reconstruyendo_agregados(self, df_path: str) -> bool:
+        """Indica si la reconstrucción de los agregados del histórico está pendiente."""
+        with self._lock:
+            futuro = self._agregados.get(df_path)
+            return futuro is not None and not futuro.done()
+
+    def _reconstruir_agregados(self, df_path: str) -> None:
+        try:
+            from function.agregados import reconstruir, vigentes
+            if not vigentes(reconstruir(df_path), df_path):
+                # Evita reconstruir en bucle si el histórico cambió mientras tanto
+                self.errores_agregados[df_path] = "el histórico cambió durante la reconstrucción"
+        except Exception as e:
+            self.errores_agregados[df_path] = str(e)
+            print(f"Error al construir los agregados: {e}")
+        self.generacion += 1
+
+    def precalentar(self) -> None:
+        """
+        Importa el scraping y carga el modelo de texto en segundo plano,
+        una sola vez por proceso. Se llama cuando la interfaz ya está
+        servida. Como el ejecutor tiene un solo hilo, una actualización
+        lanzada antes de que termine el precalentamiento queda en cola y
+        empieza en cuanto este acaba.
+        """
+        with self._lock:
+            if self._precalentado:
+                return
+            self._precalentado = True
+            self._executor.submit(self._precargar)
+
+    @staticmethod
+    def _precargar() -> None:
+        import code.web_scraping  # noqa: F401
+        from function.manejo_datos import precalentar
+        precalentar().join()
+
+    def cancelar(self) -> None:
+        """Solicita la cancelación de la actualización en curso."""
+        if self.activo():
+            self._cancelar.set()
+            self.estado = {**self.estado, "mensaje": "Cancelando actualización..."}
+
+    def _progreso(self, avance: dict) -> None:
+        self.estado = {
+            **self.estado,
+            **avance,
+            "mensaje": (
+                f"Páginas: {avance['paginas']}/{avance['total_paginas']} · "
+                f"Noticias: {avance['articulos']} · "
+                f"Tiempo restante: {avance['eta']:.0f} s"
+            ),
+        }
+
+    def _ejecutar(self, df_path: str) -> None:
+        try:
+            import code.web_scraping as ws
+
+            guardadas = ws.scrape_data(df_path, progreso=self._progreso, cancelar=self._cancelar)
+            if guardadas is None:
+                mensaje = "Error durante la actualización (ver consola)."
+            elif self._cancelar.is_set():
+                mensaje = f"Actualización cancelada. {guardadas} noticias guardadas."
+            else:
+                mensaje = f"Datos actualizados exitosamente. {guardadas} noticias nuevas."
+        except Exception as e:
+            mensaje = f"Error durante la actualización: {str(e)}"
+        self.estado = {"activo": False, "mensaje": mensaje}
+        # Tras una actualización se vuelve a intentar construir los agregados
+        self.errores_agregados.clear()
+        self.generacion += 1
+
+
+# Trabajo compartido por todas las sesiones del proceso
+TRABAJO = TrabajoScraping()
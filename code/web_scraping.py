@@ -1,149 +1,534 @@
+import json
 import os
-from bs4 import BeautifulSoup as bs
-import pandas as pd
-from urllib.parse import urljoin
-from selenium.webdriver.common.by import By
-from selenium.webdriver.support.ui import WebDriverWait
-from selenium.webdriver.support import expected_conditions as EC
-from selenium.webdriver.chrome.options import Options
-from selenium.webdriver.chrome.service import Service
-from selenium import webdriver
-from webdriver_manager.chrome import ChromeDriverManager
+import threading
 import time
-import random
-from function.manejo_datos import save_data
+from typing import Callable, Optional
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+import pandas as pd
 
 # Modulos de function
 from function.manejo_datos import save_data
+from function.fechas import parsear_fechas
 from function.utilidades import quitar_tildes
-from function.constantes import TEXTO_BASURA
+from function.parseo import parsear_listado, parsear_articulo
+from function.descarga import Descargador
+from function.cache_http import obtener_cache_http
+from function.miniaturas import obtener_cache_miniaturas
+from function.escritor import EscritorHistorico
+from function.cache_datos import agregar_a_cache
+from function.agregados import actualizar_agregados
+from function.etapas import Pipeline
+from function import metricas
+from function.constantes import RUTA_CACHE
+
+BASE_URL = "https://www.ucr.ac.cr"
+
+# Ruta del chromedriver resuelta por webdriver_manager en una ejecución anterior
+RUTA_CHROMEDRIVER = os.path.join(RUTA_CACHE, "chromedriver.json")
 
-def scrape_data(df_path): 
+# Localizadores de Selenium (valores de `By.CLASS_NAME` y `By.TAG_NAME`),
+# como texto para no importar Selenium hasta que haga falta
+POR_CLASE = "class name"
+POR_ETIQUETA = "tag name"
+
+
+@lru_cache(maxsize=None)
+def ruta_chromedriver() -> str:
+    """
+    Devuelve la ruta del chromedriver. `ChromeDriverManager().install()`
+    consulta la red en cada llamada, así que la ruta se guarda en
+    `RUTA_CHROMEDRIVER` y solo se vuelve a instalar si el archivo ya no existe.
+
+    Returns:
+        str: Ruta del ejecutable de chromedriver.
+    """
     try:
-        df_historico = pd.read_csv(df_path)
-    except FileNotFoundError:
-        print(f"No se encontró el archivo {df_path}. Iniciando con un DataFrame vacío.")
-        df_historico = pd.DataFrame(columns=[
-            'id_atributo', 'titulo_articulo', 'resumen_art', 'fecha_publicacion',
-            'autor_redacta', 'imagen_url', 'notice_url', 'notice_completa'
-        ])
-    except Exception as e:
-        print(f"Error al leer el archivo CSV: {e}")
-        return
+        with open(RUTA_CHROMEDRIVER, encoding="utf-8") as archivo:
+            ruta = json.load(archivo).get("ruta")
+        if ruta and os.path.isfile(ruta):
+            return ruta
+    except (OSError, ValueError):
+        pass
+
+    from webdriver_manager.chrome import ChromeDriverManager
 
+    ruta = ChromeDriverManager().install()
     try:
-        df_historico["fecha_publicacion_CD"] = pd.to_datetime(df_historico["fecha_publicacion_CD"])
-        last_date = df_historico["fecha_publicacion_CD"].max()
-        last_id = df_historico["id_atributo"].max()
-    except (KeyError, IndexError):
-        print("No hay datos previos. Iniciando desde el principio.")
-        last_date, last_id = None, 0
+        os.makedirs(os.path.dirname(RUTA_CHROMEDRIVER), exist_ok=True)
+        with open(RUTA_CHROMEDRIVER, "w", encoding="utf-8") as archivo:
+            json.dump({"ruta": ruta}, archivo)
+    except OSError as e:
+        print(f"No se pudo guardar la ruta de chromedriver: {e}")
+    return ruta
+
+
+class _NavegadorRespaldo:
+    """
+    Navegador Selenium que solo se inicia (e importa) cuando una página
+    necesita JavaScript. En modo sin conexión no se inicia y devuelve una
+    página vacía.
+    """
+
+    def __init__(self, sin_conexion: bool = False):
+        self.driver = None
+        self.sin_conexion = sin_conexion
+
+    def obtener(self, url: str, localizador: tuple) -> str:
+        registro = metricas.actual()
+        if self.sin_conexion:
+            registro.contar("selenium_omitidas")
+            return ""
+        from selenium.webdriver.support import expected_conditions as EC
+        from selenium.webdriver.support.ui import WebDriverWait
+
+        if self.driver is None:
+            from selenium import webdriver
+            from selenium.webdriver.chrome.options import Options
+            from selenium.webdriver.chrome.service import Service
+
+            with registro.medir("chrome_inicio"):
+                options = Options()
+                options.add_argument("--headless")  # Ejecución en segundo plano -que no aparezca la ventana-
+                self.driver = webdriver.Chrome(service=Service(ruta_chromedriver()), options=options)
+        registro.contar("selenium_paginas")
+        with registro.medir("selenium_carga"):
+            self.driver.get(url)
+        with registro.medir("selenium_espera"):
+            WebDriverWait(self.driver, 10).until(EC.presence_of_all_elements_located(localizador))
+        return self.driver.page_source
+
+    def cerrar(self) -> None:
+        if self.driver is not None:
+            self.driver.quit()
+            self.driver = None
+
 
-    # Configuración del driver Selenium
-    options = Options()
-    options.add_argument("--headless")  # Ejecución en segundo plano -que no aparezca la ventana-
+def _parsear_listado(html: str) -> list:
+    """
+    Extrae las tarjetas de noticias de una página de listado.
 
+    Args:
+        html (str): HTML de la página de listado.
+
+    Returns:
+        list: Lista de diccionarios con los campos de cada tarjeta.
+    """
+    return parsear_listado(html, BASE_URL)
+
+
+def _parsear_articulo(html: str) -> str:
+    """
+    Extrae el texto completo de una noticia (solo el cuerpo, sin el texto
+    fijo del sitio).
+
+    Args:
+        html (str): HTML de la página de la noticia.
+
+    Returns:
+        str: Texto de la noticia ('' si la página no tiene párrafos).
+    """
+    return parsear_articulo(html)
+
+
+def _leer_listado(i: int, descargador: Descargador, navegador: _NavegadorRespaldo) -> list:
+    """
+    Descarga y extrae las tarjetas de la página `i` del listado de noticias.
+
+    Args:
+        i (int): Número de página del listado.
+        descargador (Descargador): Cliente HTTP.
+        navegador (_NavegadorRespaldo): Navegador de respaldo para JavaScript.
+
+    Returns:
+        list: Tarjetas de la página.
+    """
+    url_listado = f"{BASE_URL}/noticias/?pagina={i}"
+    html = descargador.obtener(url_listado)
+    tarjetas = _parsear_listado(html) if html else []
+    if not tarjetas:
+        # La página no trae las tarjetas sin JavaScript
+        tarjetas = _parsear_listado(navegador.obtener(url_listado, (POR_CLASE, "noticia")))
+    return tarjetas
+
+
+def _contenido_noticia(tarjeta: dict, html_noticia: Optional[str], navegador: _NavegadorRespaldo) -> str:
+    """
+    Extrae el texto de una noticia descargada, recurriendo al navegador si
+    la página no trae los párrafos sin JavaScript.
+
+    Args:
+        tarjeta (dict): Tarjeta de la noticia.
+        html_noticia (str, optional): HTML descargado (None si falló la descarga).
+        navegador (_NavegadorRespaldo): Navegador de respaldo para JavaScript.
+
+    Returns:
+        str: Texto completo de la noticia.
+    """
     try:
-        driver = webdriver.Chrome(service=Service(ChromeDriverManager().install()), options=options)
+        contenido = _parsear_articulo(html_noticia) if html_noticia else ""
+        if not contenido:
+            contenido = _parsear_articulo(navegador.obtener(tarjeta["notice_url"], (POR_ETIQUETA, "p")))
+        return contenido
     except Exception as e:
-        print(f"Error al inicializar Selenium: {e}")
-        return
+        print(f"Error al cargar el contenido completo de la noticia: {e}")
+        return "Contenido no disponible"
 
-    base_url = "https://www.ucr.ac.cr"
-    x = 3  # Número de páginas a recorrer -para evitar sobrecarga-
-    add = len(df_historico) + 1
 
-    # Listas para almacenar los datos recolectados
-    id_proyecto, titulo_articulo, resumen_art = [], [], []
-    fecha_publicacion, autor_redacta, imagen_url, notice_url, notice_completa = [], [], [], [], []
+def _leer_noticias(tarjetas: list, descargador: Descargador, navegador: _NavegadorRespaldo) -> list:
+    """
+    Descarga en paralelo el texto completo de las noticias de una lista de tarjetas.
+
+    Args:
+        tarjetas (list): Tarjetas obtenidas del listado.
+        descargador (Descargador): Cliente HTTP.
+        navegador (_NavegadorRespaldo): Navegador de respaldo para JavaScript.
+
+    Returns:
+        list: Texto completo de cada noticia, en el orden de `tarjetas`.
+    """
+    paginas = descargador.obtener_varios([t["notice_url"] for t in tarjetas])
+    return [_contenido_noticia(t, html, navegador) for t, html in zip(tarjetas, paginas)]
+
+
+def _normalizar(tarjetas: list, contenidos: list, palabras: Optional[dict] = None) -> pd.DataFrame:
+    """
+    Pasa un lote de noticias por `save_data` (fechas y puntaje de palabras clave).
+
+    Args:
+        tarjetas (list): Tarjetas de las noticias.
+        contenidos (list): Texto completo de cada noticia.
+        palabras (dict, optional): Se llena con las apariciones de cada
+            palabra clave por 'notice_url' (para los agregados).
 
-    detener = False  # detener toda la carga de datos
+    Returns:
+        pd.DataFrame: Filas normalizadas; los ids los asigna el escritor.
+    """
+    return save_data(
+        id_proyecto = [0] * len(tarjetas),  # Los ids los asigna el escritor
+        titulo_articulo = [t["titulo_articulo"] for t in tarjetas],
+        resumen_art = [t["resumen_art"] for t in tarjetas],
+        fecha_publicacion = [t["fecha_publicacion"] for t in tarjetas],
+        autor_redacta = [t["autor_redacta"] for t in tarjetas],
+        imagen_url = [t["imagen_url"] for t in tarjetas],
+        notice_url = [t["notice_url"] for t in tarjetas],
+        notice_completa = contenidos,
+        change_date = [t["fecha_publicacion"] for t in tarjetas],
+        palabras = palabras
+    )
 
+
+def scrape_data(df_path, hilos: int = 4, tasa: float = 2.0,
+                progreso: Optional[Callable[[dict], None]] = None,
+                cancelar: Optional[threading.Event] = None,
+                hilos_parseo: int = 2, hilos_puntaje: int = 1,
+                tam_lote: int = 16, tam_cola: int = 32,
+                usar_cache_http: bool = True, sin_conexion: bool = False,
+                miniaturas: bool = True) -> Optional[int]:
+    """
+    Recorre el listado de noticias de la UCR, descarga las noticias nuevas
+    y las agrega al archivo histórico.
+
+    El proceso es un pipeline de etapas unidas por colas acotadas: listado,
+    descarga de noticias, extracción del texto, normalización y puntaje con
+    spaCy (por lotes) y escritura por lotes. Cada etapa tiene sus propios
+    hilos, así el puntaje se solapa con las descargas, la memoria no crece
+    con el número de páginas y cada lote queda guardado apenas se puntúa.
+
+    Las páginas se descargan por HTTP con un pool de conexiones, un límite
+    de concurrencia por host y un limitador de tasa; Selenium solo se usa
+    como respaldo cuando una página no trae el contenido sin JavaScript.
+    Las noticias ya conocidas (según `IndiceVisto`) no se descargan y el
+    recorrido se detiene en la primera página completamente conocida.
+    Con la caché HTTP las páginas sin cambios se validan con peticiones
+    condicionales (304) en lugar de descargarse de nuevo.
+
+    Con `miniaturas`, una última etapa descarga las imágenes de las noticias
+    guardadas y las reduce a miniaturas en la caché que sirve el dashboard.
+
+    Los tiempos y contadores de cada etapa y de cada noticia se registran
+    en `metricas` y se exportan al terminar (ver `function.metricas`).
+
+    Args:
+        df_path (str): Ruta del histórico (archivo CSV o carpeta Parquet).
+        hilos (int): Descargas simultáneas de noticias.
+        tasa (float): Peticiones por segundo permitidas.
+        progreso (Callable, optional): Recibe un diccionario con 'paginas',
+            'total_paginas', 'articulos' y 'eta' (segundos) tras cada página.
+        cancelar (threading.Event, optional): Si se activa, se deja de recorrer
+            páginas y se guarda lo recolectado hasta ese momento.
+        hilos_parseo (int): Hilos que extraen el texto de las noticias.
+        hilos_puntaje (int): Hilos que normalizan y puntúan los lotes.
+        tam_lote (int): Noticias por lote de puntaje y escritura.
+        tam_cola (int): Capacidad de las colas entre etapas.
+        usar_cache_http (bool): Guardar las respuestas y usar peticiones condicionales.
+        sin_conexion (bool): Reproducir las páginas desde la caché HTTP, sin red.
+        miniaturas (bool): Descargar las miniaturas de las imágenes (no aplica sin conexión).
+
+    Returns:
+        Optional[int]: Número de noticias nuevas guardadas (None si hubo un error).
+    """
+    with metricas.ejecucion("scraping") as registro:
+        return _scrape_data(df_path, registro, hilos, tasa, progreso, cancelar,
+                            hilos_parseo, hilos_puntaje, tam_lote, tam_cola,
+                            usar_cache_http, sin_conexion, miniaturas)
+
+
+def _scrape_data(df_path, registro: metricas.Metricas, hilos, tasa, progreso, cancelar,
+                 hilos_parseo, hilos_puntaje, tam_lote, tam_cola,
+                 usar_cache_http, sin_conexion, miniaturas) -> Optional[int]:
     try:
+        escritor = EscritorHistorico(df_path)
+    except Exception as e:
+        print(f"Error al leer el histórico: {e}")
+        return None
+
+    indice = escritor.indice
+    last_date, n_filas = indice.ultima_fecha, indice.n_filas
+    if n_filas == 0:
+        print("No hay datos previos. Iniciando desde el principio.")
+
+    descargador = Descargador(max_por_host=hilos, tasa=tasa, sin_conexion=sin_conexion,
+                              cache=obtener_cache_http() if usar_cache_http or sin_conexion else None)
+    navegadores = []  # Un navegador de respaldo por hilo (Selenium no es seguro entre hilos)
+    local = threading.local()
+
+    def navegador_hilo() -> _NavegadorRespaldo:
+        if not hasattr(local, "navegador"):
+            local.navegador = _NavegadorRespaldo(sin_conexion)
+            navegadores.append(local.navegador)
+        return local.navegador
+
+    x = 3  # Número de páginas a recorrer -para evitar sobrecarga-
+    inicio = time.monotonic()
+    guardadas = [0]
+
+    # Etapa 1: listado (en el hilo actual, página por página)
+    def listado():
+        vistas = set()  # Noticias ya emitidas en esta ejecución (las páginas pueden solaparse)
         for i in range(1, x + 1):
-            if detener:
-                print("Detención activada. Saliendo del bucle de páginas.")
-                break  # Salir del bucle de páginas
+            if cancelar is not None and cancelar.is_set():
+                print("Actualización cancelada. Guardando lo recolectado.")
+                return
 
-            driver.get(f"{base_url}/noticias/?pagina={i}")
-            WebDriverWait(driver, 10).until(EC.presence_of_all_elements_located((By.CLASS_NAME, "noticia")))
+            try:
+                with registro.medir("listado"):
+                    tarjetas = _leer_listado(i, descargador, navegador_hilo())
+                registro.contar("paginas_listado")
+            except Exception as e:
+                print(f"Error en la página {i}: {e}")
+                return
 
-            soup = bs(driver.page_source, 'html.parser')
-            noticias = soup.find_all("div", class_="noticia item tarjeta")
+            # Descartar las noticias ya guardadas o ya emitidas antes de descargarlas
+            nuevas = [t for t in tarjetas
+                      if t["notice_url"] not in vistas and not escritor.conocido(t["notice_url"])]
+            vistas.update(t["notice_url"] for t in nuevas)
+            if tarjetas and not nuevas:
+                print("Página completamente conocida. Deteniendo scraping.")
+                return
 
-            for notice in noticias:
-                if detener:
-                    print("Detención activada. Saliendo del bucle de noticias.")
-                    break  # Salir del bucle de noticias
+            yield from nuevas
 
-                enlace = notice.find("a", class_='marco')
-                if not enlace:
-                    continue
+            if progreso is not None:
+                transcurrido = time.monotonic() - inicio
+                progreso({
+                    "paginas": i,
+                    "total_paginas": x,
+                    "articulos": guardadas[0],
+                    "eta": transcurrido / i * (x - i),
+                })
 
-                fecha_ = notice.find("span", class_='dia')
-                fecha_text = fecha_.text.strip() if fecha_ else ""
+            # Detener el scraping tras una página más antigua que la marca de agua
+            fechas, _ = parsear_fechas(pd.Series([t["fecha_publicacion"] for t in tarjetas], dtype="object"))
+            if last_date is not None and len(fechas) and (fechas < last_date).all():
+                print("Fecha límite encontrada. Deteniendo scraping.")
+                return
 
-                # Detener el scraping si se encuentra la fecha límite
-                if last_date and fecha_text == last_date:
-                    print("Fecha límite encontrada. Deteniendo scraping.")
-                    detener = True
-                    break  # Salir del bucle de noticias
+    # Etapa 2: descarga de cada noticia
+    def descargar(tarjeta, emitir):
+        inicio_descarga = time.perf_counter()
+        html_noticia = descargador.obtener(tarjeta["notice_url"])
+        registro.articulo(tarjeta["notice_url"], descarga_s=time.perf_counter() - inicio_descarga,
+                          bytes=len(html_noticia or ""))
+        emitir((tarjeta, html_noticia))
 
-                titulo_articulo.append(enlace.text.strip())
-                fecha_publicacion.append(fecha_text)
-                resumen_ = notice.find("p", class_='resumen')
-                resumen_art.append(resumen_.text.strip() if resumen_ else "Sin resumen")
+    # Etapa 3: extracción del texto
+    def parsear(elemento, emitir):
+        tarjeta, html_noticia = elemento
+        inicio_parseo = time.perf_counter()
+        contenido = _contenido_noticia(tarjeta, html_noticia, navegador_hilo())
+        registro.articulo(tarjeta["notice_url"], parseo_s=time.perf_counter() - inicio_parseo)
+        emitir((tarjeta, contenido))
 
-                imagen = notice.find("img")
-                imagen_url.append(imagen['src'] if imagen else None)
+    # Etapa 4: normalización y puntaje por lotes
+    def normalizar_lote(lote):
+        inicio_lote = time.perf_counter()
+        palabras = {}
+        df_lote = _normalizar([t for t, _ in lote], [c for _, c in lote], palabras)
+        # Tiempo del lote repartido entre sus noticias
+        parte = (time.perf_counter() - inicio_lote) / len(lote)
+        for tarjeta, _ in lote:
+            registro.articulo(tarjeta["notice_url"], puntaje_s=parte)
+        return df_lote, palabras
 
-                autor = notice.find("div", class_='autores')
-                autor_redacta.append(autor.text.strip() if autor else "Desconocido")
+    def puntuar(elemento, emitir):
+        lote = local.__dict__.setdefault("lote", [])
+        lote.append(elemento)
+        if len(lote) >= tam_lote:
+            emitir(normalizar_lote(lote))
+            lote.clear()
 
-                noticia_url = urljoin(base_url, enlace.get("href"))
-                notice_url.append(noticia_url)
+    def vaciar_lote(emitir):
+        lote = local.__dict__.get("lote")
+        if lote:
+            emitir(normalizar_lote(lote))
+            lote.clear()
 
-                # Cargar contenido completo de la noticia
-                try:
-                    driver.get(noticia_url)
-                    WebDriverWait(driver, 10).until(EC.presence_of_all_elements_located((By.TAG_NAME, "p")))
-                    contenido_completo = ' '.join([p.text for p in bs(driver.page_source, "html.parser").find_all("p")])
-                    notice_completa.append(contenido_completo.replace("TEXTO_BASURA", "").strip())
-                except Exception as e:
-                    print(f"Error al cargar el contenido completo de la noticia: {e}")
-                    notice_completa.append("Contenido no disponible")
+    # Etapa 5: escritura por lotes
+    def escribir(elemento, emitir):
+        df_nuevo, palabras = elemento
+        inicio_escritura = time.perf_counter()
+        escrito = escritor.escribir(df_nuevo)
+        agregar_a_cache(df_path, escrito)
+        with registro.medir("agregados"):
+            # Con las apariciones del puntaje: no se vuelve a lematizar
+            actualizar_agregados(df_path, escrito, palabras)
+        guardadas[0] += len(escrito)
+        registro.contar("articulos_guardados", len(escrito))
+        if len(escrito):
+            parte = (time.perf_counter() - inicio_escritura) / len(escrito)
+            for url in escrito['notice_url']:
+                registro.articulo(url, escritura_s=parte)
+            for url in escrito['imagen_url'].dropna():
+                emitir(url)
 
-                id_proyecto.append(f'{add:06}')
-                add += 1
+    # Etapa 6: miniaturas de las imágenes de las noticias guardadas
+    cache_miniaturas = obtener_cache_miniaturas() if miniaturas and not sin_conexion else None
 
-                time.sleep(random.uniform(1, 3))  # Pausa para evitar bloqueos
+    def miniatura(imagen_url, emitir):
+        if cache_miniaturas.descargar_una(imagen_url, descargador):
+            registro.contar("miniaturas")
 
-    except Exception as e:
-        print(f"Error en la página {i}: {e}")
+    pipeline = (
+        Pipeline(tam_cola=tam_cola)
+        .etapa("descarga", descargar, hilos=hilos)
+        .etapa("parseo", parsear, hilos=hilos_parseo)
+        .etapa("puntaje", puntuar, hilos=hilos_puntaje, final=vaciar_lote)
+        .etapa("escritura", escribir, hilos=1)
+    )
+    if cache_miniaturas is not None:
+        pipeline.etapa("miniaturas", miniatura, hilos=hilos)
 
+    try:
+        pipeline.ejecutar(listado())
+    except Exception as e:
+        print(f"Error durante el scraping: {e}")
+        return None
     finally:
-        driver.quit()
+        descargador.cerrar()
+        for navegador in navegadores:
+            navegador.cerrar()
+
+    errores = sum(etapa.errores for etapa in pipeline.etapas)
+    if errores:
+        print(f"Scraping completado con {errores} errores en las etapas.")
+    print(f"Scraping completado exitosamente. {guardadas[0]} noticias nuevas guardadas.")
+    return guardadas[0]
+
+
+def _ruta_checkpoint(df_path: str) -> str:
+    """Ruta del archivo con las páginas ya completadas por el backfill."""
+    return f"{str(df_path).rstrip('/')}.backfill.json"
+
+
+def backfill(df_path, pagina_inicio: int, pagina_fin: int, tam_bloque: int = 10,
+             workers: int = 4, tasa: float = 2.0, usar_cache_http: bool = True,
+             sin_conexion: bool = False, miniaturas: bool = True):
+    """
+    Carga histórica profunda: recorre un rango de páginas del listado en
+    bloques procesados por varios hilos bajo un limitador de tasa global.
+
+    Cada página completada se guarda de inmediato (con la misma
+    normalización de `save_data`) y se registra en un checkpoint, de modo
+    que un backfill interrumpido continúa donde quedó.
+
+    Args:
+        df_path (str): Ruta del histórico (archivo CSV o carpeta Parquet).
+        pagina_inicio (int): Primera página del listado (inclusive).
+        pagina_fin (int): Última página del listado (inclusive).
+        tam_bloque (int): Páginas por bloque de trabajo.
+        workers (int): Bloques procesados en paralelo.
+        tasa (float): Peticiones por segundo permitidas entre todos los hilos.
+        usar_cache_http (bool): Guardar las respuestas y usar peticiones condicionales.
+        sin_conexion (bool): Reproducir las páginas desde la caché HTTP, sin red.
+        miniaturas (bool): Descargar las miniaturas de las imágenes (no aplica sin conexión).
+    """
+    escritor = EscritorHistorico(df_path)
+    ruta_checkpoint = _ruta_checkpoint(df_path)
+    completadas = set()
+    if os.path.exists(ruta_checkpoint):
+        with open(ruta_checkpoint, encoding="utf-8") as f:
+            completadas = set(json.load(f))
+        print(f"Retomando backfill: {len(completadas)} páginas ya completadas.")
+
+    pendientes = [i for i in range(pagina_inicio, pagina_fin + 1) if i not in completadas]
+    bloques = [pendientes[k:k + tam_bloque] for k in range(0, len(pendientes), tam_bloque)]
+
+    # Un solo descargador: el limitador de tasa y el pool son globales
+    descargador = Descargador(max_por_host=workers, tasa=tasa, sin_conexion=sin_conexion,
+                              cache=obtener_cache_http() if usar_cache_http or sin_conexion else None)
+    cache_miniaturas = obtener_cache_miniaturas() if miniaturas and not sin_conexion else None
+    lock = threading.Lock()
+    vistas = set()  # Noticias ya tomadas por alguna página en esta ejecución
+
+    def guardar_pagina(i: int, tarjetas: list, contenidos: list) -> None:
+        if tarjetas:
+            # El escritor descarta las noticias que otra página ya guardó
+            palabras = {}
+            escrito = escritor.escribir(_normalizar(tarjetas, contenidos, palabras))
+            agregar_a_cache(df_path, escrito)
+            actualizar_agregados(df_path, escrito, palabras)
+            if cache_miniaturas is not None:
+                with registro.medir("miniaturas"):
+                    registro.contar("miniaturas", cache_miniaturas.descargar(escrito['imagen_url'], descargador))
+
+        with lock:
+            completadas.add(i)
+            temporal = f"{ruta_checkpoint}.tmp"
+            with open(temporal, "w", encoding="utf-8") as f:
+                json.dump(sorted(completadas), f)
+            os.replace(temporal, ruta_checkpoint)
+
+    def procesar_bloque(bloque: list) -> None:
+        navegador = _NavegadorRespaldo(sin_conexion)
+        try:
+            with metricas.perfil_hilo():
+                for i in bloque:
+                    with registro.medir("listado"):
+                        tarjetas = _leer_listado(i, descargador, navegador)
+                    with lock:
+                        # Si la paginación se corrió, otra página ya pudo tomar la noticia
+                        nuevas = [t for t in tarjetas
+                                  if t["notice_url"] not in vistas and not escritor.conocido(t["notice_url"])]
+                        vistas.update(t["notice_url"] for t in nuevas)
+                    with registro.medir("noticias"):
+                        contenidos = _leer_noticias(nuevas, descargador, navegador)
+                    with registro.medir("guardado"):
+                        guardar_pagina(i, nuevas, contenidos)
+                    registro.contar("paginas_listado")
+                    registro.contar("articulos_guardados", len(nuevas))
+                    print(f"Backfill: página {i} completada ({len(nuevas)} noticias nuevas).")
+        finally:
+            navegador.cerrar()
 
-    # Guardar los datos recolectados
     try:
-        id_proyecto = [int(last_id) + int(n) for n in id_proyecto]
-
-        df_nuevo = save_data(
-            id_proyecto = id_proyecto,
-            titulo_articulo = titulo_articulo,
-            resumen_art = resumen_art,
-            fecha_publicacion = fecha_publicacion,
-            autor_redacta = autor_redacta,
-            imagen_url = imagen_url,
-            notice_url = notice_url,
-            notice_completa = notice_completa,
-            change_date = fecha_publicacion
-        )
-
-        df_nuevo.to_csv(df_path, mode='a', header=not os.path.exists(df_path), index=False)
-        
-        print("Scraping completado y datos guardados.")
-    except Exception as e:
-        print(f"Error al guardar los datos: {e}")
+        with metricas.ejecucion("backfill") as registro, ThreadPoolExecutor(max_workers=workers) as pool:
+            for futuro in [pool.submit(procesar_bloque, bloque) for bloque in bloques]:
+                try:
+                    futuro.result()
+                except Exception as e:
+                    print(f"Error en un bloque del backfill: {e}")
+    finally:
+        descargador.cerrar()
 
-    print("Scraping completado exitosamente.")
\ No newline at end of file
+    print(f"Backfill finalizado: {len(completadas)} páginas completadas.")
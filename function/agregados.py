@@ -0,0 +1,407 @@
+# agregados.py
+
+import os
+import sqlite3
+import threading
+from collections import Counter
+from typing import Dict, List, Optional
+
+import pandas as pd
+
+from function.almacenamiento import leer_por_bloques
+from function.indice_visto import IndiceVisto
+
+# Periodos de los agregados: la fecha de inicio de cada uno
+PERIODOS = ("dia", "semana", "mes")
+
+# Formato de las tablas; cambiarlo obliga a reconstruir los agregados
+FORMATO_AGREGADOS = 1
+
+# Columnas del histórico que necesitan los agregados
+COLUMNAS_AGREGADOS = ['fecha_publicacion_CD', 'autor_redacta', 'n_by_tex', 'puntaje_ponderado', 'noticia_completa']
+
+ESQUEMA = """
+CREATE TABLE IF NOT EXISTS meta (
+    clave TEXT PRIMARY KEY,
+    valor TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS conteos (
+    periodo TEXT NOT NULL,
+    inicio TEXT NOT NULL,
+    articulos INTEGER NOT NULL,
+    aciertos INTEGER NOT NULL,
+    puntaje REAL NOT NULL,
+    PRIMARY KEY (periodo, inicio)
+);
+CREATE TABLE IF NOT EXISTS palabras (
+    periodo TEXT NOT NULL,
+    inicio TEXT NOT NULL,
+    palabra TEXT NOT NULL,
+    articulos INTEGER NOT NULL,
+    aciertos INTEGER NOT NULL,
+    PRIMARY KEY (periodo, inicio, palabra)
+);
+CREATE TABLE IF NOT EXISTS autores (
+    periodo TEXT NOT NULL,
+    inicio TEXT NOT NULL,
+    autor TEXT NOT NULL,
+    articulos INTEGER NOT NULL,
+    aciertos INTEGER NOT NULL,
+    puntaje REAL NOT NULL,
+    PRIMARY KEY (periodo, inicio, autor)
+);
+"""
+
+
+def ruta_agregados(df_path: str) -> str:
+    """Ruta de la base de agregados asociada a un histórico."""
+    return f"{str(df_path).rstrip('/')}.agregados.sqlite"
+
+
+def inicio_periodo(fechas: pd.Series, periodo: str) -> pd.Series:
+    """
+    Fecha de inicio ('YYYY-MM-DD') del día, la semana (lunes) o el mes de cada fecha.
+
+    Args:
+        fechas (pd.Series): Fechas de publicación.
+        periodo (str): 'dia', 'semana' o 'mes'.
+
+    Returns:
+        pd.Series: Inicio del periodo de cada fecha, como texto.
+    """
+    dias = pd.to_datetime(fechas).dt.normalize()
+    if periodo == "semana":
+        dias = dias - pd.to_timedelta(dias.dt.weekday, unit="D")
+    elif periodo == "mes":
+        dias = dias - pd.to_timedelta(dias.dt.day - 1, unit="D")
+    elif periodo != "dia":
+        raise ValueError(f"Periodo desconocido: {periodo} (opciones: {', '.join(PERIODOS)})")
+    return dias.dt.strftime("%Y-%m-%d")
+
+
+def _limite(fecha, periodo: str = "dia") -> Optional[str]:
+    if fecha is None:
+        return None
+    return inicio_periodo(pd.Series([pd.Timestamp(fecha)]), periodo).iloc[0]
+
+
+class Agregados:
+    """
+    Agregados por día, semana y mes del histórico, en una base SQLite junto
+    al histórico: noticias, aciertos de palabras clave y puntaje ponderado
+    por periodo, aciertos de cada palabra clave y totales por autor.
+
+    Se actualizan de forma incremental con `agregar` cada vez que se
+    escriben filas nuevas, así el dashboard responde los cambios de rango de
+    fechas con consultas sobre los agregados en lugar de recorrer el texto.
+
+    Args:
+        ruta (str): Archivo SQLite de los agregados.
+    """
+
+    def __init__(self, ruta: str):
+        self.ruta = ruta
+        self._lock = threading.Lock()
+        os.makedirs(os.path.dirname(os.path.abspath(ruta)), exist_ok=True)
+        self._conn = sqlite3.connect(ruta, check_same_thread=False, timeout=60)
+        self._conn.executescript(ESQUEMA)
+        self._conn.commit()
+
+    # === Estado ===
+
+    def meta(self) -> Dict[str, str]:
+        """Datos con los que se construyeron los agregados (formato, vocabulario, filas)."""
+        with self._lock:
+            return dict(self._conn.execute("SELECT clave, valor FROM meta"))
+
+    def vaciar(self, **meta) -> None:
+        """Borra todos los agregados y guarda los datos de `meta` (con `n_filas` en 0)."""
+        with self._lock:
+            for tabla in ("meta", "conteos", "palabras", "autores"):
+                self._conn.execute(f"DELETE FROM {tabla}")
+            meta = {"formato": FORMATO_AGREGADOS, "n_filas": 0, **meta}
+            self._conn.executemany("INSERT INTO meta VALUES (?, ?)", [(k, str(v)) for k, v in meta.items()])
+            self._conn.commit()
+
+    # === Actualización ===
+
+    def agregar(self, df: pd.DataFrame, palabras: Optional[List[Optional[Counter]]] = None) -> None:
+        """
+        Suma un lote de filas nuevas a los agregados.
+
+        Args:
+            df (pd.DataFrame): Filas con 'fecha_publicacion_CD', 'autor_redacta',
+                'n_by_tex' y 'puntaje_ponderado'.
+            palabras (List[Counter], optional): Apariciones de cada palabra
+                clave por fila, en el orden de `df` (ver `contar_palabras`).
+        """
+        if df.empty:
+            return
+        base = pd.DataFrame({
+            "fecha": pd.to_datetime(df['fecha_publicacion_CD']).to_numpy(),
+            "autor": df['autor_redacta'].astype("string").fillna("Desconocido").to_numpy(),
+            "aciertos": pd.to_numeric(df['n_by_tex'], errors="coerce").fillna(0).astype("int64").to_numpy(),
+            "puntaje": pd.to_numeric(df['puntaje_ponderado'], errors="coerce").fillna(0).to_numpy()
+                       if 'puntaje_ponderado' in df.columns else 0.0,
+        })
+        if palabras is not None:
+            base["palabras"] = list(palabras)
+        base = base.loc[base["fecha"].notna()].reset_index(drop=True)
+
+        conteos, por_palabra, por_autor = [], [], []
+        for periodo in PERIODOS:
+            base["inicio"] = inicio_periodo(base["fecha"], periodo)
+            grupos = base.groupby("inicio").agg(articulos=("fecha", "size"), aciertos=("aciertos", "sum"),
+                                                puntaje=("puntaje", "sum"))
+            conteos += [(periodo, f.Index, int(f.articulos), int(f.aciertos), float(f.puntaje))
+                        for f in grupos.itertuples()]
+            grupos = base.groupby(["inicio", "autor"]).agg(articulos=("fecha", "size"), aciertos=("aciertos", "sum"),
+                                                           puntaje=("puntaje", "sum"))
+            por_autor += [(periodo, *f.Index, int(f.articulos), int(f.aciertos), float(f.puntaje))
+                          for f in grupos.itertuples()]
+            if palabras is not None:
+                suma = {}
+                for inicio, encontradas in zip(base["inicio"], base["palabras"]):
+                    for palabra, n in (encontradas or {}).items():
+                        articulos, aciertos = suma.get((inicio, palabra), (0, 0))
+                        suma[(inicio, palabra)] = (articulos + 1, aciertos + n)
+                por_palabra += [(periodo, inicio, palabra, articulos, aciertos)
+                                for (inicio, palabra), (articulos, aciertos) in suma.items()]
+
+        with self._lock:
+            self._conn.executemany(
+                "INSERT INTO conteos VALUES (?, ?, ?, ?, ?) ON CONFLICT (periodo, inicio) DO UPDATE SET"
+                " articulos = articulos + excluded.articulos, aciertos = aciertos + excluded.aciertos,"
+                " puntaje = puntaje + excluded.puntaje", conteos)
+            self._conn.executemany(
+                "INSERT INTO autores VALUES (?, ?, ?, ?, ?, ?) ON CONFLICT (periodo, inicio, autor) DO UPDATE SET"
+                " articulos = articulos + excluded.articulos, aciertos = aciertos + excluded.aciertos,"
+                " puntaje = puntaje + excluded.puntaje", por_autor)
+            self._conn.executemany(
+                "INSERT INTO palabras VALUES (?, ?, ?, ?, ?) ON CONFLICT (periodo, inicio, palabra) DO UPDATE SET"
+                " articulos = articulos + excluded.articulos, aciertos = aciertos + excluded.aciertos", por_palabra)
+            # Filas incorporadas (incluidas las sin fecha), para detectar agregados desactualizados
+            self._conn.execute(
+                "INSERT INTO meta VALUES ('n_filas', ?) ON CONFLICT (clave) DO UPDATE SET"
+                " valor = CAST(valor AS INTEGER) + excluded.valor", (len(df),))
+            self._conn.commit()
+
+    # === Consultas ===
+
+    def _consultar(self, sql: str, parametros: tuple) -> pd.DataFrame:
+        with self._lock:
+            return pd.read_sql_query(sql, self._conn, params=parametros)
+
+    def serie(self, periodo: str = "mes", desde=None, hasta=None) -> pd.DataFrame:
+        """
+        Noticias, aciertos y puntaje por periodo dentro del rango de fechas
+        (se incluyen los periodos que tocan el rango).
+
+        Args:
+            periodo (str): 'dia', 'semana' o 'mes'.
+            desde (optional): Fecha mínima.
+            hasta (optional): Fecha máxima.
+
+        Returns:
+            pd.DataFrame: Columnas 'inicio', 'articulos', 'aciertos' y 'puntaje', en orden de fecha.
+        """
+        return self._consultar(
+            "SELECT inicio, articulos, aciertos, puntaje FROM conteos WHERE periodo = ?"
+            " AND (? IS NULL OR inicio >= ?) AND (? IS NULL OR inicio <= ?) ORDER BY inicio",
+            (periodo, *[_limite(desde, periodo)] * 2, *[_limite(hasta, periodo)] * 2))
+
+    def palabras(self, desde=None, hasta=None, periodo: Optional[str] = None) -> pd.DataFrame:
+        """
+        Aciertos de cada palabra clave en el rango de fechas, a partir de los
+        agregados diarios; con `periodo`, desglosados por periodo.
+
+        Args:
+            desde (optional): Fecha mínima (inclusive).
+            hasta (optional): Fecha máxima (inclusive).
+            periodo (str, optional): 'dia', 'semana' o 'mes' para obtener una serie por palabra.
+
+        Returns:
+            pd.DataFrame: 'palabra', 'articulos' y 'aciertos' (y 'inicio' con `periodo`).
+        """
+        if periodo is None:
+            return self._consultar(
+                "SELECT palabra, SUM(articulos) AS articulos, SUM(aciertos) AS aciertos FROM palabras"
+                " WHERE periodo = 'dia' AND (? IS NULL OR inicio >= ?) AND (? IS NULL OR inicio <= ?)"
+                " GROUP BY palabra ORDER BY aciertos DESC, palabra",
+                (*[_limite(desde)] * 2, *[_limite(hasta)] * 2))
+        return self._consultar(
+            "SELECT inicio, palabra, articulos, aciertos FROM palabras WHERE periodo = ?"
+            " AND (? IS NULL OR inicio >= ?) AND (? IS NULL OR inicio <= ?) ORDER BY inicio, palabra",
+            (periodo, *[_limite(desde, periodo)] * 2, *[_limite(hasta, periodo)] * 2))
+
+    def autores(self, desde=None, hasta=None, limite: Optional[int] = None) -> pd.DataFrame:
+        """
+        Totales por autor en el rango de fechas, a partir de los agregados diarios.
+
+        Args:
+            desde (optional): Fecha mínima (inclusive).
+            hasta (optional): Fecha máxima (inclusive).
+            limite (int, optional): Número máximo de autores (los de más noticias).
+
+        Returns:
+            pd.DataFrame: 'autor', 'articulos', 'aciertos' y 'puntaje'.
+        """
+        return self._consultar(
+            "SELECT autor, SUM(articulos) AS articulos, SUM(aciertos) AS aciertos, SUM(puntaje) AS puntaje"
+            " FROM autores WHERE periodo = 'dia' AND (? IS NULL OR inicio >= ?) AND (? IS NULL OR inicio <= ?)"
+            " GROUP BY autor ORDER BY articulos DESC, autor LIMIT ?",
+            (*[_limite(desde)] * 2, *[_limite(hasta)] * 2, -1 if limite is None else limite))
+
+    def cerrar(self) -> None:
+        """Cierra la conexión con la base de agregados."""
+        self._conn.close()
+
+
+def palabras_por_fila(df: pd.DataFrame) -> List[Optional[Counter]]:
+    """
+    Apariciones de cada palabra clave del vocabulario en el texto de cada
+    fila (los lemas salen de la caché de lemas si el texto ya se puntuó).
+
+    Args:
+        df (pd.DataFrame): Filas con 'noticia_completa'.
+
+    Returns:
+        List[Optional[Counter]]: Apariciones por fila.
+    """
+    from function import vocabulario
+    from function.procesamiento_texto import contar_palabras
+
+    vocab = vocabulario.cargar()
+    return contar_palabras(df, "noticia_completa", stopwords_list=vocab.stopwords,
+                           key_words=vocab.key_words, ids=vocab.ids)
+
+
+def _version_vocabulario() -> str:
+    from function import vocabulario
+
+    return vocabulario.cargar().version
+
+
+_lock = threading.Lock()
+_abiertos: Dict[str, Agregados] = {}
+
+
+def _abrir(df_path: str) -> Agregados:
+    ruta = os.path.abspath(ruta_agregados(df_path))
+    with _lock:
+        if ruta not in _abiertos:
+            _abiertos[ruta] = Agregados(ruta)
+        return _abiertos[ruta]
+
+
+def vigentes(agregados: Agregados, df_path: str) -> bool:
+    """
+    Indica si los agregados corresponden al histórico: mismo formato, mismo
+    vocabulario y el mismo número de filas que el índice de noticias vistas.
+    Solo lee la marca de agua del índice (se llama desde el dashboard): si
+    el índice no existe, los agregados no están vigentes.
+    """
+    meta = agregados.meta()
+    marca = IndiceVisto.leer_meta(df_path)
+    return (marca is not None
+            and meta.get("formato") == str(FORMATO_AGREGADOS)
+            and meta.get("vocabulario") == _version_vocabulario()
+            and meta.get("n_filas") == str(marca["n_filas"]))
+
+
+def abrir_para_reconstruir(df_path: str) -> Agregados:
+    """
+    Vacía los agregados del histórico para volver a sumarlo completo con
+    `Agregados.agregar` (lo usan `reconstruir` y el rescore).
+
+    Args:
+        df_path (str): Ruta del histórico.
+
+    Returns:
+        Agregados: Agregados vacíos, marcados con el vocabulario actual.
+    """
+    agregados = _abrir(df_path)
+    agregados.vaciar(vocabulario=_version_vocabulario())
+    return agregados
+
+
+def reconstruir(df_path: str, tam_bloque: int = 2000) -> Agregados:
+    """
+    Vuelve a calcular los agregados de todo el histórico, por bloques.
+    Lematiza todo el texto (salvo lo que esté en la caché de lemas): debe
+    llamarse en segundo plano, no desde el dashboard.
+
+    Args:
+        df_path (str): Ruta del histórico.
+        tam_bloque (int): Filas por bloque.
+
+    Returns:
+        Agregados: Agregados reconstruidos.
+    """
+    agregados = abrir_para_reconstruir(df_path)
+    if not os.path.exists(df_path):
+        return agregados
+    print("Construyendo los agregados del histórico.")
+    for bloque in leer_por_bloques(df_path, columnas=COLUMNAS_AGREGADOS, tam_bloque=tam_bloque):
+        agregados.agregar(bloque, palabras_por_fila(bloque))
+    # `vigentes` solo lee la marca de agua: si falta, se construye aquí, en segundo plano
+    if IndiceVisto.leer_meta(df_path) is None:
+        IndiceVisto.cargar(df_path)
+    return agregados
+
+
+def obtener_agregados(df_path: str) -> Optional[Agregados]:
+    """
+    Devuelve los agregados guardados del histórico, compartidos por el
+    proceso, solo si están al día. No los reconstruye: eso lematiza todo el
+    histórico y se hace en segundo plano (`reconstruir`) o al terminar un
+    rescore.
+
+    Args:
+        df_path (str): Ruta del histórico.
+
+    Returns:
+        Optional[Agregados]: Agregados listos para consultar, o None si no
+        existen o están desactualizados.
+    """
+    if not os.path.exists(ruta_agregados(df_path)):
+        return None
+    agregados = _abrir(df_path)
+    return agregados if vigentes(agregados, df_path) else None
+
+
+def actualizar_agregados(df_path: str, df_nuevo: pd.DataFrame,
+                         palabras: Optional[Dict[str, Counter]] = None) -> None:
+    """
+    Suma filas recién escritas a los agregados del histórico, si ya existen
+    (si no, se construyen completos con `reconstruir`).
+
+    Args:
+        df_path (str): Ruta del histórico.
+        df_nuevo (pd.DataFrame): Filas escritas por `EscritorHistorico`.
+        palabras (Dict[str, Counter], optional): Apariciones de cada palabra
+            clave por 'notice_url', tal como las calculó el puntaje
+            (`save_data(palabras=...)`). Solo se lematizan las filas que falten.
+    """
+    if df_nuevo is None or df_nuevo.empty or not os.path.exists(ruta_agregados(df_path)):
+        return
+    palabras = palabras or {}
+    por_fila = [palabras.get(url) for url in df_nuevo['notice_url']]
+    faltantes = [pos for pos, (url, encontradas) in enumerate(zip(df_nuevo['notice_url'], por_fila))
+                 if encontradas is None and url not in palabras]
+    if faltantes:
+        for pos, encontradas in zip(faltantes, palabras_por_fila(df_nuevo.iloc[faltantes])):
+            por_fila[pos] = encontradas
+    _abrir(df_path).agregar(df_nuevo, por_fila)
+
+
+def invalidar_agregados(df_path: str) -> None:
+    """
+    Marca los agregados como desactualizados (por ejemplo, después de un
+    rescore con palabras clave distintas a las del vocabulario).
+
+    Args:
+        df_path (str): Ruta del histórico.
+    """
+    if os.path.exists(ruta_agregados(df_path)):
+        _abrir(df_path).vaciar(vocabulario="")
@@ -0,0 +1,462 @@
+# almacenamiento.py
+
+import json
+import os
+import shutil
+import uuid
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+import pandas as pd
+
+from function.fechas import parsear_fechas
+from function import almacenamiento_sqlite
+
+# Columnas del histórico y su tipo en memoria
+COLUMNAS = {
+    'id_atributo': "int64",
+    'titulo_articulo': "string",
+    'resumen_art': "string",
+    'fecha_publicacion': "string",
+    'autor_redacta': "string",
+    'imagen_url': "string",
+    'notice_url': "string",
+    'noticia_completa': "string",
+    'fecha_publicacion_CD': "datetime64[ns]",
+    'n_by_tex': "int64",
+    'puntaje_ponderado': "float64",
+}
+
+# Columnas con pocos valores distintos que pueden leerse como categóricas
+CATEGORICAS = ('autor_redacta',)
+
+# Columna de partición del almacenamiento Parquet (año-mes de publicación)
+COLUMNA_PARTICION = "mes"
+
+# Filas por bloque en las lecturas por bloques
+TAM_BLOQUE = 5000
+
+
+def es_csv(ruta: str) -> bool:
+    """Indica si la ruta corresponde a un histórico en CSV."""
+    return str(ruta).lower().endswith(".csv")
+
+
+def _tipar(df: pd.DataFrame, categoricas: bool = False) -> pd.DataFrame:
+    """
+    Convierte las columnas conocidas del histórico a su tipo.
+
+    Args:
+        df (pd.DataFrame): Datos leídos o por escribir.
+        categoricas (bool): Convertir las columnas de `CATEGORICAS` a 'category'.
+
+    Returns:
+        pd.DataFrame: Datos con los tipos de `COLUMNAS`.
+    """
+    for columna, tipo in COLUMNAS.items():
+        if columna not in df.columns:
+            continue
+        if categoricas and columna in CATEGORICAS:
+            df[columna] = df[columna].astype("category")
+        elif tipo.startswith("datetime"):
+            df[columna], _ = parsear_fechas(df[columna])
+        elif tipo in ("int64", "float64"):
+            df[columna] = pd.to_numeric(df[columna], errors="coerce").fillna(0).astype(tipo)
+        else:
+            df[columna] = df[columna].astype(tipo)
+    return df
+
+
+def _filtro_parquet(desde, hasta):
+    import pyarrow.dataset as pds
+
+    filtro = None
+    for limite, comparar in ((desde, "ge"), (hasta, "le")):
+        if limite is None:
+            continue
+        limite = pd.Timestamp(limite)
+        fecha = pds.field('fecha_publicacion_CD')
+        mes = pds.field(COLUMNA_PARTICION)
+        # La condición sobre `mes` permite descartar particiones completas
+        if comparar == "ge":
+            condicion = (mes >= limite.strftime("%Y-%m")) & (fecha >= limite.to_pydatetime())
+        else:
+            condicion = (mes <= limite.strftime("%Y-%m")) & (fecha <= limite.to_pydatetime())
+        filtro = condicion if filtro is None else filtro & condicion
+    return filtro
+
+
+def _unificar_esquema(dataset, ruta: str):
+    import pyarrow as pa
+    import pyarrow.dataset as pds
+
+    esquemas = [fragmento.physical_schema for fragmento in dataset.get_fragments()]
+    esquema = pa.unify_schemas(esquemas + [dataset.schema], promote_options="permissive")
+    return pds.dataset(ruta, format="parquet", partitioning="hive", schema=esquema)
+
+
+def _leer_csv(ruta: str, columnas: Optional[List[str]], categoricas: bool, **opciones):
+    # Las columnas pedidas que el archivo no tiene (un histórico anterior a
+    # 'puntaje_ponderado') se agregan vacías, igual que en Parquet
+    pedidas = set(columnas) if columnas else None
+    tipos = {c: "category" for c in CATEGORICAS if categoricas and (pedidas is None or c in pedidas)}
+    return pd.read_csv(ruta, usecols=(lambda c: c in pedidas) if pedidas else None, dtype=tipos or None, **opciones)
+
+
+def _completar(df: pd.DataFrame, columnas: Optional[List[str]], categoricas: bool) -> pd.DataFrame:
+    if columnas:
+        df = df.reindex(columns=columnas)
+    return _tipar(df, categoricas)
+
+
+def _dataset_parquet(ruta: str, columnas: Optional[List[str]]):
+    import pyarrow.dataset as pds
+
+    dataset = pds.dataset(ruta, format="parquet", partitioning="hive")
+    if any(c not in dataset.schema.names for c in columnas or COLUMNAS):
+        # Los archivos escritos antes de agregar una columna no la tienen:
+        # se unifican los esquemas para leerla como nula en ellos
+        dataset = _unificar_esquema(dataset, ruta)
+    return dataset, columnas or [c for c in dataset.schema.names if c != COLUMNA_PARTICION]
+
+
+def leer_historico(ruta: str, columnas: Optional[List[str]] = None,
+                   desde=None, hasta=None, categoricas: bool = False) -> pd.DataFrame:
+    """
+    Lee el histórico de noticias desde CSV, desde el dataset Parquet
+    particionado o desde la base SQLite.
+
+    Solo se leen las columnas pedidas; conviene no pedir 'noticia_completa'
+    si no hace falta (ver `leer_textos` para leerla por noticia).
+
+    Args:
+        ruta (str): Archivo CSV, carpeta del dataset Parquet o base SQLite (.db/.sqlite).
+        columnas (List[str], optional): Columnas a cargar. Por defecto todas.
+        desde (optional): Fecha mínima de publicación (inclusive).
+        hasta (optional): Fecha máxima de publicación (inclusive).
+        categoricas (bool): Leer las columnas de `CATEGORICAS` como 'category'.
+
+    Returns:
+        pd.DataFrame: Datos con columnas tipadas.
+    """
+    if almacenamiento_sqlite.es_sqlite(ruta):
+        return _tipar(almacenamiento_sqlite.leer(ruta, columnas=columnas, desde=desde, hasta=hasta), categoricas)
+
+    if es_csv(ruta):
+        df = _completar(_leer_csv(ruta, columnas, categoricas), columnas, categoricas)
+        if desde is not None:
+            df = df.loc[df['fecha_publicacion_CD'] >= pd.Timestamp(desde)]
+        if hasta is not None:
+            df = df.loc[df['fecha_publicacion_CD'] <= pd.Timestamp(hasta)]
+        return df
+
+    dataset, nombres = _dataset_parquet(ruta, columnas)
+    tabla = dataset.to_table(columns=nombres, filter=_filtro_parquet(desde, hasta))
+    return _tipar(tabla.to_pandas(), categoricas)
+
+
+def leer_por_bloques(ruta: str, columnas: Optional[List[str]] = None,
+                     tam_bloque: int = TAM_BLOQUE, categoricas: bool = False) -> Iterator[pd.DataFrame]:
+    """
+    Recorre el histórico por bloques de filas, para operaciones sobre todo
+    el histórico con memoria acotada (la memoria depende de `tam_bloque`,
+    no del tamaño del histórico).
+
+    Args:
+        ruta (str): Archivo CSV, carpeta del dataset Parquet o base SQLite.
+        columnas (List[str], optional): Columnas a cargar. Por defecto todas.
+        tam_bloque (int): Filas por bloque (aproximado en Parquet).
+        categoricas (bool): Leer las columnas de `CATEGORICAS` como 'category'.
+
+    Yields:
+        pd.DataFrame: Bloques con columnas tipadas.
+    """
+    if not os.path.exists(ruta):
+        return
+
+    if almacenamiento_sqlite.es_sqlite(ruta):
+        for bloque in almacenamiento_sqlite.leer_bloques(ruta, columnas=columnas, tam_bloque=tam_bloque):
+            yield _tipar(bloque, categoricas)
+        return
+
+    if es_csv(ruta):
+        with _leer_csv(ruta, columnas, categoricas, chunksize=tam_bloque) as lector:
+            for bloque in lector:
+                yield _completar(bloque, columnas, categoricas)
+        return
+
+    import pyarrow as pa
+
+    # Los lotes de Parquet no pasan de un archivo: se juntan hasta `tam_bloque` filas
+    dataset, nombres = _dataset_parquet(ruta, columnas)
+    lotes, filas = [], 0
+    for lote in dataset.to_batches(columns=nombres, batch_size=tam_bloque):
+        lotes.append(lote)
+        filas += lote.num_rows
+        if filas >= tam_bloque:
+            yield _tipar(pa.Table.from_batches(lotes).to_pandas(), categoricas)
+            lotes, filas = [], 0
+    if filas:
+        yield _tipar(pa.Table.from_batches(lotes).to_pandas(), categoricas)
+
+
+def leer_textos(ruta: str, ids: Iterable[int]) -> Dict[int, str]:
+    """
+    Lee el texto completo ('noticia_completa') solo de las noticias pedidas.
+
+    En SQLite y Parquet se filtra por id; en CSV se recorre el archivo por
+    bloques, leyendo solo el id y el texto, hasta encontrar todas.
+
+    Args:
+        ruta (str): Archivo CSV, carpeta del dataset Parquet o base SQLite.
+        ids (Iterable[int]): Ids ('id_atributo') de las noticias.
+
+    Returns:
+        Dict[int, str]: Texto de cada id encontrado.
+    """
+    pendientes = {int(i) for i in ids}
+    if not pendientes or not os.path.exists(ruta):
+        return {}
+
+    if almacenamiento_sqlite.es_sqlite(ruta):
+        return almacenamiento_sqlite.leer_textos(ruta, sorted(pendientes))
+
+    columnas = ['id_atributo', 'noticia_completa']
+    if es_csv(ruta):
+        textos = {}
+        for bloque in leer_por_bloques(ruta, columnas):
+            encontrados = bloque.loc[bloque['id_atributo'].isin(pendientes)]
+            textos.update(zip(encontrados['id_atributo'].tolist(), encontrados['noticia_completa'].tolist()))
+            pendientes -= set(textos)
+            if not pendientes:
+                break
+        return textos
+
+    import pyarrow.dataset as pds
+
+    dataset, _ = _dataset_parquet(ruta, columnas)
+    tabla = dataset.to_table(columns=columnas, filter=pds.field('id_atributo').isin(sorted(pendientes)))
+    df = _tipar(tabla.to_pandas())
+    return dict(zip(df['id_atributo'].tolist(), df['noticia_completa'].tolist()))
+
+
+def resumen_historico(ruta: str) -> Tuple[Optional[pd.Timestamp], int, int]:
+    """
+    Obtiene la última fecha, el último id y el número de filas del histórico
+    leyendo únicamente las columnas necesarias.
+
+    Args:
+        ruta (str): Archivo CSV o carpeta del dataset Parquet.
+
+    Returns:
+        Tuple: (última fecha o None, último id o 0, número de filas).
+    """
+    fecha, ultimo_id, n_filas = None, 0, 0
+    for bloque in leer_por_bloques(ruta, columnas=['id_atributo', 'fecha_publicacion_CD']):
+        maxima = bloque['fecha_publicacion_CD'].max()
+        if not pd.isna(maxima) and (fecha is None or maxima > fecha):
+            fecha = maxima
+        ultimo_id = max(ultimo_id, int(bloque['id_atributo'].max()))
+        n_filas += len(bloque)
+    return fecha, ultimo_id, n_filas
+
+
+def agregar_historico(df: pd.DataFrame, ruta: str, lote: Optional[str] = None) -> None:
+    """
+    Agrega filas nuevas al histórico. En Parquet se escribe un archivo nuevo
+    por cada mes de publicación presente en el lote; los archivos se preparan
+    en una carpeta temporal y se mueven a su partición al final, de modo que
+    los lectores nunca ven archivos a medio escribir.
+
+    Args:
+        df (pd.DataFrame): Filas a agregar.
+        ruta (str): Archivo CSV o carpeta del dataset Parquet.
+        lote (str, optional): Identificador del lote, usado en el nombre de
+            los archivos Parquet. Por defecto uno aleatorio.
+    """
+    if df.empty:
+        return
+
+    if almacenamiento_sqlite.es_sqlite(ruta):
+        almacenamiento_sqlite.agregar(df, ruta)
+        return
+
+    if es_csv(ruta):
+        if os.path.exists(ruta):
+            # Se respetan las columnas del archivo existente (un histórico
+            # anterior puede no tener 'puntaje_ponderado' hasta un rescore)
+            df = df.reindex(columns=pd.read_csv(ruta, nrows=0).columns)
+        df.to_csv(ruta, mode='a', header=not os.path.exists(ruta), index=False)
+        return
+
+    import pyarrow as pa
+    import pyarrow.dataset as pds
+
+    lote = lote or uuid.uuid4().hex
+    df = _tipar(df.copy())
+    df[COLUMNA_PARTICION] = df['fecha_publicacion_CD'].dt.strftime("%Y-%m")
+
+    # Los lectores ignoran las carpetas que empiezan con '_'
+    temporal = os.path.join(ruta, f"_tmp-{lote}")
+    pds.write_dataset(
+        pa.Table.from_pandas(df, preserve_index=False),
+        temporal,
+        format="parquet",
+        partitioning=[COLUMNA_PARTICION],
+        partitioning_flavor="hive",
+        basename_template=f"parte-{lote}-{{i}}.parquet",
+        existing_data_behavior="overwrite_or_ignore",
+    )
+    for carpeta, _, archivos in os.walk(temporal):
+        for archivo in archivos:
+            destino = os.path.join(ruta, os.path.relpath(carpeta, temporal))
+            os.makedirs(destino, exist_ok=True)
+            os.replace(os.path.join(carpeta, archivo), os.path.join(destino, archivo))
+    shutil.rmtree(temporal, ignore_errors=True)
+
+
+def reescribir_historico(df: pd.DataFrame, ruta: str) -> None:
+    """
+    Reemplaza el histórico completo por `df` de forma atómica (se escribe
+    aparte y se intercambia al final). En SQLite solo se actualizan los puntajes.
+
+    Args:
+        df (pd.DataFrame): Histórico completo actualizado.
+        ruta (str): Archivo CSV, carpeta del dataset Parquet o base SQLite.
+    """
+    reescribir_por_bloques([df], ruta)
+
+
+def reescribir_por_bloques(bloques: Iterable[pd.DataFrame], ruta: str) -> None:
+    """
+    Igual que `reescribir_historico`, pero recibe el histórico por bloques
+    (por ejemplo, los de `leer_por_bloques` ya modificados), de modo que
+    nunca está completo en memoria. Si falla mientras se escribe, el
+    histórico original queda intacto.
+
+    En CSV el reemplazo es un solo renombrado atómico. Una carpeta Parquet
+    no se puede reemplazar de una vez: antes de los dos renombrados se deja
+    una marca de intercambio, y si el proceso cae entre ellos,
+    `recuperar_reescritura` termina el cambio la próxima vez que se abre el
+    histórico con el bloqueo tomado.
+
+    Args:
+        bloques (Iterable[pd.DataFrame]): Bloques del histórico completo actualizado.
+        ruta (str): Archivo CSV, carpeta del dataset Parquet o base SQLite.
+    """
+    if almacenamiento_sqlite.es_sqlite(ruta):
+        for bloque in bloques:
+            almacenamiento_sqlite.actualizar_puntajes(bloque, ruta)
+        return
+
+    base = str(ruta).rstrip('/')
+    temporal = f"{base}.tmp-{uuid.uuid4().hex}"
+    try:
+        if es_csv(ruta):
+            encabezado = True
+            for bloque in bloques:
+                bloque.to_csv(temporal, mode='w' if encabezado else 'a', header=encabezado, index=False)
+                encabezado = False
+            if encabezado:
+                # Sin bloques: el histórico queda vacío pero con sus columnas
+                pd.read_csv(ruta, nrows=0).to_csv(temporal, index=False)
+            os.replace(temporal, ruta)
+            return
+
+        lote = uuid.uuid4().hex
+        for i, bloque in enumerate(bloques):
+            agregar_historico(bloque, temporal, lote=f"{lote}-{i}")
+    except BaseException:
+        if os.path.isdir(temporal):
+            shutil.rmtree(temporal, ignore_errors=True)
+        elif os.path.exists(temporal):
+            os.remove(temporal)
+        raise
+
+    os.makedirs(temporal, exist_ok=True)
+    respaldo = f"{base}.old-{uuid.uuid4().hex}"
+    marca = ruta_intercambio(ruta)
+    with open(f"{marca}.tmp", "w", encoding="utf-8") as f:
+        json.dump({"temporal": temporal, "respaldo": respaldo}, f)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(f"{marca}.tmp", marca)
+    os.replace(ruta, respaldo)
+    os.replace(temporal, ruta)
+    shutil.rmtree(respaldo, ignore_errors=True)
+    os.remove(marca)
+
+
+def ruta_intercambio(ruta: str) -> str:
+    """Ruta de la marca que deja `reescribir_por_bloques` mientras intercambia carpetas Parquet."""
+    return f"{str(ruta).rstrip('/')}.intercambio"
+
+
+def recuperar_reescritura(ruta: str) -> None:
+    """
+    Termina un intercambio de `reescribir_por_bloques` que quedó a medias.
+
+    La marca se escribe cuando la copia nueva ya está completa, así que si
+    falta el histórico se mueve a su lugar la copia nueva (o, si tampoco
+    está, el respaldo del original). Después se borran los restos. Debe
+    llamarse con el bloqueo del histórico tomado.
+
+    Args:
+        ruta (str): Carpeta del dataset Parquet.
+    """
+    marca = ruta_intercambio(ruta)
+    if not os.path.exists(marca):
+        return
+    with open(marca, encoding="utf-8") as f:
+        datos = json.load(f)
+    if not os.path.exists(ruta):
+        origen = datos["temporal"] if os.path.exists(datos["temporal"]) else datos["respaldo"]
+        print(f"Recuperando el histórico desde {origen}.")
+        os.replace(origen, ruta)
+    for resto in (datos["temporal"], datos["respaldo"]):
+        shutil.rmtree(resto, ignore_errors=True)
+    os.remove(marca)
+
+
+def importar_csv(ruta_csv: str, ruta_parquet: str, tam_bloque: int = TAM_BLOQUE) -> None:
+    """
+    Convierte un histórico CSV en un dataset Parquet particionado por mes,
+    leyendo el CSV por bloques.
+
+    Args:
+        ruta_csv (str): Archivo CSV de origen.
+        ruta_parquet (str): Carpeta del dataset Parquet de destino.
+        tam_bloque (int): Filas por bloque.
+    """
+    for bloque in leer_por_bloques(ruta_csv, tam_bloque=tam_bloque):
+        agregar_historico(bloque, ruta_parquet)
+
+
+def exportar_csv(ruta_parquet: str, ruta_csv: str) -> None:
+    """
+    Exporta el dataset Parquet a un único CSV ordenado por fecha descendente.
+    Se escribe una partición (mes) a la vez, de la más reciente a la más antigua.
+
+    Args:
+        ruta_parquet (str): Carpeta del dataset Parquet de origen.
+        ruta_csv (str): Archivo CSV de destino.
+    """
+    import pyarrow.dataset as pds
+
+    dataset, nombres = _dataset_parquet(ruta_parquet, None)
+    particion = pds.field(COLUMNA_PARTICION)
+    meses = sorted({
+        carpeta.split("=", 1)[1] for carpeta in os.listdir(ruta_parquet)
+        if carpeta.startswith(f"{COLUMNA_PARTICION}=")
+    }, reverse=True)
+    temporal = f"{ruta_csv}.tmp-{uuid.uuid4().hex}"
+    encabezado = True
+    for mes in meses:
+        # Las filas sin fecha quedan en la partición por defecto de Hive (mes nulo)
+        filtro = particion == mes if mes[:1].isdigit() else particion.is_null()
+        df = _tipar(dataset.to_table(columns=nombres, filter=filtro).to_pandas())
+        df.sort_values('fecha_publicacion_CD', ascending=False, inplace=True)
+        df.to_csv(temporal, mode='w' if encabezado else 'a', header=encabezado, index=False)
+        encabezado = False
+    if encabezado:
+        pd.DataFrame(columns=list(COLUMNAS)).to_csv(temporal, index=False)
+    os.replace(temporal, ruta_csv)
@@ -0,0 +1,300 @@
+# almacenamiento_sqlite.py
+
+import sqlite3
+from typing import Iterator, List, Optional
+
+import pandas as pd
+
+# Columnas de cada tabla
+COLUMNAS_ARTICULOS = [
+    'id_atributo', 'titulo_articulo', 'resumen_art', 'fecha_publicacion',
+    'autor_redacta', 'imagen_url', 'notice_url', 'noticia_completa', 'fecha_publicacion_CD'
+]
+COLUMNAS_PUNTAJES = ['n_by_tex', 'puntaje_ponderado']
+
+# La fecha es opcional, como en CSV y Parquet: una fecha que no se pudo
+# interpretar no debe descartar la noticia
+TABLA_ARTICULOS = """
+CREATE TABLE IF NOT EXISTS {nombre} (
+    id_atributo INTEGER PRIMARY KEY,
+    titulo_articulo TEXT,
+    resumen_art TEXT,
+    fecha_publicacion TEXT,
+    autor_redacta TEXT,
+    imagen_url TEXT,
+    notice_url TEXT UNIQUE,
+    noticia_completa TEXT,
+    fecha_publicacion_CD TEXT
+);
+"""
+
+ESQUEMA = TABLA_ARTICULOS.format(nombre="articulos") + """
+CREATE TABLE IF NOT EXISTS puntajes (
+    id_atributo INTEGER PRIMARY KEY REFERENCES articulos(id_atributo) ON DELETE CASCADE,
+    n_by_tex INTEGER NOT NULL DEFAULT 0,
+    puntaje_ponderado REAL NOT NULL DEFAULT 0
+);
+CREATE INDEX IF NOT EXISTS idx_articulos_fecha ON articulos(fecha_publicacion_CD);
+CREATE INDEX IF NOT EXISTS idx_puntajes_n_by_tex ON puntajes(n_by_tex);
+
+CREATE VIRTUAL TABLE IF NOT EXISTS articulos_fts USING fts5(
+    titulo_articulo, resumen_art, noticia_completa,
+    content='articulos', content_rowid='id_atributo',
+    tokenize='unicode61 remove_diacritics 2'
+);
+CREATE TRIGGER IF NOT EXISTS articulos_ai AFTER INSERT ON articulos BEGIN
+    INSERT INTO articulos_fts(rowid, titulo_articulo, resumen_art, noticia_completa)
+    VALUES (new.id_atributo, new.titulo_articulo, new.resumen_art, new.noticia_completa);
+END;
+CREATE TRIGGER IF NOT EXISTS articulos_ad AFTER DELETE ON articulos BEGIN
+    INSERT INTO articulos_fts(articulos_fts, rowid, titulo_articulo, resumen_art, noticia_completa)
+    VALUES ('delete', old.id_atributo, old.titulo_articulo, old.resumen_art, old.noticia_completa);
+END;
+"""
+
+
+def es_sqlite(ruta: str) -> bool:
+    """Indica si la ruta corresponde a un histórico en SQLite."""
+    return str(ruta).lower().endswith((".db", ".sqlite", ".sqlite3"))
+
+
+def conectar(ruta: str) -> sqlite3.Connection:
+    """
+    Abre la base SQLite del histórico y crea las tablas e índices si no existen.
+
+    Args:
+        ruta (str): Archivo de la base.
+
+    Returns:
+        sqlite3.Connection: Conexión abierta.
+    """
+    conn = sqlite3.connect(ruta)
+    conn.execute("PRAGMA foreign_keys = ON")
+    conn.executescript(ESQUEMA)
+    # Bases creadas antes de agregar el puntaje ponderado
+    existentes = {fila[1] for fila in conn.execute("PRAGMA table_info(puntajes)")}
+    if 'puntaje_ponderado' not in existentes:
+        conn.execute("ALTER TABLE puntajes ADD COLUMN puntaje_ponderado REAL NOT NULL DEFAULT 0")
+    # Bases creadas con la fecha obligatoria: se descartaban las filas sin fecha
+    if any(fila[1] == 'fecha_publicacion_CD' and fila[3] for fila in conn.execute("PRAGMA table_info(articulos)")):
+        _fecha_opcional(conn)
+    return conn
+
+
+def _fecha_opcional(conn: sqlite3.Connection) -> None:
+    """
+    Rehace la tabla de artículos con 'fecha_publicacion_CD' opcional, como en
+    CSV y Parquet. Los ids (rowid del índice FTS) y los puntajes se conservan.
+    """
+    conn.commit()
+    conn.execute("PRAGMA foreign_keys = OFF")
+    try:
+        columnas = ", ".join(COLUMNAS_ARTICULOS)
+        conn.executescript(
+            "BEGIN IMMEDIATE;"
+            + TABLA_ARTICULOS.format(nombre="articulos_nueva")
+            + f"INSERT INTO articulos_nueva ({columnas}) SELECT {columnas} FROM articulos;"
+            "DROP TABLE articulos;"
+            "ALTER TABLE articulos_nueva RENAME TO articulos;"
+            + ESQUEMA
+            + "COMMIT;"
+        )
+    finally:
+        conn.execute("PRAGMA foreign_keys = ON")
+
+
+def agregar(df: pd.DataFrame, ruta: str) -> None:
+    """
+    Inserta artículos y puntajes en una sola transacción. Las noticias cuyo
+    `notice_url` ya existe se ignoran, por lo que reintentar un lote es seguro.
+
+    Args:
+        df (pd.DataFrame): Filas a agregar.
+        ruta (str): Archivo de la base.
+    """
+    if df.empty:
+        return
+    articulos = df.reindex(columns=COLUMNAS_ARTICULOS).copy()
+    articulos['fecha_publicacion_CD'] = pd.to_datetime(articulos['fecha_publicacion_CD']).dt.strftime("%Y-%m-%d")
+    articulos = articulos.astype(object).where(articulos.notna(), None)
+    puntajes = df.reindex(columns=['id_atributo'] + COLUMNAS_PUNTAJES).fillna(0)
+
+    marcas = ", ".join("?" * len(COLUMNAS_ARTICULOS))
+    with conectar(ruta) as conn:
+        conn.executemany(
+            f"INSERT OR IGNORE INTO articulos ({', '.join(COLUMNAS_ARTICULOS)}) VALUES ({marcas})",
+            articulos.itertuples(index=False, name=None)
+        )
+        conn.executemany(
+            "INSERT OR REPLACE INTO puntajes (id_atributo, n_by_tex, puntaje_ponderado) "
+            "SELECT ?, ?, ? WHERE EXISTS (SELECT 1 FROM articulos WHERE id_atributo = ?)",
+            [(int(i), int(n), float(p), int(i)) for i, n, p in puntajes.itertuples(index=False, name=None)]
+        )
+    conn.close()
+
+
+def actualizar_puntajes(df: pd.DataFrame, ruta: str) -> None:
+    """
+    Actualiza la tabla de puntajes a partir de 'id_atributo', 'n_by_tex'
+    y 'puntaje_ponderado' (0 si no está).
+
+    Args:
+        df (pd.DataFrame): Filas con 'id_atributo' y los puntajes.
+        ruta (str): Archivo de la base.
+    """
+    filas = df.reindex(columns=['id_atributo'] + COLUMNAS_PUNTAJES).fillna(0).itertuples(index=False, name=None)
+    with conectar(ruta) as conn:
+        conn.executemany(
+            "INSERT OR REPLACE INTO puntajes (id_atributo, n_by_tex, puntaje_ponderado) VALUES (?, ?, ?)",
+            [(int(i), int(n), float(p)) for i, n, p in filas]
+        )
+    conn.close()
+
+
+def _filtros(desde, hasta, umbral) -> tuple:
+    condiciones, parametros = [], []
+    if desde is not None:
+        condiciones.append("a.fecha_publicacion_CD >= ?")
+        parametros.append(pd.Timestamp(desde).strftime("%Y-%m-%d"))
+    if hasta is not None:
+        condiciones.append("a.fecha_publicacion_CD <= ?")
+        parametros.append(pd.Timestamp(hasta).strftime("%Y-%m-%d"))
+    if umbral is not None:
+        condiciones.append("COALESCE(p.n_by_tex, 0) >= ?")
+        parametros.append(int(umbral))
+    return condiciones, parametros
+
+
+def _consulta_leer(columnas: Optional[List[str]], desde, hasta) -> tuple:
+    columnas = columnas or COLUMNAS_ARTICULOS + COLUMNAS_PUNTAJES
+    seleccion = ", ".join(
+        f"COALESCE(p.{c}, 0) AS {c}" if c in COLUMNAS_PUNTAJES else f"a.{c}" for c in columnas
+    )
+    condiciones, parametros = _filtros(desde, hasta, None)
+    donde = f"WHERE {' AND '.join(condiciones)}" if condiciones else ""
+    return f"SELECT {seleccion} FROM articulos a LEFT JOIN puntajes p USING (id_atributo) {donde}", parametros
+
+
+def leer(ruta: str, columnas: Optional[List[str]] = None, desde=None, hasta=None) -> pd.DataFrame:
+    """
+    Lee artículos y puntajes, usando el índice de fecha para el rango.
+
+    Args:
+        ruta (str): Archivo de la base.
+        columnas (List[str], optional): Columnas a cargar. Por defecto todas.
+        desde (optional): Fecha mínima de publicación (inclusive).
+        hasta (optional): Fecha máxima de publicación (inclusive).
+
+    Returns:
+        pd.DataFrame: Datos sin tipar (la capa de almacenamiento los tipa).
+    """
+    consulta, parametros = _consulta_leer(columnas, desde, hasta)
+    conn = conectar(ruta)
+    try:
+        return pd.read_sql_query(consulta, conn, params=parametros)
+    finally:
+        conn.close()
+
+
+def leer_bloques(ruta: str, columnas: Optional[List[str]] = None, tam_bloque: int = 5000) -> Iterator[pd.DataFrame]:
+    """
+    Lee artículos y puntajes por bloques de filas, en orden de id.
+
+    Cada bloque es una consulta aparte que continúa desde el último id
+    leído, así que entre bloques no queda ninguna lectura abierta y se
+    puede escribir en la base (por ejemplo, los puntajes de cada bloque).
+
+    Args:
+        ruta (str): Archivo de la base.
+        columnas (List[str], optional): Columnas a cargar. Por defecto todas.
+        tam_bloque (int): Filas por bloque.
+
+    Yields:
+        pd.DataFrame: Bloques sin tipar.
+    """
+    columnas = columnas or COLUMNAS_ARTICULOS + COLUMNAS_PUNTAJES
+    consulta, _ = _consulta_leer(['id_atributo'] + [c for c in columnas if c != 'id_atributo'], None, None)
+    ultimo = None
+    while True:
+        conn = conectar(ruta)
+        try:
+            bloque = pd.read_sql_query(
+                f"{consulta} WHERE ? IS NULL OR a.id_atributo > ? ORDER BY a.id_atributo LIMIT ?",
+                conn, params=(ultimo, ultimo, tam_bloque))
+        finally:
+            conn.close()
+        if bloque.empty:
+            return
+        ultimo = int(bloque['id_atributo'].iloc[-1])
+        yield bloque[columnas]
+        if len(bloque) < tam_bloque:
+            return
+
+
+def leer_textos(ruta: str, ids: List[int]) -> dict:
+    """
+    Texto completo de algunas noticias, por id.
+
+    Args:
+        ruta (str): Archivo de la base.
+        ids (List[int]): Ids de las noticias.
+
+    Returns:
+        dict: id -> texto de la noticia.
+    """
+    ids = [int(i) for i in ids]
+    if not ids:
+        return {}
+    conn = conectar(ruta)
+    try:
+        filas = conn.execute(
+            f"SELECT id_atributo, noticia_completa FROM articulos WHERE id_atributo IN ({', '.join('?' * len(ids))})", ids
+        ).fetchall()
+    finally:
+        conn.close()
+    return dict(filas)
+
+
+def _consulta_fts(texto: str) -> str:
+    """Convierte el texto del usuario en una consulta FTS5 segura (todas las palabras, con prefijo)."""
+    palabras = [p.replace('"', '') for p in texto.split()]
+    return " ".join(f'"{p}"*' for p in palabras if p)
+
+
+def buscar(ruta: str, texto: str, limite: int = 50, desde=None, hasta=None,
+           umbral: Optional[int] = None) -> pd.DataFrame:
+    """
+    Búsqueda de texto completo sobre título, resumen y noticia completa,
+    ordenada por relevancia (bm25).
+
+    Args:
+        ruta (str): Archivo de la base.
+        texto (str): Palabras a buscar (sin distinguir tildes ni mayúsculas).
+        limite (int): Máximo de resultados.
+        desde (optional): Fecha mínima de publicación (inclusive).
+        hasta (optional): Fecha máxima de publicación (inclusive).
+        umbral (int, optional): Puntaje mínimo de palabras clave.
+
+    Returns:
+        pd.DataFrame: Resultados con fecha, título, autor, puntaje y fragmento.
+    """
+    consulta = _consulta_fts(texto)
+    if not consulta:
+        return pd.DataFrame()
+    condiciones, parametros = _filtros(desde, hasta, umbral)
+    donde = "".join(f" AND {c}" for c in condiciones)
+    conn = conectar(ruta)
+    try:
+        return pd.read_sql_query(
+            "SELECT a.id_atributo, a.fecha_publicacion_CD, a.titulo_articulo, a.autor_redacta,"
+            " COALESCE(p.n_by_tex, 0) AS n_by_tex, COALESCE(p.puntaje_ponderado, 0) AS puntaje_ponderado,"
+            " snippet(articulos_fts, 2, '«', '»', '…', 12) AS fragmento"
+            " FROM articulos_fts"
+            " JOIN articulos a ON a.id_atributo = articulos_fts.rowid"
+            " LEFT JOIN puntajes p ON p.id_atributo = a.id_atributo"
+            f" WHERE articulos_fts MATCH ?{donde}"
+            " ORDER BY bm25(articulos_fts) LIMIT ?",
+            conn, params=[consulta] + parametros + [int(limite)]
+        )
+    finally:
+        conn.close()
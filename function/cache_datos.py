@@ -0,0 +1,192 @@
+# cache_datos.py
+
+import os
+import threading
+from collections import OrderedDict
+from functools import lru_cache
+from typing import List, Optional, Tuple
+
+import pandas as pd
+
+from function.almacenamiento import COLUMNAS, leer_historico, leer_textos
+from function.indice_fechas import IndiceFechas
+
+# Memoria máxima (aproximada) que pueden ocupar los históricos en caché
+MAX_BYTES_CACHE = 512 * 1024 * 1024
+
+# Columnas que necesita el dashboard: todas menos el texto completo, que
+# es la mayor parte del histórico y se lee por noticia con `texto_noticia`
+COLUMNAS_DASHBOARD = [c for c in COLUMNAS if c != 'noticia_completa']
+
+_lock = threading.Lock()
+_entradas = OrderedDict()  # (ruta, columnas) -> {'firma', 'df', 'tam', 'indice'}
+
+
+def _firma(ruta: str) -> Tuple[int, int]:
+    """
+    Firma del histórico en disco: última modificación y tamaño total.
+    Para un dataset Parquet se consideran todos sus archivos.
+    """
+    if os.path.isdir(ruta):
+        mtime, tam = 0, 0
+        for carpeta, _, archivos in os.walk(ruta):
+            for archivo in archivos:
+                info = os.stat(os.path.join(carpeta, archivo))
+                mtime, tam = max(mtime, info.st_mtime_ns), tam + info.st_size
+        return mtime, tam
+    info = os.stat(ruta)
+    return info.st_mtime_ns, info.st_size
+
+
+def obtener_datos(ruta: str, columnas: Optional[List[str]] = None) -> pd.DataFrame:
+    """
+    Devuelve el histórico leído, tipado y ordenado por fecha ascendente,
+    compartido por todas las sesiones del proceso.
+
+    La entrada se reutiliza mientras el archivo no cambie (misma fecha de
+    modificación y tamaño). El DataFrame devuelto es compartido: no debe
+    modificarse, solo filtrarse con `vista_rango`. Las columnas de
+    `CATEGORICAS` (el autor) se guardan como 'category'.
+
+    Args:
+        ruta (str): Archivo CSV o carpeta del dataset Parquet.
+        columnas (List[str], optional): Columnas a cargar. Por defecto todas.
+
+    Returns:
+        pd.DataFrame: Histórico ordenado por 'fecha_publicacion_CD'.
+    """
+    clave = (os.path.abspath(ruta), tuple(columnas) if columnas else None)
+    firma = _firma(ruta)
+
+    with _lock:
+        entrada = _entradas.get(clave)
+        if entrada and entrada['firma'] == firma:
+            _entradas.move_to_end(clave)
+            return entrada['df']
+
+    df = leer_historico(ruta, columnas=columnas, categoricas=True)
+    df = df.sort_values('fecha_publicacion_CD', kind="stable").reset_index(drop=True)
+    tam = int(df.memory_usage(deep=True).sum())
+
+    with _lock:
+        _entradas[clave] = {'firma': firma, 'df': df, 'tam': tam, 'indice': None}
+        _entradas.move_to_end(clave)
+        _desalojar()
+    return df
+
+
+def _desalojar() -> None:
+    """Elimina las entradas usadas hace más tiempo hasta respetar `MAX_BYTES_CACHE`."""
+    total = sum(entrada['tam'] for entrada in _entradas.values())
+    while total > MAX_BYTES_CACHE and len(_entradas) > 1:
+        _, entrada = _entradas.popitem(last=False)
+        total -= entrada['tam']
+
+
+def obtener_indice(ruta: str, columnas: Optional[List[str]] = None) -> Tuple[pd.DataFrame, IndiceFechas]:
+    """
+    Devuelve el histórico en caché junto con su `IndiceFechas`, que se
+    construye una sola vez por versión del archivo.
+
+    Args:
+        ruta (str): Archivo CSV o carpeta del dataset Parquet.
+        columnas (List[str], optional): Columnas a cargar. Por defecto todas.
+
+    Returns:
+        Tuple[pd.DataFrame, IndiceFechas]: Histórico ordenado e índice.
+    """
+    df = obtener_datos(ruta, columnas)
+    clave = (os.path.abspath(ruta), tuple(columnas) if columnas else None)
+    with _lock:
+        entrada = _entradas.get(clave)
+        if entrada is not None and entrada['df'] is df:
+            if entrada['indice'] is None:
+                entrada['indice'] = IndiceFechas(df)
+            return df, entrada['indice']
+    return df, IndiceFechas(df)
+
+
+def agregar_a_cache(ruta: str, df_nuevo: pd.DataFrame) -> None:
+    """
+    Incorpora filas recién agregadas al histórico en las entradas en caché,
+    sin volver a leer el archivo. El índice se reconstruye en la siguiente consulta.
+
+    Args:
+        ruta (str): Archivo CSV o carpeta del dataset Parquet.
+        df_nuevo (pd.DataFrame): Filas agregadas al histórico.
+    """
+    if df_nuevo is None or df_nuevo.empty:
+        return
+    ruta_abs = os.path.abspath(ruta)
+    firma = _firma(ruta)
+    with _lock:
+        for clave, entrada in list(_entradas.items()):
+            if clave[0] != ruta_abs:
+                continue
+            columnas = list(entrada['df'].columns)
+            tipos = entrada['df'].dtypes.to_dict()
+            nuevas = df_nuevo.reindex(columns=columnas)
+            for columna, tipo in tipos.items():
+                if isinstance(tipo, pd.CategoricalDtype):
+                    # Se amplían las categorías con los valores nuevos (un autor nuevo)
+                    tipos[columna] = pd.CategoricalDtype(
+                        tipo.categories.union(nuevas[columna].dropna().astype(str).unique()))
+            df = pd.concat([entrada['df'].astype(tipos), nuevas.astype(tipos)], ignore_index=True)
+            df = df.sort_values('fecha_publicacion_CD', kind="stable").reset_index(drop=True)
+            _entradas[clave] = {
+                'firma': firma, 'df': df, 'indice': None,
+                'tam': int(df.memory_usage(deep=True).sum()),
+            }
+        _desalojar()
+
+
+def invalidar(ruta: str) -> None:
+    """
+    Descarta de la caché todas las entradas de un histórico (por ejemplo,
+    después de que el scraper agrega filas).
+
+    Args:
+        ruta (str): Archivo CSV o carpeta del dataset Parquet.
+    """
+    ruta = os.path.abspath(ruta)
+    with _lock:
+        for clave in [c for c in _entradas if c[0] == ruta]:
+            del _entradas[clave]
+
+
+@lru_cache(maxsize=256)
+def texto_noticia(ruta: str, id_atributo: int) -> Optional[str]:
+    """
+    Texto completo de una noticia, leído del histórico solo cuando se pide
+    (el dashboard carga el histórico sin 'noticia_completa'). El texto de
+    una noticia no cambia, así que se guardan los últimos leídos.
+
+    Args:
+        ruta (str): Archivo CSV, carpeta del dataset Parquet o base SQLite.
+        id_atributo (int): Id de la noticia.
+
+    Returns:
+        Optional[str]: Texto de la noticia, o None si no está en el histórico.
+    """
+    texto = leer_textos(ruta, [id_atributo]).get(int(id_atributo))
+    return None if pd.isna(texto) else str(texto)
+
+
+def vista_rango(df: pd.DataFrame, desde=None, hasta=None) -> pd.DataFrame:
+    """
+    Filtra por rango de fechas un histórico de `obtener_datos` sin copiarlo:
+    al estar ordenado, el rango es un bloque contiguo de filas. Se devuelve
+    de la más nueva a la más antigua.
+
+    Args:
+        df (pd.DataFrame): Histórico ordenado por fecha ascendente.
+        desde (optional): Fecha mínima (inclusive).
+        hasta (optional): Fecha máxima (inclusive).
+
+    Returns:
+        pd.DataFrame: Vista de las filas del rango.
+    """
+    fechas = df['fecha_publicacion_CD'].to_numpy()
+    inicio = 0 if desde is None else fechas.searchsorted(pd.Timestamp(desde).to_datetime64(), side="left")
+    fin = len(df) if hasta is None else fechas.searchsorted(pd.Timestamp(hasta).to_datetime64(), side="right")
+    return df.iloc[inicio:fin].iloc[::-1]
@@ -0,0 +1,165 @@
+# cache_http.py
+
+import os
+import sqlite3
+import threading
+import time
+import zlib
+from functools import lru_cache
+from typing import Iterator, Optional, Tuple
+
+from function.constantes import RUTA_CACHE
+
+RUTA_CACHE_HTTP = os.path.join(RUTA_CACHE, "http.sqlite")
+
+# Tabla de respuestas y total de bytes mantenido por triggers (se inicializa
+# con la suma de las filas existentes la primera vez)
+ESQUEMA = """
+BEGIN IMMEDIATE;
+CREATE TABLE IF NOT EXISTS respuestas (
+    url TEXT PRIMARY KEY, etag TEXT, modificado TEXT,
+    cuerpo BLOB NOT NULL, tam INTEGER NOT NULL,
+    guardado REAL NOT NULL, acceso REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_respuestas_acceso ON respuestas(acceso);
+CREATE TABLE IF NOT EXISTS meta (clave TEXT PRIMARY KEY, valor INTEGER NOT NULL);
+INSERT OR IGNORE INTO meta SELECT 'tam_total', COALESCE(SUM(tam), 0) FROM respuestas;
+CREATE TRIGGER IF NOT EXISTS respuestas_tam_ai AFTER INSERT ON respuestas BEGIN
+    UPDATE meta SET valor = valor + new.tam WHERE clave = 'tam_total';
+END;
+CREATE TRIGGER IF NOT EXISTS respuestas_tam_ad AFTER DELETE ON respuestas BEGIN
+    UPDATE meta SET valor = valor - old.tam WHERE clave = 'tam_total';
+END;
+CREATE TRIGGER IF NOT EXISTS respuestas_tam_au AFTER UPDATE OF tam ON respuestas BEGIN
+    UPDATE meta SET valor = valor - old.tam + new.tam WHERE clave = 'tam_total';
+END;
+COMMIT;
+"""
+
+
+class CacheHTTP:
+    """
+    Caché en disco (SQLite) de las respuestas HTTP del sitio de noticias.
+
+    Guarda el cuerpo comprimido con zlib junto con sus validadores (`ETag`
+    y `Last-Modified`), de modo que el `Descargador` pueda hacer peticiones
+    condicionales y reutilizar el cuerpo cuando el servidor responde 304.
+    También permite reproducir una ejecución sin red (modo sin conexión).
+    Cuando el tamaño comprimido total supera `max_bytes` se desalojan las
+    respuestas usadas hace más tiempo.
+
+    El tamaño total se lleva en la tabla `meta` con triggers, así guardar no
+    recorre la tabla; el último acceso solo se reescribe si el guardado es
+    más antiguo que `resolucion_acceso`, así una lectura no escribe en disco.
+
+    Args:
+        ruta (str): Archivo SQLite de la caché.
+        max_bytes (int): Tamaño máximo aproximado de los cuerpos comprimidos.
+        resolucion_acceso (float): Segundos de precisión del último acceso para el desalojo.
+    """
+
+    def __init__(self, ruta: str = RUTA_CACHE_HTTP, max_bytes: int = 512 * 1024 * 1024,
+                 resolucion_acceso: float = 600.0):
+        self.ruta = ruta
+        self.max_bytes = max_bytes
+        self.resolucion_acceso = resolucion_acceso
+        self._lock = threading.Lock()
+        os.makedirs(os.path.dirname(ruta) or ".", exist_ok=True)
+        self._conn = sqlite3.connect(ruta, check_same_thread=False, timeout=60)
+        self._conn.executescript(ESQUEMA)
+
+    def obtener(self, url: str) -> Optional[dict]:
+        """
+        Busca la respuesta guardada de una URL.
+
+        Args:
+            url (str): Dirección de la página.
+
+        Returns:
+            Optional[dict]: 'cuerpo', 'etag', 'modificado' y 'guardado', o None.
+        """
+        with self._lock:
+            fila = self._conn.execute(
+                "SELECT cuerpo, etag, modificado, guardado, acceso FROM respuestas WHERE url = ?", (url,)
+            ).fetchone()
+            if fila is None:
+                return None
+            ahora = time.time()
+            if ahora - fila[4] > self.resolucion_acceso:
+                self._conn.execute("UPDATE respuestas SET acceso = ? WHERE url = ?", (ahora, url))
+                self._conn.commit()
+        cuerpo, etag, modificado, guardado, _ = fila
+        return {
+            "cuerpo": zlib.decompress(cuerpo).decode("utf-8"),
+            "etag": etag,
+            "modificado": modificado,
+            "guardado": guardado,
+        }
+
+    def guardar(self, url: str, cuerpo: str, etag: Optional[str] = None,
+                modificado: Optional[str] = None) -> None:
+        """
+        Guarda (o reemplaza) la respuesta de una URL y aplica el desalojo por tamaño.
+
+        Args:
+            url (str): Dirección de la página.
+            cuerpo (str): HTML de la respuesta.
+            etag (str, optional): Cabecera `ETag` de la respuesta.
+            modificado (str, optional): Cabecera `Last-Modified` de la respuesta.
+        """
+        comprimido = zlib.compress(cuerpo.encode("utf-8"), 6)
+        ahora = time.time()
+        with self._lock:
+            # Con UPSERT (y no REPLACE) se disparan los triggers del total
+            self._conn.execute(
+                "INSERT INTO respuestas VALUES (?, ?, ?, ?, ?, ?, ?) ON CONFLICT(url) DO UPDATE SET"
+                " etag = excluded.etag, modificado = excluded.modificado, cuerpo = excluded.cuerpo,"
+                " tam = excluded.tam, guardado = excluded.guardado, acceso = excluded.acceso",
+                (url, etag, modificado, comprimido, len(comprimido), ahora, ahora)
+            )
+            self._desalojar()
+            self._conn.commit()
+
+    def iterar(self, prefijo: str = "") -> Iterator[Tuple[str, str]]:
+        """
+        Recorre las respuestas guardadas cuyas URL empiezan con `prefijo`,
+        por ejemplo para volver a parsear todo el archivo sin red.
+
+        Args:
+            prefijo (str): Prefijo de las URL.
+
+        Yields:
+            Tuple[str, str]: (url, HTML).
+        """
+        with self._lock:
+            urls = [fila[0] for fila in self._conn.execute(
+                "SELECT url FROM respuestas WHERE substr(url, 1, ?) = ? ORDER BY url", (len(prefijo), prefijo)
+            )]
+        for url in urls:
+            entrada = self.obtener(url)
+            if entrada is not None:
+                yield url, entrada["cuerpo"]
+
+    def _desalojar(self) -> None:
+        total = self._conn.execute("SELECT valor FROM meta WHERE clave = 'tam_total'").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        sobrante = total - self.max_bytes
+        liberado = 0
+        borrar = []
+        for url, tam in self._conn.execute("SELECT url, tam FROM respuestas ORDER BY acceso"):
+            borrar.append((url,))
+            liberado += tam
+            if liberado >= sobrante:
+                break
+        self._conn.executemany("DELETE FROM respuestas WHERE url = ?", borrar)
+
+    def cerrar(self) -> None:
+        """Cierra la conexión con la base de la caché."""
+        self._conn.close()
+
+
+@lru_cache(maxsize=None)
+def obtener_cache_http() -> CacheHTTP:
+    """Devuelve la caché HTTP compartida por el proceso."""
+    return CacheHTTP()
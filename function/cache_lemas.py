@@ -0,0 +1,155 @@
+# cache_lemas.py
+
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from typing import Dict, Iterable, List
+
+from function.constantes import RUTA_CACHE
+
+RUTA_CACHE_LEMAS = os.path.join(RUTA_CACHE, "lemas.sqlite")
+
+# Formato de los valores guardados; cambiarlo invalida las entradas anteriores
+FORMATO_LEMAS = "secuencia"
+
+# Tabla de lemas y total de bytes mantenido por triggers (se inicializa con
+# la suma de las filas existentes la primera vez)
+ESQUEMA = """
+BEGIN IMMEDIATE;
+CREATE TABLE IF NOT EXISTS lemas (
+    clave TEXT PRIMARY KEY, lemas TEXT NOT NULL,
+    tam INTEGER NOT NULL, acceso REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_lemas_acceso ON lemas(acceso);
+CREATE TABLE IF NOT EXISTS meta (clave TEXT PRIMARY KEY, valor INTEGER NOT NULL);
+INSERT OR IGNORE INTO meta SELECT 'tam_total', COALESCE(SUM(tam), 0) FROM lemas;
+CREATE TRIGGER IF NOT EXISTS lemas_tam_ai AFTER INSERT ON lemas BEGIN
+    UPDATE meta SET valor = valor + new.tam WHERE clave = 'tam_total';
+END;
+CREATE TRIGGER IF NOT EXISTS lemas_tam_ad AFTER DELETE ON lemas BEGIN
+    UPDATE meta SET valor = valor - old.tam WHERE clave = 'tam_total';
+END;
+CREATE TRIGGER IF NOT EXISTS lemas_tam_au AFTER UPDATE OF tam ON lemas BEGIN
+    UPDATE meta SET valor = valor - old.tam + new.tam WHERE clave = 'tam_total';
+END;
+COMMIT;
+"""
+
+
+def clave_texto(texto_limpio: str, version_modelo: str) -> str:
+    """
+    Calcula la clave de un artículo a partir de su texto limpio y la versión del modelo.
+
+    Args:
+        texto_limpio (str): Texto ya limpio, tal como se envía a spaCy.
+        version_modelo (str): Identificador del modelo de spaCy (nombre y versión).
+
+    Returns:
+        str: Hash hexadecimal que identifica el par texto-modelo.
+    """
+    return hashlib.sha256(f"{FORMATO_LEMAS}\0{version_modelo}\0{texto_limpio}".encode("utf-8")).hexdigest()
+
+
+class CacheLemas:
+    """
+    Caché en disco (SQLite) de la secuencia de lemas de cada artículo.
+
+    Se guarda la secuencia (y no solo el conteo) para poder buscar frases de
+    varias palabras. Cambiar las palabras clave o sus pesos solo obliga a
+    volver a recorrer los lemas guardados, sin pasar el texto por spaCy. Cuando el tamaño total supera
+    `max_bytes` se desalojan las entradas usadas hace más tiempo.
+
+    Como en `CacheHTTP`, el tamaño total se lleva en la tabla `meta` y el
+    último acceso solo se reescribe si es más antiguo que `resolucion_acceso`.
+
+    Args:
+        ruta (str): Archivo SQLite de la caché.
+        max_bytes (int): Tamaño máximo aproximado de los lemas guardados.
+        resolucion_acceso (float): Segundos de precisión del último acceso para el desalojo.
+    """
+
+    def __init__(self, ruta: str = RUTA_CACHE_LEMAS, max_bytes: int = 256 * 1024 * 1024,
+                 resolucion_acceso: float = 600.0):
+        self.ruta = ruta
+        self.max_bytes = max_bytes
+        self.resolucion_acceso = resolucion_acceso
+        self._lock = threading.Lock()
+        os.makedirs(os.path.dirname(ruta) or ".", exist_ok=True)
+        # Varios procesos pueden escribir a la vez (rescore): se espera el bloqueo
+        self._conn = sqlite3.connect(ruta, check_same_thread=False, timeout=60)
+        self._conn.executescript(ESQUEMA)
+
+    def obtener_varios(self, claves: Iterable[str]) -> Dict[str, List[str]]:
+        """
+        Busca varias claves y devuelve las que están en caché.
+
+        Args:
+            claves (Iterable[str]): Claves a buscar.
+
+        Returns:
+            Dict[str, List[str]]: Lemas de cada clave encontrada, en orden.
+        """
+        claves = list(dict.fromkeys(claves))
+        encontrados = {}
+        antiguas = []
+        ahora = time.time()
+        with self._lock:
+            for inicio in range(0, len(claves), 500):
+                bloque = claves[inicio:inicio + 500]
+                marcas = ",".join("?" * len(bloque))
+                filas = self._conn.execute(
+                    f"SELECT clave, lemas, acceso FROM lemas WHERE clave IN ({marcas})", bloque
+                ).fetchall()
+                for clave, lemas, acceso in filas:
+                    encontrados[clave] = json.loads(lemas)
+                    if ahora - acceso > self.resolucion_acceso:
+                        antiguas.append((ahora, clave))
+            if antiguas:
+                self._conn.executemany("UPDATE lemas SET acceso = ? WHERE clave = ?", antiguas)
+                self._conn.commit()
+        return encontrados
+
+    def guardar_varios(self, entradas: Dict[str, List[str]]) -> None:
+        """
+        Guarda los lemas de varios artículos y aplica el desalojo por tamaño.
+
+        Args:
+            entradas (Dict[str, List[str]]): Secuencia de lemas por clave.
+        """
+        if not entradas:
+            return
+        ahora = time.time()
+        filas = []
+        for clave, lemas in entradas.items():
+            texto = json.dumps(list(lemas), ensure_ascii=False, separators=(",", ":"))
+            filas.append((clave, texto, len(texto), ahora))
+        with self._lock:
+            # Con UPSERT (y no REPLACE) se disparan los triggers del total
+            self._conn.executemany(
+                "INSERT INTO lemas VALUES (?, ?, ?, ?) ON CONFLICT(clave) DO UPDATE SET"
+                " lemas = excluded.lemas, tam = excluded.tam, acceso = excluded.acceso",
+                filas
+            )
+            self._desalojar()
+            self._conn.commit()
+
+    def _desalojar(self) -> None:
+        total = self._conn.execute("SELECT valor FROM meta WHERE clave = 'tam_total'").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        sobrante = total - self.max_bytes
+        liberado = 0
+        borrar = []
+        for clave, tam in self._conn.execute("SELECT clave, tam FROM lemas ORDER BY acceso"):
+            borrar.append((clave,))
+            liberado += tam
+            if liberado >= sobrante:
+                break
+        self._conn.executemany("DELETE FROM lemas WHERE clave = ?", borrar)
+
+    def cerrar(self) -> None:
+        """Cierra la conexión con la base de la caché."""
+        self._conn.close()
@@ -1,6 +1,6 @@
 # constantes.py
 
-from function.utilidades import quitar_tildes, singularizar
+import os
 
 # Diccionario de meses a español
 MESES = {
@@ -18,7 +18,8 @@ MESES = {
     "dic": 12
 }
 
-# Bolsa de palabras
+# Bolsa de palabras (tal como se escriben; `function.vocabulario` las
+# normaliza y construye KEY_WORDS y sus pesos)
 KEY_WORDS_NOUNS = [
     "estudiantes", "becas", "ayudas", "recursos destinados", "prestamos",
     "beneficios", "acceso", "inclusion", "igualdad", "diversidad",
@@ -26,8 +27,6 @@ KEY_WORDS_NOUNS = [
     "oportunidades", "discriminacion", "participacion", "balance", "proporcionalidad"
 ]
 
-KEY_WORDS_NOUNS = [singularizar(quitar_tildes(word)) for word in KEY_WORDS_NOUNS]
-
 KEY_WORDS_VERBS = [
     "apoyar", "ayudar", "prestar"
 ]
@@ -36,8 +35,30 @@ KEY_WORDS_ADJECTIVES = [
     "social", "equitativo", "cultural", "laboral"
 ]
 
-KEY_WORDS = KEY_WORDS_VERBS + KEY_WORDS_NOUNS + KEY_WORDS_ADJECTIVES
+# Pesos del puntaje ponderado: peso de cada categoría por el peso propio de
+# la palabra normalizada (las que no aparecen en PESOS_PALABRAS pesan 1)
+PESOS_CATEGORIAS = {
+    "verbos": 1.0,
+    "sustantivos": 1.0,
+    "adjetivos": 0.5
+}
+
+PESOS_PALABRAS = {
+    "beca": 2.0,
+    "recurso destinado": 2.0
+}
+
+# Palabras frecuentes en todas las noticias de la UCR que se agregan a las
+# stopwords de NLTK en español
+STOPWORDS_NOTICIAS = frozenset({
+    'rodríguez', '”', '©', "universidad", "ucr", "costa", "rica",
+    "educación", "2024", "espacio", "años", "universidades",
+    "foto"
+})
 
 
 # Texto que no interesa extraer pero que igualmente está presente en todos los documentos
-TEXTO_BASURA = "Conozca el detalle del proceso de admisión a la UCR Listado de las 153 carreras que ofrecen diplomados, grados y pregrados en la UCR Espacios abiertos a todo público para debatir desde la universidad temas de interés nacional Aseguramiento de la calidad de la Universidad de Costa Rica Servicios científicos a la comunidad nacional Listado de centros e institutos por áreas del conocimiento Opciones abiertas de formación para todo público Órgano Colegiado cuyas decisiones son de acatamiento obligatorio para toda la comunidad universitaria Instancia universitaria de mayor jerarquía ejecutiva Un recorrido para reconocer de dónde venimos   "
\ No newline at end of file
+TEXTO_BASURA = "Conozca el detalle del proceso de admisión a la UCR Listado de las 153 carreras que ofrecen diplomados, grados y pregrados en la UCR Espacios abiertos a todo público para debatir desde la universidad temas de interés nacional Aseguramiento de la calidad de la Universidad de Costa Rica Servicios científicos a la comunidad nacional Listado de centros e institutos por áreas del conocimiento Opciones abiertas de formación para todo público Órgano Colegiado cuyas decisiones son de acatamiento obligatorio para toda la comunidad universitaria Instancia universitaria de mayor jerarquía ejecutiva Un recorrido para reconocer de dónde venimos   "
+
+# Carpeta de cachés locales (lemas, índices, respuestas HTTP...)
+RUTA_CACHE = os.environ.get("OTECEU_CACHE", os.path.join(os.path.expanduser("~"), ".oteceu_etl"))
@@ -0,0 +1,208 @@
+# descarga.py
+
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Iterable, List, Optional
+from urllib.parse import urlparse
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from function import metricas
+from function.cache_http import CacheHTTP
+
+# Cabeceras por defecto para las peticiones HTTP
+CABECERAS = {
+    "User-Agent": "Mozilla/5.0 (compatible; OTECEU-ETL/1.0)",
+    "Accept-Language": "es-CR,es;q=0.9",
+}
+
+
+class TokenBucket:
+    """
+    Limitador de tasa tipo *token bucket* compartido entre hilos.
+
+    Se recargan `tasa` fichas por segundo hasta un máximo de `capacidad`;
+    cada petición consume una ficha y espera únicamente lo necesario.
+    """
+
+    def __init__(self, tasa: float = 2.0, capacidad: int = 4):
+        self.tasa = tasa
+        self.capacidad = capacidad
+        self._fichas = float(capacidad)
+        self._ultimo = time.monotonic()
+        self._lock = threading.Lock()
+
+    def adquirir(self) -> None:
+        """Bloquea hasta que haya una ficha disponible y la consume."""
+        while True:
+            with self._lock:
+                ahora = time.monotonic()
+                self._fichas = min(self.capacidad, self._fichas + (ahora - self._ultimo) * self.tasa)
+                self._ultimo = ahora
+                if self._fichas >= 1:
+                    self._fichas -= 1
+                    return
+                espera = (1 - self._fichas) / self.tasa
+            time.sleep(espera)
+
+
+class Descargador:
+    """
+    Cliente HTTP con sesión compartida (pool de conexiones), límite de
+    concurrencia por host y limitador de tasa global.
+
+    Con `cache` las respuestas se guardan en disco y las siguientes
+    descargas de la misma URL son peticiones condicionales (`If-None-Match`
+    / `If-Modified-Since`): si el servidor responde 304 se usa el cuerpo
+    guardado. Con `sin_conexion` solo se leen respuestas de la caché.
+
+    Args:
+        max_por_host (int): Máximo de peticiones simultáneas a un mismo host.
+        tasa (float): Peticiones por segundo permitidas por el limitador.
+        rafaga (int): Tamaño máximo de ráfaga del limitador.
+        timeout (float): Tiempo máximo de espera por petición, en segundos.
+        reintentos (int): Reintentos ante errores de red o respuestas 5xx.
+        espera_reintento (float): Espera base antes del primer reintento, en segundos;
+            se duplica en cada reintento y se elige al azar entre 0 y ese valor.
+        espera_maxima (float): Tope de la espera entre reintentos, en segundos.
+        limitador (TokenBucket, optional): Limitador compartido con otros descargadores.
+        cache (CacheHTTP, optional): Caché de respuestas HTTP.
+        sin_conexion (bool): Reproducir desde la caché sin usar la red.
+    """
+
+    def __init__(self, max_por_host: int = 4, tasa: float = 2.0, rafaga: int = 4,
+                 timeout: float = 10, reintentos: int = 2,
+                 espera_reintento: float = 0.5, espera_maxima: float = 8.0,
+                 limitador: Optional[TokenBucket] = None,
+                 cache: Optional[CacheHTTP] = None, sin_conexion: bool = False):
+        if sin_conexion and cache is None:
+            raise ValueError("El modo sin conexión requiere una caché HTTP.")
+        self.max_por_host = max_por_host
+        self.timeout = timeout
+        self.reintentos = reintentos
+        self.espera_reintento = espera_reintento
+        self.espera_maxima = espera_maxima
+        self.limitador = limitador or TokenBucket(tasa, rafaga)
+        self.cache = cache
+        self.sin_conexion = sin_conexion
+
+        self.sesion = requests.Session()
+        self.sesion.headers.update(CABECERAS)
+        adaptador = HTTPAdapter(pool_connections=4, pool_maxsize=max_por_host)
+        self.sesion.mount("http://", adaptador)
+        self.sesion.mount("https://", adaptador)
+
+        self._semaforos = {}
+        self._lock = threading.Lock()
+
+    def _semaforo(self, url: str) -> threading.Semaphore:
+        host = urlparse(url).netloc
+        with self._lock:
+            if host not in self._semaforos:
+                self._semaforos[host] = threading.Semaphore(self.max_por_host)
+            return self._semaforos[host]
+
+    def obtener(self, url: str) -> Optional[str]:
+        """
+        Descarga una página y devuelve su HTML.
+
+        Args:
+            url (str): Dirección a descargar.
+
+        Returns:
+            Optional[str]: HTML de la página o None si no se pudo descargar.
+        """
+        registro = metricas.actual()
+        guardada = self.cache.obtener(url) if self.cache is not None else None
+        if self.sin_conexion:
+            registro.contar("cache_http_aciertos" if guardada else "cache_http_fallos")
+            return guardada["cuerpo"] if guardada else None
+
+        condiciones = {}
+        if guardada and guardada["etag"]:
+            condiciones["If-None-Match"] = guardada["etag"]
+        if guardada and guardada["modificado"]:
+            condiciones["If-Modified-Since"] = guardada["modificado"]
+
+        respuesta = self._pedir(url, condiciones)
+        if respuesta is None:
+            return None
+        if respuesta.status_code == 304 and guardada:
+            registro.contar("http_304")
+            return guardada["cuerpo"]
+        respuesta.encoding = respuesta.encoding or respuesta.apparent_encoding
+        if self.cache is not None:
+            self.cache.guardar(url, respuesta.text, respuesta.headers.get("ETag"),
+                               respuesta.headers.get("Last-Modified"))
+        return respuesta.text
+
+    def obtener_binario(self, url: str) -> Optional[bytes]:
+        """
+        Descarga un recurso binario (por ejemplo, una imagen) sin pasar por
+        la caché HTTP, con el mismo límite de tasa y de concurrencia.
+
+        Args:
+            url (str): Dirección a descargar.
+
+        Returns:
+            Optional[bytes]: Contenido, o None si no se pudo descargar (o sin conexión).
+        """
+        if self.sin_conexion:
+            return None
+        respuesta = self._pedir(url)
+        return respuesta.content if respuesta is not None else None
+
+    def _pedir(self, url: str, cabeceras: Optional[dict] = None) -> Optional[requests.Response]:
+        """
+        GET con reintentos ante errores de red o 5xx, con espera exponencial
+        y aleatoria (*full jitter*) entre intentos; None si falló.
+        """
+        registro = metricas.actual()
+        for intento in range(self.reintentos + 1):
+            if intento:
+                registro.contar("http_reintentos")
+                tope = min(self.espera_maxima, self.espera_reintento * 2 ** (intento - 1))
+                with registro.medir("espera_reintento"):
+                    time.sleep(random.uniform(0, tope))
+            with registro.medir("espera_limitador"):
+                self.limitador.adquirir()
+            try:
+                with self._semaforo(url), registro.medir("http"):
+                    respuesta = self.sesion.get(url, timeout=self.timeout, headers=cabeceras)
+                registro.contar("http_peticiones")
+                registro.contar("http_bytes", len(respuesta.content))
+                if respuesta.status_code < 500:
+                    respuesta.raise_for_status()
+                    return respuesta
+            except requests.HTTPError as e:
+                registro.contar("http_errores")
+                print(f"Error HTTP al descargar {url}: {e}")
+                return None
+            except requests.RequestException as e:
+                registro.contar("http_errores")
+                print(f"Error de red al descargar {url} (intento {intento + 1}): {e}")
+        return None
+
+    def obtener_varios(self, urls: Iterable[str], hilos: Optional[int] = None) -> List[Optional[str]]:
+        """
+        Descarga varias páginas de forma concurrente conservando el orden.
+
+        Args:
+            urls (Iterable[str]): Direcciones a descargar.
+            hilos (int, optional): Número de hilos. Por defecto `max_por_host`.
+
+        Returns:
+            List[Optional[str]]: HTML de cada página (None en las que fallaron).
+        """
+        urls = list(urls)
+        if not urls:
+            return []
+        with ThreadPoolExecutor(max_workers=hilos or self.max_por_host) as pool:
+            return list(pool.map(self.obtener, urls))
+
+    def cerrar(self) -> None:
+        """Cierra la sesión y libera las conexiones del pool (la caché es compartida y no se cierra)."""
+        self.sesion.close()
@@ -0,0 +1,223 @@
+# escritor.py
+
+import json
+import os
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+
+import pandas as pd
+
+from function.almacenamiento import agregar_historico, es_csv, recuperar_reescritura
+from function.indice_visto import IndiceVisto, ruta_indice
+
+
+def _leer_token(ruta: str) -> str:
+    try:
+        with open(ruta, encoding="utf-8") as f:
+            return f.read()
+    except OSError:
+        return ""
+
+
+@contextmanager
+def bloqueo_archivo(ruta: str, espera: float = 120, caducidad: float = 600):
+    """
+    Bloqueo entre procesos (e hilos) mediante un archivo creado de forma exclusiva.
+
+    Mientras se tiene el bloqueo, un hilo renueva la fecha de modificación
+    del archivo cada `caducidad / 4` segundos, así una operación larga (un
+    rescore de todo el histórico) no parece abandonada. Al salir solo se
+    borra el archivo si todavía tiene el token propio.
+
+    Args:
+        ruta (str): Archivo de bloqueo.
+        espera (float): Segundos máximos esperando el bloqueo.
+        caducidad (float): Antigüedad sin renovar a partir de la cual un
+            bloqueo se considera abandonado por un proceso caído.
+    """
+    token = f"{os.getpid()}-{uuid.uuid4().hex}"
+    limite = time.monotonic() + espera
+    while True:
+        try:
+            descriptor = os.open(ruta, os.O_CREAT | os.O_EXCL | os.O_WRONLY)
+            os.write(descriptor, token.encode())
+            os.close(descriptor)
+            break
+        except FileExistsError:
+            try:
+                if time.time() - os.path.getmtime(ruta) > caducidad:
+                    os.remove(ruta)
+                    continue
+            except FileNotFoundError:
+                continue
+            if time.monotonic() > limite:
+                raise TimeoutError(f"No se pudo obtener el bloqueo {ruta}")
+            time.sleep(0.05)
+
+    terminado = threading.Event()
+
+    def renovar():
+        while not terminado.wait(caducidad / 4):
+            if _leer_token(ruta) != token:
+                print(f"Se perdió el bloqueo {ruta}.")
+                return
+            try:
+                os.utime(ruta)
+            except OSError:
+                return
+
+    latido = threading.Thread(target=renovar, name="bloqueo-latido", daemon=True)
+    latido.start()
+    try:
+        yield
+    finally:
+        terminado.set()
+        latido.join()
+        if _leer_token(ruta) == token:
+            try:
+                os.remove(ruta)
+            except FileNotFoundError:
+                pass
+
+
+class EscritorHistorico:
+    """
+    Escritor de solo-anexado y seguro ante caídas para el histórico.
+
+    - Asigna los ids de forma monótona desde el contador persistido en el
+      índice de noticias vistas (`IndiceVisto.ultimo_id`).
+    - Descarta las noticias cuyo `notice_url` ya está en el índice, sin
+      releer el histórico.
+    - Registra cada lote en un segmento de escritura anticipada (WAL) antes
+      de escribirlo; si el proceso cae a mitad de la escritura, el lote se
+      rehace al abrir el escritor de nuevo.
+    - Serializa las escrituras de varios procesos con un archivo de bloqueo.
+
+    Args:
+        df_path (str): Ruta del histórico (archivo CSV o carpeta Parquet).
+    """
+
+    def __init__(self, df_path: str):
+        self.df_path = df_path
+        base = str(df_path).rstrip('/')
+        self.ruta_bloqueo = f"{base}.lock"
+        self.ruta_wal = f"{base}.wal"
+        self._lock = threading.Lock()
+        self._mtime_indice = None
+        with self._lock, bloqueo_archivo(self.ruta_bloqueo):
+            self._recuperar()
+            self.indice = self._cargar_indice()
+
+    def _cargar_indice(self) -> IndiceVisto:
+        indice = IndiceVisto.cargar(self.df_path)
+        ruta = ruta_indice(self.df_path)
+        self._mtime_indice = os.stat(ruta).st_mtime_ns if os.path.exists(ruta) else None
+        return indice
+
+    def _refrescar_indice(self) -> None:
+        """Recarga el índice solo si otro proceso lo modificó."""
+        ruta = ruta_indice(self.df_path)
+        mtime = os.stat(ruta).st_mtime_ns if os.path.exists(ruta) else None
+        if mtime != self._mtime_indice:
+            self.indice = self._cargar_indice()
+
+    def conocido(self, url: str) -> bool:
+        """Indica si la noticia ya está en el histórico."""
+        with self._lock:
+            return self.indice.conocido(url)
+
+    def escribir(self, df: pd.DataFrame) -> pd.DataFrame:
+        """
+        Escribe un lote de noticias asignándoles ids y descartando duplicados.
+
+        Args:
+            df (pd.DataFrame): Filas normalizadas por `save_data` (los ids
+                recibidos se ignoran).
+
+        Returns:
+            pd.DataFrame: Filas efectivamente escritas, con su 'id_atributo'.
+        """
+        with self._lock, bloqueo_archivo(self.ruta_bloqueo):
+            self._refrescar_indice()
+
+            conocidas = df['notice_url'].map(lambda url: self.indice.conocido(url) if isinstance(url, str) else False)
+            df = df.loc[~conocidas & ~df['notice_url'].duplicated()].copy()
+            if df.empty:
+                return df
+
+            inicio = self.indice.ultimo_id + 1
+            df['id_atributo'] = range(inicio, inicio + len(df))
+            df.reset_index(drop=True, inplace=True)
+
+            lote = uuid.uuid4().hex
+            self._escribir_wal(df, lote)
+            self._aplicar(df, lote)
+
+            self.indice.registrar(df)
+            self.indice.guardar()
+            self._mtime_indice = os.stat(ruta_indice(self.df_path)).st_mtime_ns
+            os.remove(self.ruta_wal)
+            return df
+
+    def _escribir_wal(self, df: pd.DataFrame, lote: str) -> None:
+        """Guarda el lote y el estado previo del histórico de forma atómica."""
+        tam_previo = os.path.getsize(self.df_path) if es_csv(self.df_path) and os.path.exists(self.df_path) else None
+        segmento = {
+            "lote": lote,
+            "tam_previo": tam_previo,
+            "filas": json.loads(df.to_json(orient="records", date_format="iso")),
+        }
+        temporal = f"{self.ruta_wal}.tmp"
+        with open(temporal, "w", encoding="utf-8") as f:
+            json.dump(segmento, f, ensure_ascii=False)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(temporal, self.ruta_wal)
+
+    def _aplicar(self, df: pd.DataFrame, lote: str) -> None:
+        if es_csv(self.df_path):
+            agregar_historico(df, self.df_path)
+            with open(self.df_path, "rb+") as f:
+                os.fsync(f.fileno())
+        else:
+            agregar_historico(df, self.df_path, lote=lote)
+
+    def _recuperar(self) -> None:
+        """
+        Rehace un lote que quedó a medias: deshace la escritura parcial
+        (truncando el CSV o borrando los archivos Parquet del lote) y lo
+        vuelve a escribir, actualizando el índice. Antes termina una
+        reescritura Parquet interrumpida (`recuperar_reescritura`).
+        """
+        recuperar_reescritura(self.df_path)
+        if not os.path.exists(self.ruta_wal):
+            return
+        print("Recuperando una escritura interrumpida del histórico.")
+        with open(self.ruta_wal, encoding="utf-8") as f:
+            segmento = json.load(f)
+
+        df = pd.DataFrame(segmento["filas"])
+        df['fecha_publicacion_CD'] = pd.to_datetime(df['fecha_publicacion_CD'])
+        if es_csv(self.df_path):
+            if segmento["tam_previo"] is None:
+                if os.path.exists(self.df_path):
+                    os.remove(self.df_path)
+            else:
+                with open(self.df_path, "rb+") as f:
+                    f.truncate(segmento["tam_previo"])
+        else:
+            for carpeta, _, archivos in os.walk(self.df_path):
+                for archivo in archivos:
+                    if archivo.startswith(f"parte-{segmento['lote']}-"):
+                        os.remove(os.path.join(carpeta, archivo))
+
+        self._aplicar(df, segmento["lote"])
+
+        # El índice pudo haberse guardado antes de la caída: se reconstruye del histórico
+        ruta = ruta_indice(self.df_path)
+        if os.path.exists(ruta):
+            os.remove(ruta)
+        IndiceVisto.cargar(self.df_path)
+        os.remove(self.ruta_wal)
@@ -0,0 +1,125 @@
+# etapas.py
+
+import queue
+import threading
+import time
+from typing import Callable, Iterable, Optional
+
+from function import metricas
+
+# Marca de fin de flujo que recorre las colas entre etapas
+FIN = object()
+
+
+class Etapa:
+    """
+    Etapa de un pipeline: `hilos` hilos que toman elementos de su cola de
+    entrada, los procesan con `funcion(elemento, emitir)` y envían los
+    resultados a la siguiente etapa con `emitir`.
+
+    Args:
+        nombre (str): Nombre de la etapa (para mensajes y contadores).
+        funcion (Callable): Procesa un elemento; puede emitir cero o más resultados.
+        hilos (int): Número de hilos de la etapa.
+        final (Callable, optional): Se llama una vez por hilo al terminar el
+            flujo con `final(emitir)`, por ejemplo para vaciar un lote pendiente.
+    """
+
+    def __init__(self, nombre: str, funcion: Callable, hilos: int = 1,
+                 final: Optional[Callable] = None):
+        self.nombre = nombre
+        self.funcion = funcion
+        self.hilos = hilos
+        self.final = final
+        self.procesados = 0
+        self.errores = 0
+
+
+class Pipeline:
+    """
+    Encadena etapas mediante colas acotadas. Cada etapa corre en sus propios
+    hilos, de modo que las etapas de red y las de CPU se solapan, y las colas
+    acotadas frenan a las etapas rápidas para que la memoria no crezca.
+
+    Args:
+        tam_cola (int): Capacidad de cada cola entre etapas.
+    """
+
+    def __init__(self, tam_cola: int = 32):
+        self.tam_cola = tam_cola
+        self.etapas = []
+
+    def etapa(self, nombre: str, funcion: Callable, hilos: int = 1,
+              final: Optional[Callable] = None) -> "Pipeline":
+        """Agrega una etapa al final del pipeline y devuelve el pipeline."""
+        self.etapas.append(Etapa(nombre, funcion, hilos, final))
+        return self
+
+    def _trabajador(self, etapa: Etapa, entrada: queue.Queue, salida: Optional[queue.Queue],
+                    restantes: list, lock: threading.Lock, registro: metricas.Metricas) -> None:
+        with metricas.perfil_hilo():
+            self._procesar(etapa, entrada, salida, restantes, lock, registro)
+
+    def _procesar(self, etapa: Etapa, entrada: queue.Queue, salida: Optional[queue.Queue],
+                  restantes: list, lock: threading.Lock, registro: metricas.Metricas) -> None:
+        emitir = salida.put if salida is not None else (lambda _: None)
+        while True:
+            elemento = entrada.get()
+            if elemento is FIN:
+                entrada.put(FIN)  # Avisar a los demás hilos de la etapa
+                break
+            inicio = time.perf_counter()
+            try:
+                etapa.funcion(elemento, emitir)
+                with lock:
+                    etapa.procesados += 1
+            except Exception as e:
+                with lock:
+                    etapa.errores += 1
+                registro.contar(f"errores_{etapa.nombre}")
+                print(f"Error en la etapa '{etapa.nombre}': {e}")
+            # Incluye la espera en `emitir` si la cola siguiente está llena
+            registro.registrar(f"etapa_{etapa.nombre}", time.perf_counter() - inicio)
+
+        if etapa.final is not None:
+            try:
+                etapa.final(emitir)
+            except Exception as e:
+                print(f"Error al cerrar la etapa '{etapa.nombre}': {e}")
+
+        with lock:
+            restantes[0] -= 1
+            ultimo = restantes[0] == 0
+        if ultimo and salida is not None:
+            salida.put(FIN)
+
+    def ejecutar(self, fuente: Iterable) -> None:
+        """
+        Recorre la fuente en el hilo actual y alimenta la primera etapa;
+        retorna cuando todas las etapas terminaron de procesar.
+
+        Args:
+            fuente (Iterable): Elementos de entrada (puede ser un generador).
+        """
+        colas = [queue.Queue(maxsize=self.tam_cola) for _ in self.etapas]
+        registro = metricas.actual()
+        hilos = []
+        for n, etapa in enumerate(self.etapas):
+            salida = colas[n + 1] if n + 1 < len(colas) else None
+            restantes, lock = [etapa.hilos], threading.Lock()
+            for k in range(etapa.hilos):
+                hilo = threading.Thread(
+                    target=self._trabajador,
+                    args=(etapa, colas[n], salida, restantes, lock, registro),
+                    name=f"{etapa.nombre}-{k}", daemon=True
+                )
+                hilo.start()
+                hilos.append(hilo)
+
+        try:
+            for elemento in fuente:
+                colas[0].put(elemento)
+        finally:
+            colas[0].put(FIN)
+            for hilo in hilos:
+                hilo.join()
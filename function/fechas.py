@@ -0,0 +1,48 @@
+# fechas.py
+
+from typing import Tuple
+import pandas as pd
+from function.constantes import MESES
+
+# Tabla de búsqueda por las tres primeras letras del mes ('sept', 'septiembre' -> 'sep')
+MESES_PREFIJO = {mes[:3]: numero for mes, numero in MESES.items()}
+MESES_PREFIJO["set"] = 9
+
+# 'dd mes yyyy', con mes abreviado o completo y punto opcional ('5 sept. 2024')
+_PATRON_FECHA = r"^(?P<day>\d{1,2})\s+(?P<mes>[a-záéíóú]+)\.?\s+(?P<year>\d{4})$"
+
+
+def parsear_fechas(fechas: pd.Series) -> Tuple[pd.Series, pd.Index]:
+    """
+    Convierte en una sola pasada una columna de fechas 'dd mes yyyy' en español
+    (por ejemplo, '01 ene 2023' o '5 Sept 2024') a datetime64.
+
+    También acepta fechas ISO ('2023-01-01'), que es como quedan guardadas
+    en el histórico, de modo que sirve tanto al scraper como al dashboard.
+
+    Args:
+        fechas (pd.Series): Fechas en texto.
+
+    Returns:
+        Tuple[pd.Series, pd.Index]: Fechas convertidas (NaT donde no se pudo) e
+        índice de las filas que no se pudieron convertir.
+    """
+    if pd.api.types.is_datetime64_any_dtype(fechas):
+        return fechas, fechas.index[fechas.isna()]
+
+    texto = fechas.astype("string").str.strip().str.lower()
+
+    # Camino rápido: fechas ISO
+    resultado = pd.to_datetime(texto, format="ISO8601", errors="coerce")
+
+    pendientes = resultado.isna() & texto.notna()
+    if pendientes.any():
+        partes = texto[pendientes].str.extract(_PATRON_FECHA)
+        componentes = pd.DataFrame({
+            "year": pd.to_numeric(partes["year"]),
+            "month": partes["mes"].str[:3].map(MESES_PREFIJO),
+            "day": pd.to_numeric(partes["day"]),
+        }).astype("float64")
+        resultado[pendientes] = pd.to_datetime(componentes, errors="coerce")
+
+    return resultado, fechas.index[resultado.isna()]
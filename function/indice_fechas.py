@@ -0,0 +1,58 @@
+# indice_fechas.py
+
+import numpy as np
+import pandas as pd
+
+
+class IndiceFechas:
+    """
+    Índice sobre un histórico ordenado por fecha ascendente que responde
+    rangos de fechas y umbrales de puntaje con búsquedas binarias.
+
+    Para cada umbral consultado se guarda (una sola vez) la lista ordenada de
+    posiciones con puntaje mayor o igual; un rango de fechas se resuelve con
+    `searchsorted` sobre esa lista, sin recorrer el histórico.
+
+    Args:
+        df (pd.DataFrame): Histórico ordenado por 'fecha_publicacion_CD' ascendente.
+    """
+
+    def __init__(self, df: pd.DataFrame):
+        # Los históricos antiguos guardaban la columna como 'n_by_text'
+        columna = 'n_by_tex' if 'n_by_tex' in df.columns else 'n_by_text'
+        self.fechas = df['fecha_publicacion_CD'].to_numpy()
+        puntajes = df[columna].to_numpy() if columna in df.columns else np.zeros(len(df), dtype="int64")
+
+        # Posiciones ordenadas por puntaje descendente y los puntajes en ese orden
+        self._orden = np.argsort(-puntajes, kind="stable")
+        self._puntajes_desc = puntajes[self._orden]
+        self._por_umbral = {}
+
+    def __len__(self) -> int:
+        return len(self.fechas)
+
+    def _posiciones_umbral(self, umbral: int) -> np.ndarray:
+        if umbral not in self._por_umbral:
+            # Cantidad de filas con puntaje >= umbral (búsqueda binaria sobre -puntajes)
+            cantidad = np.searchsorted(-self._puntajes_desc, -umbral, side="right")
+            self._por_umbral[umbral] = np.sort(self._orden[:cantidad])
+        return self._por_umbral[umbral]
+
+    def posiciones(self, desde=None, hasta=None, umbral: int = 0) -> np.ndarray:
+        """
+        Posiciones (para `iloc`) de las filas dentro del rango de fechas con
+        puntaje mayor o igual al umbral, de la más nueva a la más antigua.
+
+        Args:
+            desde (optional): Fecha mínima (inclusive).
+            hasta (optional): Fecha máxima (inclusive).
+            umbral (int): Puntaje mínimo de palabras clave.
+
+        Returns:
+            np.ndarray: Posiciones de las filas seleccionadas.
+        """
+        inicio = 0 if desde is None else self.fechas.searchsorted(pd.Timestamp(desde).to_datetime64(), side="left")
+        fin = len(self) if hasta is None else self.fechas.searchsorted(pd.Timestamp(hasta).to_datetime64(), side="right")
+        candidatas = self._posiciones_umbral(int(umbral))
+        i, j = candidatas.searchsorted(inicio, side="left"), candidatas.searchsorted(fin, side="left")
+        return candidatas[i:j][::-1]
@@ -0,0 +1,170 @@
+# indice_visto.py
+
+import hashlib
+import json
+import os
+from typing import Iterable, List, Optional
+
+import pandas as pd
+
+from function.almacenamiento import leer_por_bloques
+
+
+def ruta_indice(df_path: str) -> str:
+    """Ruta del índice de marcas de agua asociado a un histórico."""
+    return f"{str(df_path).rstrip('/')}.indice.json"
+
+
+def hash_url(url: str) -> str:
+    """Hash corto (64 bits en hexadecimal) de la URL de una noticia."""
+    return hashlib.sha1(url.encode("utf-8")).hexdigest()[:16]
+
+
+def _leer_hashes(datos: dict, segmento: str) -> Optional[List[str]]:
+    """
+    Hashes confirmados según la marca de agua, o None si falta el segmento.
+    Los índices anteriores al segmento traen los hashes en el propio JSON.
+    """
+    if "urls" in datos:
+        return datos["urls"]
+    tam = datos.get("tam_hashes", 0)
+    if not tam:
+        return []
+    if not os.path.exists(segmento):
+        return None
+    with open(segmento, "rb") as f:
+        return f.read(tam).decode("ascii").split()
+
+
+class IndiceVisto:
+    """
+    Índice persistente con la marca de agua del histórico: hashes de las
+    URLs ya guardadas, último id, última fecha de publicación y número de filas.
+
+    Permite al scraper descartar noticias conocidas antes de descargarlas y
+    detenerse en la primera página de listado completamente conocida.
+
+    Los hashes se guardan en un segmento de solo-anexado (uno por línea, sin
+    repetir) y la marca de agua en un JSON pequeño que se reescribe en cada
+    lote. La marca de agua guarda también el tamaño válido del segmento: lo
+    anexado después (un lote que no llegó a confirmarse) se ignora al cargar
+    y se trunca en el siguiente guardado.
+    """
+
+    def __init__(self, ruta: str, urls: Iterable[str] = (), ultimo_id: int = 0,
+                 ultima_fecha: Optional[pd.Timestamp] = None, n_filas: int = 0,
+                 tam_segmento: int = 0):
+        self.ruta = ruta
+        self.ruta_segmento = f"{os.path.splitext(ruta)[0]}.hashes"
+        self.urls = set(urls)
+        self.ultimo_id = ultimo_id
+        self.ultima_fecha = ultima_fecha
+        self.n_filas = n_filas
+        # Hashes pendientes de anexar y bytes confirmados del segmento
+        self._pendientes = list(self.urls) if tam_segmento == 0 else []
+        self._tam_segmento = tam_segmento
+
+    @classmethod
+    def cargar(cls, df_path: str) -> "IndiceVisto":
+        """
+        Carga el índice del histórico; si no existe, lo construye a partir
+        de las columnas mínimas del histórico y lo guarda.
+
+        Args:
+            df_path (str): Ruta del histórico.
+
+        Returns:
+            IndiceVisto: Índice listo para consultar.
+        """
+        ruta = ruta_indice(df_path)
+        if os.path.exists(ruta):
+            with open(ruta, encoding="utf-8") as f:
+                datos = json.load(f)
+            urls = _leer_hashes(datos, f"{os.path.splitext(ruta)[0]}.hashes")
+            if urls is not None:
+                return cls(
+                    ruta,
+                    urls=urls,
+                    ultimo_id=datos["ultimo_id"],
+                    ultima_fecha=pd.Timestamp(datos["ultima_fecha"]) if datos["ultima_fecha"] else None,
+                    n_filas=datos["n_filas"],
+                    tam_segmento=datos.get("tam_hashes", 0),
+                )
+            print("Falta el segmento de hashes del índice de noticias vistas.")
+
+        indice = cls(ruta)
+        if os.path.exists(df_path):
+            print("Construyendo el índice de noticias vistas a partir del histórico.")
+            for bloque in leer_por_bloques(df_path, columnas=['id_atributo', 'notice_url', 'fecha_publicacion_CD']):
+                indice.registrar(bloque)
+            indice.guardar()
+        return indice
+
+    @staticmethod
+    def leer_meta(df_path: str) -> Optional[dict]:
+        """
+        Lee solo la marca de agua del índice (último id, última fecha y
+        número de filas), sin cargar los hashes ni construir el índice.
+
+        Args:
+            df_path (str): Ruta del histórico.
+
+        Returns:
+            Optional[dict]: 'ultimo_id', 'ultima_fecha' y 'n_filas', o None si el índice no existe.
+        """
+        ruta = ruta_indice(df_path)
+        if not os.path.exists(ruta):
+            return None
+        with open(ruta, encoding="utf-8") as f:
+            datos = json.load(f)
+        return {clave: datos[clave] for clave in ("ultimo_id", "ultima_fecha", "n_filas")}
+
+    def conocido(self, url: str) -> bool:
+        """Indica si la noticia ya está en el histórico."""
+        return hash_url(url) in self.urls
+
+    def registrar(self, df: pd.DataFrame) -> None:
+        """
+        Actualiza el índice con filas recién guardadas.
+
+        Args:
+            df (pd.DataFrame): Filas con 'id_atributo', 'notice_url' y 'fecha_publicacion_CD'.
+        """
+        if df.empty:
+            return
+        nuevos = {hash_url(url) for url in df['notice_url'].dropna()} - self.urls
+        self.urls.update(nuevos)
+        self._pendientes.extend(nuevos)
+        self.ultimo_id = max(self.ultimo_id, int(df['id_atributo'].max()))
+        fecha = pd.to_datetime(df['fecha_publicacion_CD']).max()
+        if pd.notna(fecha) and (self.ultima_fecha is None or fecha > self.ultima_fecha):
+            self.ultima_fecha = fecha
+        self.n_filas += len(df)
+
+    def guardar(self) -> None:
+        """
+        Anexa los hashes nuevos al segmento y guarda la marca de agua de
+        forma atómica (archivo temporal y renombrado).
+        """
+        with open(self.ruta_segmento, "ab") as f:
+            # Descarta lo anexado por un guardado que no llegó a confirmarse
+            f.truncate(self._tam_segmento)
+            if self._pendientes:
+                contenido = "".join(f"{h}\n" for h in self._pendientes).encode("ascii")
+                f.write(contenido)
+                f.flush()
+                os.fsync(f.fileno())
+                self._tam_segmento += len(contenido)
+                self._pendientes = []
+
+        fecha = self.ultima_fecha
+        datos = {
+            "ultimo_id": self.ultimo_id,
+            "ultima_fecha": fecha.strftime("%Y-%m-%d") if fecha is not None and pd.notna(fecha) else None,
+            "n_filas": self.n_filas,
+            "tam_hashes": self._tam_segmento,
+        }
+        temporal = f"{self.ruta}.tmp"
+        with open(temporal, "w", encoding="utf-8") as f:
+            json.dump(datos, f)
+        os.replace(temporal, self.ruta)
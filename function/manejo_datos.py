@@ -1,9 +1,12 @@
 # manejo_datos.py
 
+import threading
+from functools import lru_cache
 import pandas as pd
-from nltk.corpus import stopwords
-from function.constantes import MESES, KEY_WORDS
-from function.procesamiento_texto import text_reduce
+from function.constantes import MESES
+from function.procesamiento_texto import cargar_modelo, compilar_buscador, puntuar_con_palabras
+from function import vocabulario
+from function.fechas import parsear_fechas
 
 def replace_date(date: str) -> str:
     """
@@ -18,6 +21,41 @@ def replace_date(date: str) -> str:
     day, month, year = date.split(" ")
     return f'{day}-{MESES[month]}-{year}'
 
+def stopwords_noticias() -> list:
+    """
+    Stopwords usadas para puntuar las noticias: las de NLTK en español más
+    palabras frecuentes en todas las noticias de la UCR (`STOPWORDS_NOTICIAS`).
+    Se leen del vocabulario precompilado (ver `function.vocabulario`).
+
+    Returns:
+        list: Lista de stopwords.
+    """
+    return list(vocabulario.cargar().stopwords)
+
+@lru_cache(maxsize=None)
+def precalentar() -> threading.Thread:
+    """
+    Carga en un hilo de fondo lo que necesita la primera actualización
+    (vocabulario, modelo de spaCy y buscador de palabras clave), para
+    que la interfaz no espere esas importaciones al arrancar. Solo lanza el
+    hilo la primera vez que se llama.
+
+    Returns:
+        threading.Thread: Hilo de la precarga.
+    """
+    def cargar():
+        try:
+            vocab = vocabulario.cargar()
+            cargar_modelo()
+            compilar_buscador(vocab.key_words, tuple(sorted(vocab.pesos.items())), tuple(sorted(vocab.ids.items())))
+        except Exception as e:
+            # Se reintenta (y se informa el error) en el primer uso real
+            print(f"No se pudo precargar el modelo de texto: {e}")
+
+    hilo = threading.Thread(target=cargar, name="precarga-nlp", daemon=True)
+    hilo.start()
+    return hilo
+
 def save_data(
     id_proyecto: list,
     titulo_articulo: list,
@@ -27,7 +65,8 @@ def save_data(
     imagen_url: list,
     notice_url: list,
     notice_completa: list,
-    change_date: pd.to_datetime) -> pd.DataFrame:
+    change_date: pd.to_datetime,
+    palabras: dict = None) -> pd.DataFrame:
     """
     Crea un DataFrame a partir de las listas proporcionadas, procesa las fechas y reduce el texto.
 
@@ -40,21 +79,22 @@ def save_data(
         imagen_url (List): Lista de URLs de imágenes.
         notice_url (List): Lista de URLs de noticias.
         notice_completa (List): Lista de noticias completas.
-        list_date (List): Lista de fechas a procesar.
+        change_date (List): Lista de fechas 'dd mes yyyy' a procesar.
+        palabras (dict, optional): Si se pasa, se llena con las apariciones de
+            cada palabra clave por 'notice_url' (para `actualizar_agregados`).
 
     Returns:
         pd.DataFrame: DataFrame procesado con las columnas especificadas.
     """
     
-    # Palabras clave y stopwords
-    stopwords_set = list(set(stopwords.words("spanish")).union({
-        'rodríguez', '”', '©', "universidad", "ucr", "costa", "rica",
-        "educación", "2024", "espacio", "años", "universidades",
-        "foto"
-    }))
+    # Palabras clave y stopwords (normalizadas una sola vez por proceso)
+    vocab = vocabulario.cargar()
 
-    # Procesar las fechas
-    date_change = [replace_date(date) for date in change_date]
+    # Procesar las fechas (vectorizado)
+    date_change, fechas_invalidas = parsear_fechas(pd.Series(change_date, dtype="object"))
+    if len(fechas_invalidas):
+        print(f"No se pudieron interpretar {len(fechas_invalidas)} fechas: "
+              f"{[change_date[i] for i in fechas_invalidas]}")
 
     # Crear el diccionario de datos
     data_dict = {
@@ -66,20 +106,22 @@ def save_data(
         'imagen_url': imagen_url,
         'notice_url': notice_url,
         'noticia_completa': notice_completa,
-        'fecha_publicacion_CD': date_change
+        'fecha_publicacion_CD': date_change.to_numpy()
     }
 
     df = pd.DataFrame(data_dict)
 
-    # Procesar y añadir la columna 'n_by_tex'
-    df['n_by_tex'] = text_reduce(
+    # Procesar y añadir las columnas 'n_by_tex' y 'puntaje_ponderado'
+    df['n_by_tex'], df['puntaje_ponderado'], encontradas = puntuar_con_palabras(
         df=df,
         col="noticia_completa",
-        stopwords_list= stopwords_set,
-        key_words= KEY_WORDS
+        stopwords_list= vocab.stopwords,
+        key_words= vocab.key_words,
+        pesos= vocab.pesos,
+        ids= vocab.ids
     )
-
-    df["fecha_publicacion_CD"] =  pd.to_datetime(df["fecha_publicacion_CD"], format="%d-%m-%Y")
+    if palabras is not None:
+        palabras.update(zip(notice_url, encontradas))
 
     df.sort_values(by = "fecha_publicacion_CD", ascending= False, inplace= True)
     df.reset_index(drop= True, inplace= True)
@@ -0,0 +1,322 @@
+# metricas.py
+
+import cProfile
+import io
+import json
+import os
+import pstats
+import threading
+import time
+from collections import defaultdict
+from contextlib import contextmanager, nullcontext
+from typing import Optional
+
+from function.constantes import RUTA_CACHE
+
+# Carpeta donde se exportan las métricas de la última ejecución
+RUTA_METRICAS = os.path.join(RUTA_CACHE, "metricas")
+
+
+class Metricas:
+    """
+    Registro de tiempos y contadores de una ejecución (actualización,
+    backfill, rescore), seguro entre hilos.
+
+    Se guardan tres cosas:
+      - tiempos por etapa ('descarga', 'parseo', 'spacy'...): llamadas, total y máximo;
+      - contadores globales ('http_bytes', 'tokens', 'aciertos'...);
+      - un registro por noticia (latencia de descarga, bytes, tiempo de
+        parseo, tokens, lemas, aciertos de palabras clave, escritura).
+
+    Args:
+        nombre (str): Nombre de la ejecución.
+    """
+
+    def __init__(self, nombre: str = "scraping"):
+        self.nombre = nombre
+        self.inicio = time.time()
+        self.fin = None
+        self._lock = threading.Lock()
+        self.etapas = defaultdict(lambda: {"llamadas": 0, "segundos": 0.0, "maximo": 0.0})
+        self.contadores = defaultdict(float)
+        self.articulos = defaultdict(dict)
+
+    def registrar(self, etapa: str, segundos: float) -> None:
+        """Suma una duración a la etapa."""
+        with self._lock:
+            datos = self.etapas[etapa]
+            datos["llamadas"] += 1
+            datos["segundos"] += segundos
+            datos["maximo"] = max(datos["maximo"], segundos)
+
+    @contextmanager
+    def medir(self, etapa: str):
+        """Mide la duración del bloque y la suma a la etapa."""
+        inicio = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.registrar(etapa, time.perf_counter() - inicio)
+
+    def contar(self, nombre: str, valor: float = 1) -> None:
+        """Incrementa un contador global."""
+        with self._lock:
+            self.contadores[nombre] += valor
+
+    def articulo(self, url: str, **campos) -> None:
+        """Agrega campos al registro de una noticia (se suman si ya existían)."""
+        with self._lock:
+            registro = self.articulos[url]
+            for campo, valor in campos.items():
+                registro[campo] = registro.get(campo, 0) + valor
+
+    def terminar(self) -> None:
+        """Marca el final de la ejecución."""
+        self.fin = time.time()
+
+    def resumen(self) -> dict:
+        """
+        Resumen de la ejecución.
+
+        Returns:
+            dict: Nombre, inicio, duración, etapas, contadores y número de noticias.
+        """
+        with self._lock:
+            return {
+                "nombre": self.nombre,
+                "inicio": self.inicio,
+                "duracion": (self.fin or time.time()) - self.inicio,
+                "etapas": {etapa: dict(datos) for etapa, datos in self.etapas.items()},
+                "contadores": dict(self.contadores),
+                "articulos": len(self.articulos),
+            }
+
+    def registros_articulos(self) -> list:
+        """Registro de cada noticia, con su URL."""
+        with self._lock:
+            return [{"url": url, **campos} for url, campos in self.articulos.items()]
+
+    def exportar_jsonl(self, ruta: str) -> None:
+        """
+        Escribe una línea JSON por noticia y una última línea con el resumen.
+
+        Args:
+            ruta (str): Archivo de destino.
+        """
+        lineas = [{"tipo": "articulo", **registro} for registro in self.registros_articulos()]
+        lineas.append({"tipo": "resumen", **self.resumen()})
+        _escribir_atomico(ruta, "".join(json.dumps(l, ensure_ascii=False) + "\n" for l in lineas))
+
+    def exportar_prometheus(self, ruta: str) -> None:
+        """
+        Escribe las métricas en el formato de texto de Prometheus (para el
+        *textfile collector* de node_exporter, por ejemplo).
+
+        Args:
+            ruta (str): Archivo de destino.
+        """
+        resumen = self.resumen()
+        etiqueta = f'ejecucion="{self.nombre}"'
+        lineas = [
+            "# HELP oteceu_duracion_segundos Duración de la ejecución.",
+            "# TYPE oteceu_duracion_segundos gauge",
+            f"oteceu_duracion_segundos{{{etiqueta}}} {resumen['duracion']:.6f}",
+            "# HELP oteceu_articulos Noticias procesadas.",
+            "# TYPE oteceu_articulos gauge",
+            f"oteceu_articulos{{{etiqueta}}} {resumen['articulos']}",
+        ]
+        for metrica, campo, ayuda in (
+            ("oteceu_etapa_segundos_total", "segundos", "Tiempo acumulado por etapa."),
+            ("oteceu_etapa_llamadas_total", "llamadas", "Llamadas por etapa."),
+            ("oteceu_etapa_segundos_max", "maximo", "Duración máxima de una llamada por etapa."),
+        ):
+            lineas += [f"# HELP {metrica} {ayuda}",
+                       f"# TYPE {metrica} {'gauge' if campo == 'maximo' else 'counter'}"]
+            lineas += [f'{metrica}{{{etiqueta},etapa="{etapa}"}} {datos[campo]:.6f}'
+                       for etapa, datos in sorted(resumen["etapas"].items())]
+        for contador, valor in sorted(resumen["contadores"].items()):
+            lineas += [f"# TYPE oteceu_{contador}_total counter",
+                       f"oteceu_{contador}_total{{{etiqueta}}} {valor:.6f}"]
+        _escribir_atomico(ruta, "\n".join(lineas) + "\n")
+
+    def exportar(self, carpeta: str = RUTA_METRICAS) -> str:
+        """
+        Exporta la ejecución como `<nombre>.jsonl` y `<nombre>.prom`.
+
+        Args:
+            carpeta (str): Carpeta de destino.
+
+        Returns:
+            str: Ruta del archivo JSONL.
+        """
+        os.makedirs(carpeta, exist_ok=True)
+        ruta = os.path.join(carpeta, f"{self.nombre}.jsonl")
+        self.exportar_jsonl(ruta)
+        self.exportar_prometheus(os.path.join(carpeta, f"{self.nombre}.prom"))
+        return ruta
+
+
+class _MetricasNulas(Metricas):
+    """Métricas que no registran nada (cuando no hay una ejecución activa)."""
+
+    def registrar(self, etapa, segundos):
+        pass
+
+    def contar(self, nombre, valor=1):
+        pass
+
+    def articulo(self, url, **campos):
+        pass
+
+
+_NULAS = _MetricasNulas("nulas")
+_actual = None
+_ultima = None
+
+
+def actual() -> Metricas:
+    """Métricas de la ejecución en curso (o unas que no registran nada)."""
+    return _actual or _NULAS
+
+
+def nulas() -> Metricas:
+    """Métricas que no registran nada (para cálculos que no deben contarse dos veces)."""
+    return _NULAS
+
+
+def ultima() -> Optional[Metricas]:
+    """Métricas de la última ejecución terminada en este proceso."""
+    return _ultima
+
+
+@contextmanager
+def ejecucion(nombre: str, exportar: bool = True):
+    """
+    Activa unas métricas nuevas para el proceso mientras dura el bloque y
+    las exporta al terminar.
+
+    Args:
+        nombre (str): Nombre de la ejecución ('scraping', 'backfill'...).
+        exportar (bool): Si se exportan a `RUTA_METRICAS` al terminar.
+    """
+    global _actual, _ultima
+    metricas = Metricas(nombre)
+    anterior, _actual = _actual, metricas
+    try:
+        yield metricas
+    finally:
+        _actual = anterior
+        metricas.terminar()
+        _ultima = metricas
+        if exportar:
+            try:
+                metricas.exportar()
+            except OSError as e:
+                print(f"No se pudieron exportar las métricas: {e}")
+
+
+def cargar_jsonl(ruta: str) -> tuple:
+    """
+    Lee un archivo exportado con `exportar_jsonl`.
+
+    Args:
+        ruta (str): Archivo JSONL.
+
+    Returns:
+        tuple: (resumen o None, lista de registros por noticia).
+    """
+    resumen, articulos = None, []
+    with open(ruta, encoding="utf-8") as archivo:
+        for linea in archivo:
+            registro = json.loads(linea)
+            if registro.pop("tipo", None) == "resumen":
+                resumen = registro
+            else:
+                articulos.append(registro)
+    return resumen, articulos
+
+
+def _escribir_atomico(ruta: str, texto: str) -> None:
+    temporal = f"{ruta}.tmp"
+    with open(temporal, "w", encoding="utf-8") as archivo:
+        archivo.write(texto)
+    os.replace(temporal, ruta)
+
+
+# === Perfilado con cProfile ===
+
+_perfiles = None
+_lock_perfiles = threading.Lock()
+
+
+def perfil_hilo():
+    """
+    Perfila el hilo actual si hay un perfilado activo (`perfilar`). Hasta
+    Python 3.11 cProfile solo mide el hilo que lo activa, por lo que cada
+    hilo de trabajo usa su propio perfil y se combinan al final.
+    """
+    if _perfiles is None:
+        return nullcontext()
+    return _perfilar_hilo()
+
+
+_aviso_un_perfil = threading.Event()
+
+
+@contextmanager
+def _perfilar_hilo():
+    perfil = cProfile.Profile()
+    try:
+        perfil.enable()
+    except ValueError:
+        # Desde Python 3.12 cProfile usa sys.monitoring: admite un solo perfil
+        # activo por proceso. Se sigue sin perfil propio para este hilo.
+        if not _aviso_un_perfil.is_set():
+            _aviso_un_perfil.set()
+            print("Ya hay un perfil activo en el proceso: los hilos de trabajo "
+                  "no se perfilan por separado.")
+        perfil = None
+    try:
+        yield
+    finally:
+        if perfil is not None:
+            perfil.disable()
+            with _lock_perfiles:
+                if _perfiles is not None:
+                    _perfiles.append(perfil)
+
+
+@contextmanager
+def perfilar(ruta: str, lineas: int = 40):
+    """
+    Ejecuta el bloque bajo cProfile (incluidos los hilos que usen
+    `perfil_hilo`) y guarda `<ruta>.pstats` y un resumen en `<ruta>.txt`
+    ordenado por tiempo acumulado. Desde Python 3.12 el perfil del hilo
+    principal ya ve todos los hilos y no se activan perfiles por hilo.
+
+    Args:
+        ruta (str): Ruta base de los archivos de salida.
+        lineas (int): Funciones incluidas en el resumen de texto.
+    """
+    global _perfiles
+    _perfiles = []
+    try:
+        with _perfilar_hilo():
+            yield
+    finally:
+        with _lock_perfiles:
+            perfiles, _perfiles = _perfiles, None
+        if not perfiles:
+            # Otra herramienta (un depurador, coverage) tenía el perfilador
+            print("No se pudo perfilar: ya había otra herramienta de perfilado activa.")
+        else:
+            estadisticas = pstats.Stats(perfiles[0])
+            for perfil in perfiles[1:]:
+                estadisticas.add(perfil)
+            os.makedirs(os.path.dirname(os.path.abspath(ruta)), exist_ok=True)
+            estadisticas.dump_stats(f"{ruta}.pstats")
+            texto = io.StringIO()
+            pstats.Stats(f"{ruta}.pstats", stream=texto).sort_stats("cumulative").print_stats(lineas)
+            with open(f"{ruta}.txt", "w", encoding="utf-8") as archivo:
+                archivo.write(texto.getvalue())
+            print(f"Perfil guardado en {ruta}.pstats y {ruta}.txt")
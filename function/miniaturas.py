@@ -0,0 +1,385 @@
+# miniaturas.py
+
+import hashlib
+import io
+import os
+import sqlite3
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+from typing import Iterable, Optional, Tuple
+from urllib.parse import urljoin, urlparse
+
+from function.constantes import RUTA_CACHE
+from function import metricas
+
+# Carpeta servida por el dashboard como archivos estáticos en `PREFIJO_MINIATURAS`
+RUTA_MINIATURAS = os.path.join(RUTA_CACHE, "miniaturas")
+RUTA_INDICE_MINIATURAS = os.path.join(RUTA_CACHE, "miniaturas.sqlite")
+PREFIJO_MINIATURAS = "/miniaturas"
+
+# Sitio contra el que se resuelven las imágenes con ruta relativa
+URL_SITIO = "https://www.ucr.ac.cr"
+
+# Logo oficial de la UCR; se guarda con un nombre fijo y no se desaloja
+URL_LOGO_UCR = "https://www.ucr.ac.cr/vistas/webucr_ucr_5/imagenes/firma-ucr-c.svg"
+ARCHIVO_LOGO_UCR = "firma-ucr.svg"
+
+# Lado máximo (en píxeles) de las miniaturas
+LADO_MINIATURA = 640
+
+_EXTENSIONES = {".jpg", ".jpeg", ".png", ".gif", ".webp", ".svg"}
+
+# Índice de miniaturas y total de bytes desalojables (las no fijas),
+# mantenido por triggers e inicializado con las filas existentes
+ESQUEMA = """
+BEGIN IMMEDIATE;
+CREATE TABLE IF NOT EXISTS miniaturas (
+    url TEXT PRIMARY KEY, archivo TEXT NOT NULL, tam INTEGER NOT NULL,
+    fija INTEGER NOT NULL DEFAULT 0, acceso REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_miniaturas_acceso ON miniaturas(fija, acceso);
+CREATE TABLE IF NOT EXISTS meta (clave TEXT PRIMARY KEY, valor INTEGER NOT NULL);
+INSERT OR IGNORE INTO meta SELECT 'tam_total', COALESCE(SUM(tam), 0) FROM miniaturas WHERE fija = 0;
+CREATE TRIGGER IF NOT EXISTS miniaturas_tam_ai AFTER INSERT ON miniaturas WHEN new.fija = 0 BEGIN
+    UPDATE meta SET valor = valor + new.tam WHERE clave = 'tam_total';
+END;
+CREATE TRIGGER IF NOT EXISTS miniaturas_tam_ad AFTER DELETE ON miniaturas WHEN old.fija = 0 BEGIN
+    UPDATE meta SET valor = valor - old.tam WHERE clave = 'tam_total';
+END;
+CREATE TRIGGER IF NOT EXISTS miniaturas_tam_au AFTER UPDATE OF tam, fija ON miniaturas BEGIN
+    UPDATE meta SET valor = valor - (CASE WHEN old.fija = 0 THEN old.tam ELSE 0 END)
+                                  + (CASE WHEN new.fija = 0 THEN new.tam ELSE 0 END)
+    WHERE clave = 'tam_total';
+END;
+COMMIT;
+"""
+
+
+_aviso_sin_pillow = threading.Event()
+
+
+def _hay_pillow() -> bool:
+    """Indica si Pillow está instalado; sin él avisa una sola vez por proceso."""
+    try:
+        import PIL  # noqa: F401
+        return True
+    except ImportError:
+        if not _aviso_sin_pillow.is_set():
+            _aviso_sin_pillow.set()
+            print("Pillow no está instalado: las imágenes de las noticias no se guardan como miniaturas.")
+        return False
+
+
+def _es_svg(url: str, contenido: Optional[bytes] = None) -> bool:
+    """Indica si la imagen es vectorial (no hace falta reducirla)."""
+    if os.path.splitext(urlparse(url).path)[1].lower() == ".svg":
+        return True
+    return contenido is not None and contenido.lstrip()[:5].lower() in (b"<svg ", b"<?xml")
+
+
+def _redimensionar(contenido: bytes, lado: int) -> Optional[bytes]:
+    """
+    Reduce la imagen para que su lado mayor no pase de `lado` y la guarda
+    como JPEG. Devuelve None si Pillow no está instalado o no puede leer la
+    imagen.
+    """
+    if not _hay_pillow():
+        return None
+    from PIL import Image
+
+    try:
+        with Image.open(io.BytesIO(contenido)) as imagen:
+            imagen.thumbnail((lado, lado))
+            salida = io.BytesIO()
+            imagen.convert("RGB").save(salida, format="JPEG", quality=80, optimize=True)
+    except (OSError, ValueError, Image.DecompressionBombError):
+        return None
+    return salida.getvalue()
+
+
+class CacheMiniaturas:
+    """
+    Caché en disco de las imágenes de las noticias, reducidas a miniaturas.
+
+    Los archivos se guardan en `carpeta`, que el dashboard sirve como
+    estáticos, así el navegador no descarga la imagen original del sitio en
+    cada cambio de noticia. Un índice SQLite guarda el archivo, el tamaño y
+    el último acceso de cada URL; cuando el total supera `max_bytes` se
+    borran las miniaturas usadas hace más tiempo (las fijas, como el logo,
+    no se desalojan).
+
+    Como en `CacheHTTP`, el tamaño total se lleva en la tabla `meta` y el
+    último acceso solo se reescribe si es más antiguo que `resolucion_acceso`.
+
+    Args:
+        carpeta (str): Carpeta de los archivos.
+        ruta_indice (str): Archivo SQLite del índice.
+        max_bytes (int): Tamaño máximo aproximado de las miniaturas en disco.
+        lado (int): Lado máximo de las miniaturas, en píxeles.
+        resolucion_acceso (float): Segundos de precisión del último acceso para el desalojo.
+    """
+
+    def __init__(self, carpeta: str = RUTA_MINIATURAS, ruta_indice: str = RUTA_INDICE_MINIATURAS,
+                 max_bytes: int = 256 * 1024 * 1024, lado: int = LADO_MINIATURA,
+                 resolucion_acceso: float = 600.0):
+        self.carpeta = carpeta
+        self.max_bytes = max_bytes
+        self.lado = lado
+        self.resolucion_acceso = resolucion_acceso
+        self._lock = threading.Lock()
+        os.makedirs(carpeta, exist_ok=True)
+        os.makedirs(os.path.dirname(ruta_indice) or ".", exist_ok=True)
+        self._conn = sqlite3.connect(ruta_indice, check_same_thread=False, timeout=60)
+        self._conn.executescript(ESQUEMA)
+
+    def obtener(self, url: str) -> Optional[str]:
+        """
+        Busca la miniatura de una URL y marca el acceso.
+
+        Args:
+            url (str): Dirección de la imagen original.
+
+        Returns:
+            Optional[str]: Nombre del archivo dentro de `carpeta`, o None.
+        """
+        with self._lock:
+            fila = self._conn.execute("SELECT archivo, acceso FROM miniaturas WHERE url = ?", (url,)).fetchone()
+            if fila is None:
+                return None
+            if not os.path.exists(os.path.join(self.carpeta, fila[0])):
+                # Borrada a mano o por otro proceso
+                self._conn.execute("DELETE FROM miniaturas WHERE url = ?", (url,))
+                self._conn.commit()
+                return None
+            ahora = time.time()
+            if ahora - fila[1] > self.resolucion_acceso:
+                self._conn.execute("UPDATE miniaturas SET acceso = ? WHERE url = ?", (ahora, url))
+                self._conn.commit()
+        return fila[0]
+
+    def guardar(self, url: str, contenido: bytes, archivo: Optional[str] = None,
+                fija: bool = False) -> Optional[str]:
+        """
+        Reduce la imagen, la escribe en `carpeta` de forma atómica y aplica
+        el desalojo por tamaño. Las imágenes vectoriales y las fijas se
+        guardan tal cual; un mapa de bits que no se pudo reducir (sin Pillow
+        o ilegible) no se guarda, para no servir el original como miniatura.
+
+        Args:
+            url (str): Dirección de la imagen original.
+            contenido (bytes): Imagen descargada.
+            archivo (str, optional): Nombre del archivo. Por defecto, un hash de la URL.
+            fija (bool): Si la imagen no debe desalojarse nunca.
+
+        Returns:
+            Optional[str]: Nombre del archivo dentro de `carpeta`, o None si no se guardó.
+        """
+        original = fija or _es_svg(url, contenido)
+        miniatura = None if original else _redimensionar(contenido, self.lado)
+        if miniatura is None and not original:
+            metricas.actual().contar("miniaturas_sin_reducir")
+            return None
+        if archivo is None:
+            extension = ".jpg" if miniatura is not None else os.path.splitext(urlparse(url).path)[1].lower()
+            archivo = hashlib.sha256(url.encode("utf-8")).hexdigest()[:32] + (
+                extension if extension in _EXTENSIONES else ".img")
+        contenido = miniatura if miniatura is not None else contenido
+
+        destino = os.path.join(self.carpeta, archivo)
+        temporal = f"{destino}.tmp-{threading.get_ident()}"
+        with open(temporal, "wb") as f:
+            f.write(contenido)
+        os.replace(temporal, destino)
+
+        with self._lock:
+            # Con UPSERT (y no REPLACE) se disparan los triggers del total
+            self._conn.execute(
+                "INSERT INTO miniaturas VALUES (?, ?, ?, ?, ?) ON CONFLICT(url) DO UPDATE SET"
+                " archivo = excluded.archivo, tam = excluded.tam, fija = excluded.fija, acceso = excluded.acceso",
+                (url, archivo, len(contenido), int(fija), time.time())
+            )
+            self._desalojar()
+            self._conn.commit()
+        return archivo
+
+    def descargar(self, urls: Iterable[str], descargador, hilos: int = 4) -> int:
+        """
+        Descarga y guarda las imágenes que todavía no están en la caché.
+
+        Args:
+            urls (Iterable[str]): Direcciones de las imágenes (se ignoran las vacías).
+            descargador (Descargador): Cliente HTTP (respeta su límite de tasa).
+            hilos (int): Descargas simultáneas.
+
+        Returns:
+            int: Número de imágenes nuevas guardadas.
+        """
+        pendientes = [url for url in dict.fromkeys(u for u in urls if isinstance(u, str) and u)
+                      if self.obtener(url) is None]
+        if not pendientes:
+            return 0
+        with ThreadPoolExecutor(max_workers=max(1, min(hilos, len(pendientes)))) as pool:
+            return sum(pool.map(lambda url: self.descargar_una(url, descargador), pendientes))
+
+    def descargar_una(self, url: str, descargador) -> bool:
+        """
+        Descarga y guarda una imagen si todavía no está en la caché.
+
+        Args:
+            url (str): Dirección de la imagen.
+            descargador (Descargador): Cliente HTTP.
+
+        Returns:
+            bool: True si se guardó una miniatura nueva.
+        """
+        if not isinstance(url, str) or not url or self.obtener(url) is not None:
+            return False
+        absoluta = urljoin(URL_SITIO, url)
+        if urlparse(absoluta).scheme not in ("http", "https"):
+            return False
+        if not _es_svg(absoluta) and not _hay_pillow():
+            # Sin Pillow no se podría reducir: se deja la imagen original del sitio
+            metricas.actual().contar("miniaturas_sin_pillow")
+            return False
+        contenido = descargador.obtener_binario(absoluta)
+        if not contenido:
+            return False
+        return self.guardar(url, contenido) is not None
+
+    def _desalojar(self) -> None:
+        total = self._conn.execute("SELECT valor FROM meta WHERE clave = 'tam_total'").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        sobrante = total - self.max_bytes
+        liberado = 0
+        borrar = []
+        for url, archivo, tam in self._conn.execute(
+                "SELECT url, archivo, tam FROM miniaturas WHERE fija = 0 ORDER BY acceso"):
+            borrar.append((url, archivo))
+            liberado += tam
+            if liberado >= sobrante:
+                break
+        self._conn.executemany("DELETE FROM miniaturas WHERE url = ?", [(url,) for url, _ in borrar])
+        for _, archivo in borrar:
+            try:
+                os.remove(os.path.join(self.carpeta, archivo))
+            except OSError:
+                pass
+
+    def cerrar(self) -> None:
+        """Cierra la conexión con el índice de la caché."""
+        self._conn.close()
+
+
+@lru_cache(maxsize=None)
+def obtener_cache_miniaturas() -> CacheMiniaturas:
+    """Devuelve la caché de miniaturas compartida por el proceso."""
+    return CacheMiniaturas()
+
+
+def ruta_estatica(url: str) -> Optional[str]:
+    """
+    Ruta bajo `PREFIJO_MINIATURAS` de la miniatura de una imagen, si ya está en la caché.
+
+    Args:
+        url (str): Dirección de la imagen original.
+
+    Returns:
+        Optional[str]: Ruta para el atributo `src`, o None.
+    """
+    if not isinstance(url, str) or not url:
+        return None
+    archivo = obtener_cache_miniaturas().obtener(url)
+    return f"{PREFIJO_MINIATURAS}/{archivo}" if archivo else None
+
+
+def guardar_logo(descargador) -> Tuple[bool, str]:
+    """
+    Descarga el logo de la UCR a la caché (una sola vez) para servirlo localmente.
+
+    Args:
+        descargador (Descargador): Cliente HTTP.
+
+    Returns:
+        Tuple[bool, str]: (si el logo está disponible, ruta para el atributo `src`).
+    """
+    cache = obtener_cache_miniaturas()
+    ruta = f"{PREFIJO_MINIATURAS}/{ARCHIVO_LOGO_UCR}"
+    if cache.obtener(URL_LOGO_UCR) is not None:
+        return True, ruta
+    contenido = descargador.obtener_binario(URL_LOGO_UCR)
+    if not contenido:
+        return False, ruta
+    cache.guardar(URL_LOGO_UCR, contenido, archivo=ARCHIVO_LOGO_UCR, fija=True)
+    return True, ruta
+
+
+class PrecargaMiniaturas:
+    """
+    Descarga miniaturas en segundo plano para el dashboard (la imagen actual,
+    las de las noticias vecinas y el logo), sin repetir las que ya están en
+    la caché o en curso. El cliente HTTP se crea en el primer uso.
+
+    Args:
+        hilos (int): Descargas simultáneas.
+        tasa (float): Peticiones por segundo permitidas.
+    """
+
+    def __init__(self, hilos: int = 2, tasa: float = 4.0):
+        self.hilos = hilos
+        self.tasa = tasa
+        self._executor = ThreadPoolExecutor(max_workers=hilos, thread_name_prefix="miniaturas")
+        self._lock = threading.Lock()
+        self._en_curso = set()
+        self._descargador = None
+
+    def _cliente(self):
+        from function.descarga import Descargador
+
+        with self._lock:
+            if self._descargador is None:
+                self._descargador = Descargador(max_por_host=self.hilos, tasa=self.tasa)
+            return self._descargador
+
+    def pedir(self, urls: Iterable[str]) -> None:
+        """
+        Encola la descarga de las imágenes que falten.
+
+        Args:
+            urls (Iterable[str]): Direcciones de las imágenes (se ignoran las vacías).
+        """
+        for url in urls:
+            if not isinstance(url, str) or not url:
+                continue
+            with self._lock:
+                if url in self._en_curso:
+                    continue
+                self._en_curso.add(url)
+            self._executor.submit(self._descargar, url)
+
+    def _descargar(self, url: str) -> None:
+        try:
+            obtener_cache_miniaturas().descargar_una(url, self._cliente())
+        except Exception:
+            metricas.actual().contar("errores_miniaturas")
+        finally:
+            with self._lock:
+                self._en_curso.discard(url)
+
+    def logo(self) -> None:
+        """Encola la descarga del logo de la UCR si todavía no está en la caché."""
+        self._executor.submit(self._logo)
+
+    def _logo(self) -> None:
+        try:
+            guardar_logo(self._cliente())
+        except Exception:
+            metricas.actual().contar("errores_miniaturas")
+
+
+@lru_cache(maxsize=None)
+def obtener_precarga() -> PrecargaMiniaturas:
+    """Devuelve la precarga compartida por todas las sesiones del dashboard."""
+    return PrecargaMiniaturas()
@@ -0,0 +1,114 @@
+# palabras_clave.py
+
+from collections import Counter, deque
+from typing import Dict, Iterable, Sequence, Tuple
+
+
+class BuscadorPalabrasClave:
+    """
+    Autómata de Aho–Corasick sobre tokens: encuentra en una sola pasada
+    lineal todas las apariciones de palabras clave de una o varias palabras
+    dentro de una secuencia de lemas.
+
+    Las transiciones usan ids enteros en lugar de cadenas: cada lema se
+    traduce una sola vez con `ids` y, si no es parte de ninguna palabra
+    clave, el autómata vuelve directamente al estado inicial.
+
+    Args:
+        patrones (Iterable[Tuple[str, Sequence[str]]]): Pares (palabra clave,
+            secuencia de tokens que la representan). Una palabra clave puede
+            tener varias secuencias (por ejemplo, su forma normalizada y su forma lematizada).
+        pesos (Dict[str, float], optional): Peso de cada palabra clave (1 por defecto).
+        ids (Dict[str, int], optional): Ids enteros de los tokens (por ejemplo,
+            `Vocabulario.ids`); los tokens que falten reciben ids nuevos.
+    """
+
+    def __init__(self, patrones: Iterable[Tuple[str, Sequence[str]]], pesos: Dict[str, float] = None,
+                 ids: Dict[str, int] = None):
+        self.pesos = dict(pesos or {})
+        self.ids = dict(ids or {})
+        self._siguiente = [{}]
+        self._fallo = [0]
+        self._salidas = [set()]
+
+        nuevo_id = max(self.ids.values(), default=0) + 1
+        for palabra, tokens in patrones:
+            estado = 0
+            for token in tokens:
+                if token not in self.ids:
+                    self.ids[token] = nuevo_id
+                    nuevo_id += 1
+                token = self.ids[token]
+                if token not in self._siguiente[estado]:
+                    self._siguiente.append({})
+                    self._fallo.append(0)
+                    self._salidas.append(set())
+                    self._siguiente[estado][token] = len(self._siguiente) - 1
+                estado = self._siguiente[estado][token]
+            if tokens:
+                self._salidas[estado].add(palabra)
+
+        # Enlaces de fallo por recorrido en anchura
+        cola = deque(self._siguiente[0].values())
+        while cola:
+            estado = cola.popleft()
+            for token, hijo in self._siguiente[estado].items():
+                cola.append(hijo)
+                fallo = self._fallo[estado]
+                while fallo and token not in self._siguiente[fallo]:
+                    fallo = self._fallo[fallo]
+                self._fallo[hijo] = self._siguiente[fallo].get(token, 0)
+                self._salidas[hijo] |= self._salidas[self._fallo[hijo]]
+
+        self._salidas = [frozenset(s) for s in self._salidas]
+
+    def buscar(self, tokens: Iterable[str]) -> Counter:
+        """
+        Cuenta las apariciones de cada palabra clave en la secuencia.
+
+        Args:
+            tokens (Iterable[str]): Lemas del documento, en orden.
+
+        Returns:
+            Counter: Apariciones por palabra clave.
+        """
+        siguiente, fallo, salidas, ids = self._siguiente, self._fallo, self._salidas, self.ids
+        encontradas = Counter()
+        estado = 0
+        for token in tokens:
+            token = ids.get(token)
+            if token is None:
+                # Ninguna palabra clave contiene este lema
+                estado = 0
+                continue
+            while estado and token not in siguiente[estado]:
+                estado = fallo[estado]
+            estado = siguiente[estado].get(token, 0)
+            if salidas[estado]:
+                encontradas.update(salidas[estado])
+        return encontradas
+
+    def puntaje(self, encontradas: Counter) -> float:
+        """Suma ponderada de las apariciones de cada palabra clave."""
+        return float(sum(n * self.pesos.get(palabra, 1.0) for palabra, n in encontradas.items()))
+
+
+def pesos_palabras_clave(categorias: Dict[str, Sequence[str]], pesos_categorias: Dict[str, float],
+                         pesos_palabras: Dict[str, float]) -> Dict[str, float]:
+    """
+    Combina el peso de cada categoría (verbos, sustantivos, adjetivos) con el
+    peso propio de cada palabra clave.
+
+    Args:
+        categorias (Dict[str, Sequence[str]]): Palabras clave por categoría.
+        pesos_categorias (Dict[str, float]): Peso de cada categoría.
+        pesos_palabras (Dict[str, float]): Peso propio de algunas palabras clave.
+
+    Returns:
+        Dict[str, float]: Peso final de cada palabra clave.
+    """
+    pesos = {}
+    for categoria, palabras in categorias.items():
+        for palabra in palabras:
+            pesos[palabra] = pesos_categorias.get(categoria, 1.0) * pesos_palabras.get(palabra, 1.0)
+    return pesos
@@ -0,0 +1,296 @@
+# parseo.py
+
+import os
+from functools import lru_cache
+from typing import Callable, Dict, List, Optional
+from urllib.parse import urljoin
+
+from function.constantes import TEXTO_BASURA
+
+# Orden de preferencia de los backends (se usa el primero instalado);
+# OTECEU_PARSER permite forzar uno
+BACKENDS = ("selectolax", "lxml", "bs4")
+
+# Contenedores del cuerpo de una noticia, en orden de preferencia
+CONTENEDORES_ARTICULO = ("article", "main")
+
+# Secciones del sitio que nunca son parte del cuerpo de la noticia
+SECCIONES_EXCLUIDAS = ("header", "nav", "footer", "aside", "script", "style", "form")
+
+# Párrafos más cortos que esto no se comparan contra el texto fijo del sitio
+_MIN_BASURA = 20
+
+
+def es_basura(parrafo: str) -> bool:
+    """
+    Indica si un párrafo es parte del texto fijo del sitio (menús y
+    descripciones que aparecen en todas las páginas, ver `TEXTO_BASURA`).
+
+    Args:
+        parrafo (str): Texto del párrafo, sin espacios al inicio ni al final.
+
+    Returns:
+        bool: True si el párrafo debe descartarse.
+    """
+    return len(parrafo) >= _MIN_BASURA and parrafo in TEXTO_BASURA
+
+
+def _tarjeta(titulo: str, href: Optional[str], fecha: Optional[str], resumen: Optional[str],
+             imagen: Optional[str], autor: Optional[str], base_url: str) -> dict:
+    return {
+        "titulo_articulo": titulo.strip(),
+        "fecha_publicacion": fecha.strip() if fecha is not None else "",
+        "resumen_art": resumen.strip() if resumen is not None else "Sin resumen",
+        "imagen_url": imagen,
+        "autor_redacta": autor.strip() if autor is not None else "Desconocido",
+        "notice_url": _absoluta(base_url, href),
+    }
+
+
+@lru_cache(maxsize=16)
+def _raiz_sitio(base_url: str) -> str:
+    return urljoin(base_url, "/").rstrip("/")
+
+
+def _absoluta(base_url: str, href: Optional[str]) -> str:
+    # Atajo para los enlaces relativos a la raíz del sitio (el caso normal)
+    if href and href.startswith("/") and not href.startswith("//") and "/." not in href:
+        return _raiz_sitio(base_url) + href
+    return urljoin(base_url, href)
+
+
+def _unir_parrafos(parrafos: List[str]) -> str:
+    return ' '.join(p for p in parrafos if not es_basura(p.strip())).strip()
+
+
+# === selectolax ===
+
+def _listado_selectolax(html: str, base_url: str) -> list:
+    from selectolax.parser import HTMLParser
+
+    tarjetas = []
+    for notice in HTMLParser(html).css("div.noticia.item.tarjeta"):
+        enlace = notice.css_first("a.marco")
+        if enlace is None:
+            continue
+
+        def texto(selector):
+            nodo = notice.css_first(selector)
+            return nodo.text() if nodo is not None else None
+
+        imagen = notice.css_first("img")
+        tarjetas.append(_tarjeta(
+            enlace.text(), enlace.attributes.get("href"), texto("span.dia"), texto("p.resumen"),
+            imagen.attributes.get("src") if imagen is not None else None, texto("div.autores"), base_url
+        ))
+    return tarjetas
+
+
+def _articulo_selectolax(html: str) -> str:
+    from selectolax.parser import HTMLParser
+
+    arbol = HTMLParser(html)
+    raiz = next((nodo for nodo in (arbol.css_first(c) for c in CONTENEDORES_ARTICULO) if nodo is not None), arbol.root)
+    if raiz is None:
+        return ""
+    for nodo in raiz.css(", ".join(SECCIONES_EXCLUIDAS)):
+        nodo.decompose()
+    return _unir_parrafos([p.text() for p in raiz.css("p")])
+
+
+# === lxml ===
+
+def _clases(*clases: str) -> str:
+    return " and ".join(f"contains(concat(' ', normalize-space(@class), ' '), ' {c} ')" for c in clases)
+
+
+_XPATH_TARJETAS = f"//div[{_clases('noticia', 'item', 'tarjeta')}]"
+_XPATH_EXCLUIDAS = " | ".join(f".//{s}" for s in SECCIONES_EXCLUIDAS)
+
+
+def _arbol_lxml(html: str):
+    from lxml import etree
+
+    # El parser de etree, sin las clases de elemento de lxml.html, es más rápido
+    try:
+        return etree.fromstring(html, etree.HTMLParser())
+    except ValueError:
+        # Documentos con declaración de codificación: se parsean como bytes
+        return etree.fromstring(html.encode("utf-8"), etree.HTMLParser(encoding="utf-8"))
+
+
+def _quitar_lxml(nodo) -> None:
+    # Como `drop_tree` de lxml.html: conserva el texto que sigue al nodo
+    padre = nodo.getparent()
+    if padre is None:
+        return
+    if nodo.tail:
+        anterior = nodo.getprevious()
+        if anterior is not None:
+            anterior.tail = (anterior.tail or "") + nodo.tail
+        else:
+            padre.text = (padre.text or "") + nodo.tail
+    padre.remove(nodo)
+
+
+def _texto_lxml(nodo) -> str:
+    return "".join(nodo.itertext())
+
+
+def _listado_lxml(html: str, base_url: str) -> list:
+    tarjetas = []
+    arbol = _arbol_lxml(html)
+    if arbol is None:
+        return []
+    for notice in arbol.xpath(_XPATH_TARJETAS):
+        # Una sola pasada por los descendientes de la tarjeta; se queda el primero de cada campo
+        campos = {}
+        for nodo in notice.iter("a", "span", "p", "div", "img"):
+            clases = (nodo.get("class") or "").split()
+            campo = ("imagen" if nodo.tag == "img" else
+                     "enlace" if nodo.tag == "a" and "marco" in clases else
+                     "fecha" if nodo.tag == "span" and "dia" in clases else
+                     "resumen" if nodo.tag == "p" and "resumen" in clases else
+                     "autor" if nodo.tag == "div" and "autores" in clases else None)
+            if campo is not None and campo not in campos:
+                campos[campo] = nodo
+        enlace = campos.get("enlace")
+        if enlace is None:
+            continue
+
+        def texto(campo):
+            return _texto_lxml(campos[campo]) if campo in campos else None
+
+        tarjetas.append(_tarjeta(
+            _texto_lxml(enlace), enlace.get("href"), texto("fecha"), texto("resumen"),
+            campos["imagen"].get("src") if "imagen" in campos else None, texto("autor"), base_url
+        ))
+    return tarjetas
+
+
+def _articulo_lxml(html: str) -> str:
+    documento = _arbol_lxml(html)
+    if documento is None:
+        return ""
+    raiz = next((nodos[0] for nodos in (documento.xpath(f"//{c}") for c in CONTENEDORES_ARTICULO) if nodos), documento)
+    for nodo in raiz.xpath(_XPATH_EXCLUIDAS):
+        _quitar_lxml(nodo)
+    return _unir_parrafos([_texto_lxml(p) for p in raiz.iter("p")])
+
+
+# === BeautifulSoup (respaldo) ===
+
+def _listado_bs4(html: str, base_url: str) -> list:
+    from bs4 import BeautifulSoup, SoupStrainer
+
+    # Solo se construye el árbol de las tarjetas
+    solo_tarjetas = SoupStrainer("div", class_="noticia item tarjeta")
+    tarjetas = []
+    for notice in BeautifulSoup(html, "html.parser", parse_only=solo_tarjetas).find_all("div", class_="noticia item tarjeta"):
+        enlace = notice.find("a", class_="marco")
+        if not enlace:
+            continue
+
+        def texto(nombre, clase):
+            nodo = notice.find(nombre, class_=clase)
+            return nodo.text if nodo else None
+
+        imagen = notice.find("img")
+        tarjetas.append(_tarjeta(
+            enlace.text, enlace.get("href"), texto("span", "dia"), texto("p", "resumen"),
+            imagen.get("src") if imagen else None, texto("div", "autores"), base_url
+        ))
+    return tarjetas
+
+
+def _articulo_bs4(html: str) -> str:
+    from bs4 import BeautifulSoup, SoupStrainer
+
+    sopa = BeautifulSoup(html, "html.parser", parse_only=SoupStrainer(list(CONTENEDORES_ARTICULO)))
+    raiz = next((nodo for nodo in (sopa.find(c) for c in CONTENEDORES_ARTICULO) if nodo is not None), None)
+    if raiz is None:
+        # Sin contenedor conocido: documento completo
+        raiz = BeautifulSoup(html, "html.parser")
+    for nodo in raiz.find_all(list(SECCIONES_EXCLUIDAS)):
+        nodo.decompose()
+    return _unir_parrafos([p.text for p in raiz.find_all("p")])
+
+
+_PARSERS: Dict[str, tuple] = {
+    "selectolax": (_listado_selectolax, _articulo_selectolax),
+    "lxml": (_listado_lxml, _articulo_lxml),
+    "bs4": (_listado_bs4, _articulo_bs4),
+}
+
+
+_MODULOS = {"selectolax": "selectolax.parser", "lxml": "lxml.html", "bs4": "bs4"}
+
+
+def _disponible(backend: str) -> bool:
+    try:
+        __import__(_MODULOS[backend])
+        return True
+    except ImportError:
+        return False
+
+
+def elegir_backend(preferido: Optional[str] = None) -> str:
+    """
+    Elige el backend de parseo: el pedido (o `OTECEU_PARSER`) si está
+    instalado; si no, el primero disponible de `BACKENDS`.
+
+    Args:
+        preferido (str, optional): 'selectolax', 'lxml' o 'bs4'.
+
+    Returns:
+        str: Nombre del backend elegido.
+    """
+    preferido = preferido or os.environ.get("OTECEU_PARSER")
+    if preferido:
+        if preferido not in _PARSERS:
+            raise ValueError(f"Backend de parseo desconocido: {preferido} (opciones: {', '.join(BACKENDS)})")
+        if _disponible(preferido):
+            return preferido
+        print(f"El backend de parseo '{preferido}' no está instalado; se usa otro.")
+    return next(b for b in BACKENDS if _disponible(b))
+
+
+BACKEND = elegir_backend()
+
+
+def parsear_listado(html: str, base_url: str, backend: Optional[str] = None) -> list:
+    """
+    Extrae las tarjetas de noticias de una página de listado, sin construir
+    el árbol del resto de la página.
+
+    Args:
+        html (str): HTML de la página de listado.
+        base_url (str): URL base para completar los enlaces relativos.
+        backend (str, optional): Backend a usar. Por defecto `BACKEND`.
+
+    Returns:
+        list: Lista de diccionarios con los campos de cada tarjeta.
+    """
+    if not html or not html.strip():
+        return []
+    funcion: Callable = _PARSERS[backend or BACKEND][0]
+    return funcion(html, base_url)
+
+
+def parsear_articulo(html: str, backend: Optional[str] = None) -> str:
+    """
+    Extrae el texto de una noticia: los párrafos del contenedor del cuerpo,
+    sin encabezado, menús ni pie de página, y sin los párrafos del texto
+    fijo del sitio.
+
+    Args:
+        html (str): HTML de la página de la noticia.
+        backend (str, optional): Backend a usar. Por defecto `BACKEND`.
+
+    Returns:
+        str: Texto de la noticia ('' si la página no tiene párrafos).
+    """
+    if not html or not html.strip():
+        return ""
+    funcion: Callable = _PARSERS[backend or BACKEND][1]
+    return funcion(html)
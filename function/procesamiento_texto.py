@@ -1,69 +1,288 @@
 # procesamiento_texto.py
 
+from collections import Counter
+from functools import lru_cache
 import pandas as pd
-import spacy
-from nltk.corpus import stopwords
-from typing import List, Optional
-import nltk
-from function.utilidades import word_tokenize, quitar_tildes, singularizar
-from function.constantes import KEY_WORDS
+from typing import TYPE_CHECKING, List, Optional, Tuple
+from function.utilidades import normalizar_texto
+from function.cache_lemas import CacheLemas, clave_texto
+from function.palabras_clave import BuscadorPalabrasClave
+from function import metricas
+
+# spaCy y NLTK tardan en importarse: se cargan en el primer uso
+if TYPE_CHECKING:
+    from spacy.language import Language
+
+# Modelo de spaCy y componentes que necesita la lematización
+MODELO_SPACY = "es_core_news_sm"
+COMPONENTES_LEMATIZACION = ("tok2vec", "morphologizer", "attribute_ruler", "lemmatizer")
+
+@lru_cache(maxsize=None)
+def cargar_modelo(nombre: str = MODELO_SPACY) -> "Language":
+    """
+    Carga el modelo de spaCy una sola vez por proceso, conservando solo
+    los componentes necesarios para lematizar.
+
+    Args:
+        nombre (str): Nombre del modelo de spaCy.
+
+    Returns:
+        spacy.language.Language: Modelo cargado (se reutiliza en llamadas posteriores).
+    """
+    import spacy
+
+    nlp = spacy.load(nombre, exclude=["parser", "ner", "senter"])
+    for componente in list(nlp.pipe_names):
+        if componente not in COMPONENTES_LEMATIZACION:
+            nlp.remove_pipe(componente)
+    return nlp
+
+@lru_cache(maxsize=None)
+def obtener_cache_lemas() -> CacheLemas:
+    """Devuelve la caché de lemas compartida por el proceso."""
+    return CacheLemas()
+
+def version_modelo(nlp: "Language") -> str:
+    """Identificador del modelo (idioma, nombre y versión) usado en las claves de caché."""
+    return f"{nlp.meta.get('lang')}_{nlp.meta.get('name')}-{nlp.meta.get('version')}"
+
+def limpiar_texto(text: str, stopwords_set: frozenset) -> str:
+    """
+    Tokeniza, pasa a minúsculas, elimina stopwords y tildes y singulariza un texto.
+
+    Args:
+        text (str): Texto a limpiar.
+        stopwords_set (frozenset): Conjunto de palabras a eliminar.
+
+    Returns:
+        str: Texto limpio listo para lematizar.
+    """
+    return ' '.join(normalizar_texto(text, stopwords_set))
+
+@lru_cache(maxsize=8)
+def compilar_buscador(key_words: tuple, pesos: tuple = (), ids: tuple = ()) -> BuscadorPalabrasClave:
+    """
+    Compila una sola vez por proceso el buscador de palabras clave.
+
+    Cada palabra clave se busca en su forma normalizada; las frases de
+    varias palabras también en su forma lematizada, ya que el texto se
+    compara lema a lema ("recurso destinado" -> "recurso destinar").
+
+    Args:
+        key_words (tuple): Palabras clave normalizadas.
+        pesos (tuple): Pares (palabra clave, peso) ordenados.
+        ids (tuple): Pares (token, id entero) ordenados, por ejemplo de `Vocabulario.ids`.
+
+    Returns:
+        BuscadorPalabrasClave: Buscador compilado.
+    """
+    nlp = cargar_modelo()
+    patrones = []
+    for palabra in key_words:
+        tokens = tuple(palabra.split())
+        patrones.append((palabra, tokens))
+        if len(tokens) > 1:
+            lemas = tuple(token.lemma_ for token in nlp(palabra))
+            if lemas != tokens:
+                patrones.append((palabra, lemas))
+    return BuscadorPalabrasClave(patrones, dict(pesos), dict(ids))
+
+def lematizar_columna(df: pd.DataFrame, col: str,
+                      stopwords_list: list = None,
+                      batch_size: int = 64,
+                      n_process: int = 1,
+                      usar_cache: bool = True,
+                      registrar: bool = True) -> List[Optional[list]]:
+    """
+    Limpia y lematiza una columna de texto.
+
+    Los documentos se lematizan en lotes con `nlp.pipe` usando el modelo
+    cacheado por `cargar_modelo`. Con `usar_cache` los lemas de cada
+    artículo se guardan en disco y solo se lematizan los textos nuevos.
+
+    Args:
+        df (pd.DataFrame): DataFrame que contiene los datos.
+        col (str): Nombre de la columna a procesar.
+        stopwords_list (list, optional): Lista de palabras a eliminar.
+                                         Si es None, se usan las stopwords de NLTK en español.
+        batch_size (int): Documentos por lote enviados a spaCy.
+        n_process (int): Procesos que usa spaCy para lematizar.
+        usar_cache (bool): Si se usa la caché de lemas en disco.
+        registrar (bool): Si se registran tiempos y contadores en `metricas`.
+
+    Returns:
+        List[Optional[list]]: Secuencia de lemas por fila (None si el texto es nulo).
+    """
+    registro = metricas.actual() if registrar else metricas.nulas()
+    if stopwords_list is None:
+        from nltk.corpus import stopwords
+        stopwords_list = stopwords.words('spanish')
+    # `Vocabulario.stopwords` ya es un frozenset y se usa tal cual
+    stopwords_set = stopwords_list if isinstance(stopwords_list, frozenset) else frozenset(stopwords_list)
+
+    nlp = cargar_modelo()
+
+    textos = df[col].tolist()
+    posiciones = [pos for pos, text in enumerate(textos) if not pd.isnull(text)]
+
+    # Tokenización y limpieza
+    with registro.medir("limpieza"):
+        limpios = [limpiar_texto(textos[pos], stopwords_set) for pos in posiciones]
+
+    version = version_modelo(nlp)
+    claves = [clave_texto(text, version) for text in limpios]
+    cache = obtener_cache_lemas() if usar_cache else None
+    with registro.medir("cache_lemas"):
+        lemas_por_clave = cache.obtener_varios(claves) if cache else {}
+
+    # Lematización únicamente de los textos que no están en caché
+    pendientes = {}
+    for clave, text in zip(claves, limpios):
+        if clave not in lemas_por_clave and clave not in pendientes:
+            pendientes[clave] = text
+
+    with registro.medir("spacy"):
+        docs = nlp.pipe(pendientes.values(), batch_size=batch_size, n_process=n_process)
+        nuevos = {clave: [token.lemma_ for token in doc] for clave, doc in zip(pendientes, docs)}
+    lemas_por_clave.update(nuevos)
+    if cache:
+        cache.guardar_varios(nuevos)
+    registro.contar("cache_lemas_aciertos", len(claves) - len(pendientes))
+    registro.contar("cache_lemas_fallos", len(pendientes))
+
+    lemas = [None] * len(df)
+    urls = df['notice_url'].tolist() if 'notice_url' in df.columns else None
+    for pos, clave, limpio in zip(posiciones, claves, limpios):
+        lemas[pos] = lemas_por_clave[clave]
+        tokens = limpio.count(" ") + 1 if limpio else 0
+        registro.contar("tokens", tokens)
+        registro.contar("lemas", len(lemas[pos]))
+        if urls is not None:
+            registro.articulo(urls[pos], tokens=tokens, lemas=len(lemas[pos]))
+    return lemas
+
+def puntuar_textos(df: pd.DataFrame, col: str,
+                   stopwords_list: list = None,
+                   key_words: list = None,
+                   pesos: dict = None,
+                   batch_size: int = 64,
+                   n_process: int = 1,
+                   usar_cache: bool = True,
+                   ids: dict = None) -> Tuple[list, list]:
+    """
+    Cuenta las palabras clave (de una o varias palabras) de cada fila y
+    calcula su puntaje ponderado, recorriendo los lemas una sola vez.
+
+    Args:
+        df (pd.DataFrame): DataFrame que contiene los datos.
+        col (str): Nombre de la columna a procesar.
+        stopwords_list (list, optional): Lista de palabras a eliminar.
+        key_words (list): Lista de palabras clave.
+        pesos (dict, optional): Peso de cada palabra clave (1 por defecto).
+        batch_size (int): Documentos por lote enviados a spaCy.
+        n_process (int): Procesos que usa spaCy para lematizar.
+        usar_cache (bool): Si se usa la caché de lemas en disco.
+        ids (dict, optional): Ids enteros de los tokens (`Vocabulario.ids`).
+
+    Returns:
+        Tuple[list, list]: Conteos y puntajes ponderados por fila, en el orden del DataFrame.
+    """
+    counts, puntajes, _ = puntuar_con_palabras(df, col, stopwords_list, key_words, pesos,
+                                               batch_size, n_process, usar_cache, ids)
+    return counts, puntajes
+
+def puntuar_con_palabras(df: pd.DataFrame, col: str,
+                         stopwords_list: list = None,
+                         key_words: list = None,
+                         pesos: dict = None,
+                         batch_size: int = 64,
+                         n_process: int = 1,
+                         usar_cache: bool = True,
+                         ids: dict = None) -> Tuple[list, list, List[Optional[Counter]]]:
+    """
+    Igual que `puntuar_textos`, pero devuelve además las apariciones de
+    cada palabra clave por fila, para alimentar los agregados sin volver a
+    lematizar ni buscar.
+
+    Returns:
+        Tuple[list, list, List[Optional[Counter]]]: Conteos, puntajes
+        ponderados y apariciones por fila (None si el texto es nulo).
+    """
+    buscador = compilar_buscador(tuple(dict.fromkeys(key_words or ())), tuple(sorted((pesos or {}).items())),
+                                 tuple(sorted((ids or {}).items())))
+    lemas = lematizar_columna(df, col, stopwords_list, batch_size, n_process, usar_cache)
+
+    registro = metricas.actual()
+    urls = df['notice_url'].tolist() if 'notice_url' in df.columns else None
+    counts, puntajes, palabras = [0] * len(df), [0.0] * len(df), [None] * len(df)
+    with registro.medir("palabras_clave"):
+        for pos, secuencia in enumerate(lemas):
+            if secuencia is None:
+                continue
+            encontradas = buscador.buscar(secuencia)
+            palabras[pos] = encontradas
+            counts[pos] = sum(encontradas.values())
+            puntajes[pos] = buscador.puntaje(encontradas)
+            if urls is not None:
+                registro.articulo(urls[pos], aciertos=counts[pos])
+    registro.contar("aciertos", sum(counts))
+    return counts, puntajes, palabras
+
+def contar_palabras(df: pd.DataFrame, col: str,
+                    stopwords_list: list = None,
+                    key_words: list = None,
+                    batch_size: int = 64,
+                    n_process: int = 1,
+                    usar_cache: bool = True,
+                    ids: dict = None) -> List[Optional[Counter]]:
+    """
+    Apariciones de cada palabra clave por fila, sin registrar métricas
+    (se usa para los agregados, sobre textos que normalmente ya se
+    puntuaron y cuyos lemas están en la caché).
+
+    Args:
+        df (pd.DataFrame): DataFrame que contiene los datos.
+        col (str): Nombre de la columna a procesar.
+        stopwords_list (list, optional): Lista de palabras a eliminar.
+        key_words (list): Lista de palabras clave.
+        batch_size (int): Documentos por lote enviados a spaCy.
+        n_process (int): Procesos que usa spaCy para lematizar.
+        usar_cache (bool): Si se usa la caché de lemas en disco.
+        ids (dict, optional): Ids enteros de los tokens (`Vocabulario.ids`).
+
+    Returns:
+        List[Optional[Counter]]: Apariciones por palabra clave de cada fila (None si el texto es nulo).
+    """
+    buscador = compilar_buscador(tuple(dict.fromkeys(key_words or ())), (), tuple(sorted((ids or {}).items())))
+    lemas = lematizar_columna(df, col, stopwords_list, batch_size, n_process, usar_cache, registrar=False)
+    return [buscador.buscar(secuencia) if secuencia is not None else None for secuencia in lemas]
 
 def text_reduce(df: pd.DataFrame, col: str,
                stopwords_list: list = None,
-                 key_words: list = None) -> pd.Series:
+                 key_words: list = None,
+                 batch_size: int = 64,
+                 n_process: int = 1,
+                 usar_cache: bool = True) -> list:
     """
     Procesa una columna de texto en el DataFrame para contar
     cuántas palabras están en la lista de key_words después de limpiar el texto.
 
+    Las palabras clave de varias palabras ("recurso destinado") se cuentan
+    como frase. Ver `puntuar_textos` para obtener también el puntaje ponderado.
+
     Args:
         df (pd.DataFrame): DataFrame que contiene los datos.
         col (str): Nombre de la columna a procesar.
-        new_col_suffix (str): Sufijo para la nueva columna de conteo.
         stopwords_list (list, optional): Lista de palabras a eliminar. 
                                          Si es None, se usan las stopwords de NLTK en español.
         key_words (list): Lista de palabras clave para contar.
+        batch_size (int): Documentos por lote enviados a spaCy.
+        n_process (int): Procesos que usa spaCy para lematizar.
+        usar_cache (bool): Si se usa la caché de lemas en disco.
 
     Returns:
-        pd.DataFrame: DataFrame con la nueva columna añadida.
+        list: Conteo de palabras clave por fila, en el orden del DataFrame.
     """
-
-    if stopwords_list is None:
-        stopwords_set = set(nltk_stopwords.words('spanish'))
-    else:
-        stopwords_set = set(stopwords_list)
-    
-    if key_words is None:
-        key_words = []
-    
-    # Cargar el modelo de spaCy una sola vez
-    nlp = spacy.load("es_core_news_sm", disable=["parser", "ner"])
-
-    counts = []
-
-    for idx in df.index:
-        n_words = 0
-        text = df.at[idx, col]
-
-        if pd.isnull(text):
-            counts.append(n_words)
-            continue
-
-        # Tokenización y limpieza
-        tokens = word_tokenize(text)
-        tokens = (word.lower() for word in tokens)
-        tokens = (word for word in tokens if word not in stopwords_set)
-        tokens = (quitar_tildes(word) for word in tokens)
-        text_ready01 = ' '.join(tokens)
-        text_ready01 = text_ready01.split()
-        text_ready = singularizar(text_ready01)
-        text_ready = ' '.join(text_ready)
-
-        # Lematización
-        doc = nlp(text_ready)
-        lemmas = (token.lemma_ for token in doc)
-
-        n_words = sum(1 for word in lemmas if word in key_words)
-
-        counts.append(n_words)
-
-    return counts
\ No newline at end of file
+    counts, _ = puntuar_textos(df, col, stopwords_list, key_words, None,
+                               batch_size, n_process, usar_cache)
+    return counts
@@ -0,0 +1,159 @@
+# rescore.py
+
+import itertools
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Iterator, List, Optional
+
+import numpy as np
+import pandas as pd
+
+from function.almacenamiento import leer_por_bloques, recuperar_reescritura, reescribir_por_bloques
+from function.almacenamiento_sqlite import es_sqlite
+from function.agregados import Agregados, abrir_para_reconstruir, invalidar_agregados
+from function.cache_datos import invalidar
+from function.escritor import bloqueo_archivo
+from function import metricas
+
+# Estado de cada proceso del pool (se llena en el inicializador)
+_TRABAJADOR = {}
+
+
+def _inicializar_trabajador(stopwords_list: list, key_words: list, pesos: dict, ids: dict, batch_size: int) -> None:
+    """Carga el modelo de spaCy y compila el buscador una sola vez por proceso."""
+    from function.procesamiento_texto import cargar_modelo
+
+    cargar_modelo()
+    _TRABAJADOR.update(stopwords_list=stopwords_list, key_words=key_words, pesos=pesos, ids=ids,
+                       batch_size=batch_size)
+
+
+def _puntuar_shard(shard: pd.DataFrame) -> tuple:
+    """
+    Puntúa un shard en el proceso trabajador; devuelve (conteos, puntajes,
+    apariciones, segundos) en el orden del shard.
+    """
+    from function.procesamiento_texto import puntuar_con_palabras
+
+    inicio = time.perf_counter()
+    counts, ponderados, palabras = puntuar_con_palabras(
+        df=shard,
+        col="noticia_completa",
+        stopwords_list=_TRABAJADOR["stopwords_list"],
+        key_words=_TRABAJADOR["key_words"],
+        pesos=_TRABAJADOR["pesos"],
+        batch_size=_TRABAJADOR["batch_size"],
+        ids=_TRABAJADOR["ids"],
+    )
+    return counts, ponderados, palabras, time.perf_counter() - inicio
+
+
+def _puntuar_bloques(bloques: Iterator[pd.DataFrame], pool: ProcessPoolExecutor, tam_shard: int,
+                     registro: metricas.Metricas, agregados: Optional[Agregados] = None) -> Iterator[pd.DataFrame]:
+    """
+    Puntúa cada bloque repartiéndolo en shards y lo devuelve con los
+    puntajes nuevos; con `agregados`, suma el bloque a los agregados usando
+    las apariciones del mismo puntaje.
+    """
+    n = 0
+    while True:
+        with registro.medir("lectura"):
+            df = next(bloques, None)
+        if df is None:
+            return
+
+        # Los puntajes se asignan por posición: un histórico antiguo puede
+        # tener ids repetidos o vacíos
+        shards = [df.iloc[k:k + tam_shard][['noticia_completa']]
+                  for k in range(0, len(df), tam_shard)]
+        puntajes, ponderados, palabras = [], [], []
+        for counts, valores, encontradas, segundos in pool.map(_puntuar_shard, shards):
+            n += 1
+            puntajes.append(np.asarray(counts, dtype="int64"))
+            ponderados.append(np.asarray(valores, dtype="float64"))
+            palabras += encontradas
+            registro.registrar("shard", segundos)
+            registro.contar("articulos", len(counts))
+            print(f"Shard {n}: {len(counts)} artículos en {segundos:.1f} s "
+                  f"({len(counts) / max(segundos, 1e-9):.1f} art/s)")
+
+        df['n_by_tex'] = np.concatenate(puntajes)
+        df['puntaje_ponderado'] = np.concatenate(ponderados)
+        if agregados is not None:
+            with registro.medir("agregados"):
+                agregados.agregar(df, palabras)
+        # El tiempo hasta pedir el siguiente bloque es el de escribir este
+        inicio = time.perf_counter()
+        yield df
+        registro.registrar("escritura", time.perf_counter() - inicio)
+
+
+def rescore(df_path: str, procesos: Optional[int] = None, tam_shard: int = 500,
+            key_words: Optional[List[str]] = None, stopwords_list: Optional[List[str]] = None,
+            batch_size: int = 64, pesos: Optional[dict] = None) -> int:
+    """
+    Vuelve a calcular 'n_by_tex' y 'puntaje_ponderado' para todo el histórico
+    (por ejemplo, tras cambiar las palabras clave, sus pesos o las stopwords) y los
+    guarda en el mismo lugar.
+
+    El histórico se recorre por bloques de `procesos * tam_shard` artículos,
+    de modo que la memoria no crece con su tamaño. Cada bloque se reparte en
+    shards que se puntúan en un pool de procesos; cada proceso carga el
+    modelo de spaCy una sola vez y se informa el rendimiento de cada shard.
+    Con las palabras clave y stopwords del vocabulario, los agregados se
+    reconstruyen en la misma pasada.
+
+    Args:
+        df_path (str): Ruta del histórico (CSV, carpeta Parquet o base SQLite).
+        procesos (int, optional): Procesos del pool. Por defecto, uno por núcleo.
+        tam_shard (int): Artículos por shard.
+        key_words (List[str], optional): Palabras clave. Por defecto las del vocabulario.
+        stopwords_list (List[str], optional): Stopwords. Por defecto las de `save_data`.
+        batch_size (int): Documentos por lote de spaCy dentro de cada shard.
+        pesos (dict, optional): Peso de cada palabra clave. Por defecto los del vocabulario.
+
+    Returns:
+        int: Número de artículos puntuados.
+    """
+    from function import vocabulario
+
+    vocab = vocabulario.cargar()
+    con_agregados = key_words is None and stopwords_list is None
+    key_words = key_words if key_words is not None else vocab.key_words
+    pesos = pesos if pesos is not None else vocab.pesos
+    stopwords_list = stopwords_list if stopwords_list is not None else vocab.stopwords
+    procesos = procesos or os.cpu_count() or 1
+
+    with metricas.ejecucion("rescore") as registro, bloqueo_archivo(f"{str(df_path).rstrip('/')}.lock"):
+        recuperar_reescritura(df_path)
+        # En SQLite solo hacen falta el id, el texto y lo que usan los
+        # agregados; en CSV/Parquet se reescribe todo
+        columnas = (['id_atributo', 'noticia_completa', 'fecha_publicacion_CD', 'autor_redacta']
+                    if es_sqlite(df_path) else None)
+        bloques = leer_por_bloques(df_path, columnas=columnas, tam_bloque=procesos * tam_shard)
+        primero = next(bloques, None)
+        if primero is None or primero.empty:
+            print("El histórico está vacío: no hay nada que puntuar.")
+            return 0
+
+        agregados = abrir_para_reconstruir(df_path) if con_agregados else None
+        inicio = time.perf_counter()
+        with ProcessPoolExecutor(
+            max_workers=procesos,
+            initializer=_inicializar_trabajador,
+            initargs=(stopwords_list, key_words, pesos, vocab.ids, batch_size),
+        ) as pool:
+            reescribir_por_bloques(
+                _puntuar_bloques(itertools.chain([primero], bloques), pool, tam_shard, registro, agregados),
+                df_path)
+
+        total = time.perf_counter() - inicio
+        n_articulos = int(registro.contadores["articulos"])
+        print(f"Rescore: {n_articulos} artículos en {total:.1f} s con {procesos} procesos "
+              f"({n_articulos / max(total, 1e-9):.1f} art/s).")
+
+    invalidar(df_path)
+    if not con_agregados:
+        invalidar_agregados(df_path)
+    return n_articulos
@@ -48,3 +48,78 @@ def singularizar(doc: list) -> list:
         palabra
         for palabra in doc
     ]
+
+
+def _tabla_sin_tildes() -> dict:
+    """
+    Precalcula el reemplazo sin tildes de cada carácter latino acentuado
+    (equivalente a `quitar_tildes`) y de los diacríticos sueltos.
+
+    Returns:
+        dict: Tabla carácter -> reemplazo.
+    """
+    tabla = {}
+    for codigo in range(0x00C0, 0x0250):
+        caracter = chr(codigo)
+        base = quitar_tildes(caracter)
+        if base != caracter:
+            tabla[caracter] = base
+    for codigo in range(0x0300, 0x0370):
+        tabla[chr(codigo)] = ""
+    return tabla
+
+TABLA_SIN_TILDES = _tabla_sin_tildes()
+PATRON_NO_ASCII = re.compile(r'[^\x00-\x7f]')
+PATRON_TOKEN = re.compile(r'\w+|[¿?!¡"]')
+
+def _sin_tilde(coincidencia: re.Match) -> str:
+    caracter = coincidencia.group()
+    base = TABLA_SIN_TILDES.get(caracter)
+    if base is None:
+        # Fuera de la tabla precalculada: se resuelve con `quitar_tildes` y se recuerda
+        base = TABLA_SIN_TILDES[caracter] = quitar_tildes(caracter)
+    return base
+
+def quitar_tildes_documento(texto: str) -> str:
+    """
+    Elimina las tildes de un documento completo usando `TABLA_SIN_TILDES`.
+
+    Solo se visitan los caracteres que no son ASCII, por lo que es mucho más
+    rápido que aplicar `quitar_tildes` palabra por palabra. Los que no están
+    en la tabla (otros bloques de Unicode) se descomponen con `quitar_tildes`
+    y se agregan a ella, así que el resultado es el mismo.
+
+    Args:
+        texto (str): Documento del cual se eliminarán las tildes.
+
+    Returns:
+        str: Documento sin tildes.
+    """
+    return PATRON_NO_ASCII.sub(_sin_tilde, texto)
+
+def normalizar_texto(texto: str, stopwords_set: frozenset) -> list:
+    """
+    Normaliza un documento en una sola pasada: tokenización, paso a
+    minúsculas, eliminación de stopwords, eliminación de tildes del documento
+    completo con `quitar_tildes_documento` y singularización.
+
+    Da el mismo resultado que encadenar `word_tokenize`, `lower`, el filtro de
+    stopwords, `quitar_tildes` y `singularizar`, sin normalizar palabra por
+    palabra. Se tokeniza antes de pasar a minúsculas porque `lower` puede
+    agregar diacríticos que cortarían la palabra ('İ' -> 'i̇').
+
+    Args:
+        texto (str): Documento a normalizar.
+        stopwords_set (frozenset): Palabras a eliminar (en minúsculas).
+
+    Returns:
+        list: Tokens normalizados.
+    """
+    tokens = [word for word in ' '.join(PATRON_TOKEN.findall(texto)).lower().split()
+              if word not in stopwords_set]
+    return [
+        palabra[:-2] if palabra.endswith("es") else
+        palabra[:-1] if palabra.endswith("s") else
+        palabra
+        for palabra in quitar_tildes_documento(' '.join(tokens)).split()
+    ]
@@ -0,0 +1,212 @@
+# vocabulario.py
+
+import hashlib
+import json
+import os
+import pickle
+from functools import lru_cache
+from typing import Dict, FrozenSet, Iterable, List, Optional, Tuple
+
+from function.constantes import (
+    KEY_WORDS_ADJECTIVES, KEY_WORDS_NOUNS, KEY_WORDS_VERBS,
+    PESOS_CATEGORIAS, PESOS_PALABRAS, RUTA_CACHE, STOPWORDS_NOTICIAS,
+)
+from function.palabras_clave import pesos_palabras_clave
+from function.utilidades import quitar_tildes, singularizar
+
+RUTA_VOCABULARIO = os.path.join(RUTA_CACHE, "vocabulario.pickle")
+
+# Formato del artefacto; cambiarlo (o cambiar cómo se normaliza) invalida los anteriores
+FORMATO_VOCABULARIO = 1
+
+
+class Vocabulario:
+    """
+    Stopwords y palabras clave ya normalizadas, junto con los pesos del
+    puntaje ponderado y un id entero por cada token de las palabras clave.
+
+    Se construye una sola vez (`construir`) y se guarda como artefacto en
+    disco con el hash de sus fuentes (`version_fuentes`); las siguientes
+    ejecuciones solo lo deserializan (`cargar`) si ese hash sigue igual.
+
+    Args:
+        version (str): Hash de las fuentes con las que se construyó.
+        stopwords (FrozenSet[str]): Stopwords en minúsculas.
+        key_words (Tuple[str, ...]): Palabras clave normalizadas, sin repetir.
+        pesos (Dict[str, float]): Peso de cada palabra clave.
+        categorias (Dict[str, Tuple[str, ...]]): Palabras clave normalizadas por categoría.
+    """
+
+    __slots__ = ("version", "stopwords", "key_words", "pesos", "categorias", "ids")
+
+    def __init__(self, version: str, stopwords: FrozenSet[str], key_words: Tuple[str, ...],
+                 pesos: Dict[str, float], categorias: Dict[str, Tuple[str, ...]]):
+        self.version = version
+        self.stopwords = frozenset(stopwords)
+        self.key_words = tuple(key_words)
+        self.pesos = dict(pesos)
+        self.categorias = {categoria: tuple(palabras) for categoria, palabras in categorias.items()}
+        # Ids enteros (desde 1) de los tokens de las palabras clave, en orden de aparición
+        self.ids = {}
+        for palabra in self.key_words:
+            for token in palabra.split():
+                self.ids.setdefault(token, len(self.ids) + 1)
+
+    def id(self, token: str) -> int:
+        """Id entero de un token (0 si no es parte de ninguna palabra clave)."""
+        return self.ids.get(token, 0)
+
+    def codificar(self, tokens: Iterable[str]) -> List[int]:
+        """Convierte una secuencia de tokens en sus ids (0 para los desconocidos)."""
+        ids = self.ids
+        return [ids.get(token, 0) for token in tokens]
+
+    def a_dict(self) -> dict:
+        """Contenido serializable del vocabulario (lo que se guarda en el artefacto)."""
+        return {
+            "version": self.version,
+            "stopwords": sorted(self.stopwords),
+            "key_words": list(self.key_words),
+            "pesos": self.pesos,
+            "categorias": {categoria: list(palabras) for categoria, palabras in self.categorias.items()},
+        }
+
+
+def normalizar_palabra_clave(palabra: str) -> str:
+    """
+    Normaliza una palabra clave igual que el texto de las noticias: minúsculas,
+    sin tildes y singularizada palabra por palabra.
+
+    Args:
+        palabra (str): Palabra clave (puede tener varias palabras).
+
+    Returns:
+        str: Palabra clave normalizada.
+    """
+    return " ".join(singularizar(quitar_tildes(palabra.lower()).split()))
+
+
+def _fuentes() -> dict:
+    return {
+        "formato": FORMATO_VOCABULARIO,
+        "categorias": {"verbos": KEY_WORDS_VERBS, "sustantivos": KEY_WORDS_NOUNS, "adjetivos": KEY_WORDS_ADJECTIVES},
+        "pesos_categorias": PESOS_CATEGORIAS,
+        "pesos_palabras": PESOS_PALABRAS,
+        "stopwords_noticias": sorted(STOPWORDS_NOTICIAS),
+    }
+
+
+def stopwords_fuentes() -> FrozenSet[str]:
+    """
+    Stopwords finales del vocabulario: las de NLTK en español (en minúsculas)
+    más `STOPWORDS_NOTICIAS`.
+
+    Returns:
+        FrozenSet[str]: Stopwords.
+    """
+    from nltk.corpus import stopwords
+
+    return frozenset(palabra.lower() for palabra in stopwords.words("spanish")) | STOPWORDS_NOTICIAS
+
+
+def version_fuentes(stopwords: Iterable[str]) -> str:
+    """
+    Hash de las listas de `constantes` con las que se construye el
+    vocabulario y de las stopwords finales (`stopwords_fuentes`), así un
+    cambio en los datos de NLTK también invalida el artefacto guardado.
+
+    Args:
+        stopwords (Iterable[str]): Stopwords finales del vocabulario.
+
+    Returns:
+        str: Hash hexadecimal.
+    """
+    fuentes = {**_fuentes(), "stopwords": sorted(stopwords)}
+    return hashlib.sha256(json.dumps(fuentes, sort_keys=True).encode("utf-8")).hexdigest()
+
+
+def construir(stopwords: Optional[FrozenSet[str]] = None) -> Vocabulario:
+    """
+    Construye el vocabulario desde las fuentes: stopwords de NLTK en español
+    más `STOPWORDS_NOTICIAS`, y palabras clave de `constantes` normalizadas.
+
+    Args:
+        stopwords (FrozenSet[str], optional): Stopwords finales, si ya se
+            leyeron con `stopwords_fuentes`.
+
+    Returns:
+        Vocabulario: Vocabulario construido.
+    """
+    stopwords = stopwords if stopwords is not None else stopwords_fuentes()
+    fuentes = _fuentes()
+    categorias = {
+        categoria: tuple(dict.fromkeys(normalizar_palabra_clave(palabra) for palabra in palabras))
+        for categoria, palabras in fuentes["categorias"].items()
+    }
+    key_words = tuple(dict.fromkeys(palabra for palabras in categorias.values() for palabra in palabras))
+    return Vocabulario(
+        version=version_fuentes(stopwords),
+        stopwords=stopwords,
+        key_words=key_words,
+        pesos=pesos_palabras_clave(categorias, PESOS_CATEGORIAS, PESOS_PALABRAS),
+        categorias=categorias,
+    )
+
+
+def guardar(vocabulario: Vocabulario, ruta: str = RUTA_VOCABULARIO) -> None:
+    """
+    Guarda el vocabulario como artefacto (pickle) de forma atómica.
+
+    Args:
+        vocabulario (Vocabulario): Vocabulario a guardar.
+        ruta (str): Archivo de destino.
+    """
+    os.makedirs(os.path.dirname(ruta) or ".", exist_ok=True)
+    temporal = f"{ruta}.tmp"
+    with open(temporal, "wb") as archivo:
+        pickle.dump(vocabulario.a_dict(), archivo, protocol=pickle.HIGHEST_PROTOCOL)
+    os.replace(temporal, ruta)
+
+
+def leer(ruta: str = RUTA_VOCABULARIO) -> Vocabulario:
+    """
+    Lee un artefacto guardado con `guardar`, sin validar su versión.
+
+    Args:
+        ruta (str): Archivo del artefacto.
+
+    Returns:
+        Vocabulario: Vocabulario guardado.
+    """
+    with open(ruta, "rb") as archivo:
+        return Vocabulario(**pickle.load(archivo))
+
+
+@lru_cache(maxsize=None)
+def cargar(ruta: str = RUTA_VOCABULARIO) -> Vocabulario:
+    """
+    Devuelve el vocabulario, una sola vez por proceso: lee el artefacto si
+    su versión coincide con las fuentes actuales (incluidas las stopwords de
+    NLTK); si no, lo construye y lo vuelve a guardar.
+
+    Args:
+        ruta (str): Archivo del artefacto.
+
+    Returns:
+        Vocabulario: Vocabulario listo para usar.
+    """
+    stopwords = stopwords_fuentes()
+    version = version_fuentes(stopwords)
+    try:
+        vocabulario = leer(ruta)
+        if vocabulario.version == version:
+            return vocabulario
+    except (OSError, pickle.UnpicklingError, EOFError, TypeError):
+        pass
+
+    vocabulario = construir(stopwords)
+    try:
+        guardar(vocabulario, ruta)
+    except OSError as e:
+        print(f"No se pudo guardar el vocabulario: {e}")
+    return vocabulario
@@ -1,13 +1,78 @@
 # main.py
 
-from code.app_shiny import run_app
+import argparse
 import webbrowser
 import threading
 
 def open_browser():
     webbrowser.open_new("http://127.0.0.1:8000")
 
-if __name__ == "__main__":
+def main():
+    parser = argparse.ArgumentParser(description="ETL de noticias UCR")
+    parser.add_argument("--perfil", metavar="RUTA", default=None,
+                        help="Perfila el comando con cProfile y guarda RUTA.pstats y RUTA.txt")
+    comandos = parser.add_subparsers(dest="comando")
+
+    actualizar = comandos.add_parser("actualizar", help="Descarga las noticias nuevas (igual que el botón del dashboard)")
+    actualizar.add_argument("ruta", help="Histórico (archivo CSV, carpeta Parquet o base SQLite)")
+    actualizar.add_argument("--hilos", type=int, default=4, help="Descargas simultáneas")
+    actualizar.add_argument("--tasa", type=float, default=2.0, help="Peticiones por segundo")
+    actualizar.add_argument("--sin-conexion", action="store_true", help="Reproducir las páginas desde la caché HTTP")
+    actualizar.add_argument("--sin-cache", action="store_true", help="No usar la caché HTTP")
+    actualizar.add_argument("--sin-miniaturas", action="store_true", help="No descargar las miniaturas de las imágenes")
+
+    backfill = comandos.add_parser("backfill", help="Carga histórica de un rango de páginas del listado")
+    backfill.add_argument("ruta", help="Histórico (archivo CSV o carpeta Parquet)")
+    backfill.add_argument("--desde", type=int, default=1, help="Primera página del listado")
+    backfill.add_argument("--hasta", type=int, required=True, help="Última página del listado")
+    backfill.add_argument("--bloque", type=int, default=10, help="Páginas por bloque")
+    backfill.add_argument("--workers", type=int, default=4, help="Bloques en paralelo")
+    backfill.add_argument("--tasa", type=float, default=2.0, help="Peticiones por segundo")
+    backfill.add_argument("--sin-conexion", action="store_true", help="Reproducir las páginas desde la caché HTTP")
+    backfill.add_argument("--sin-cache", action="store_true", help="No usar la caché HTTP")
+    backfill.add_argument("--sin-miniaturas", action="store_true", help="No descargar las miniaturas de las imágenes")
+
+    rescore = comandos.add_parser("rescore", help="Recalcula n_by_tex y puntaje_ponderado de todo el histórico en paralelo")
+    rescore.add_argument("ruta", help="Histórico (archivo CSV, carpeta Parquet o base SQLite)")
+    rescore.add_argument("--procesos", type=int, default=None, help="Procesos (por defecto, uno por núcleo)")
+    rescore.add_argument("--shard", type=int, default=500, help="Artículos por shard")
+
+    args = parser.parse_args()
+
+    if args.comando is not None:
+        if args.perfil:
+            from function.metricas import perfilar
+            with perfilar(args.perfil):
+                ejecutar_comando(args)
+        else:
+            ejecutar_comando(args)
+        return
+
+    from code.app_shiny import run_app
     print("iniciando aplicación")
     threading.Timer(1, open_browser).start()
-    run_app()
\ No newline at end of file
+    run_app()
+
+def ejecutar_comando(args):
+    if args.comando == "actualizar":
+        from code.web_scraping import scrape_data
+        scrape_data(args.ruta, hilos=args.hilos, tasa=args.tasa,
+                    usar_cache_http=not args.sin_cache, sin_conexion=args.sin_conexion,
+                    miniaturas=not args.sin_miniaturas)
+        return
+
+    if args.comando == "backfill":
+        from code.web_scraping import backfill as ejecutar_backfill
+        ejecutar_backfill(args.ruta, args.desde, args.hasta, tam_bloque=args.bloque,
+                          workers=args.workers, tasa=args.tasa,
+                          usar_cache_http=not args.sin_cache, sin_conexion=args.sin_conexion,
+                          miniaturas=not args.sin_miniaturas)
+        return
+
+    if args.comando == "rescore":
+        from function.rescore import rescore as ejecutar_rescore
+        ejecutar_rescore(args.ruta, procesos=args.procesos, tam_shard=args.shard)
+        return
+
+if __name__ == "__main__":
+    main()